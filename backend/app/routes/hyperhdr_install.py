@@ -1,14 +1,10 @@
-import time
 from flask import Blueprint, jsonify
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 import subprocess
 import requests
 import os
-import time
-import fcntl
-from contextlib import contextmanager
+import urllib.parse
 from flask import request
-from werkzeug.exceptions import TooManyRequests, HTTPException
 from app.middlewares.req_modifier import modify_request, get_current_user
 from app.services.pi_commands import (
     get_hyperhdr_version,
@@ -18,44 +14,29 @@ from app.services.pi_commands import (
     fetch_github_versions,
     get_system_info,
 )
+from app.services.led_commands import expect_hyperhdr_downtime
+from app.services.job_engine import jobs, JobBusy
+from utils.root_helper import run_privileged, DEB_DIR
 
 hyperhdr_install_bp = Blueprint("hyperhdr_install", __name__)
 
-DOWNLOAD_DIR = "/tmp/hyperhdr_debs"
-LOCK_FILE = "/tmp/hyperhdr_install.lock"
+DOWNLOAD_DIR = DEB_DIR
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Last dpkg output line prefix seen -> phase the package ended in.
+DPKG_PHASES = [
+    ("Processing triggers", "triggers processed"),
+    ("Setting up", "configured"),
+    ("Unpacking", "unpacked"),
+    ("Preparing to unpack", "preparing"),
+]
 
 
 class InstallRequest(BaseModel):
     url: str
 
 
-@contextmanager
-def file_lock(lock_path):
-    """Atomic file lock with proper HTTPException handling"""
-    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
-    lock_file = open(lock_path, "w")
-
-    try:
-        # Try to acquire lock
-        try:
-            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        except (IOError, BlockingIOError):
-            raise TooManyRequests("Installation already in progress")
-
-        try:
-            yield
-        finally:
-            fcntl.flock(lock_file, fcntl.LOCK_UN)
-    finally:
-        # Cleanup resources
-        lock_file.close()
-        try:
-            os.remove(lock_path)
-        except:
-            pass
-
-
-def cleanup_downloads():
+def cleanup_downloads(job=None):
     """Remove all .deb files from download directory"""
     if os.path.exists(DOWNLOAD_DIR):
         for filename in os.listdir(DOWNLOAD_DIR):
@@ -67,82 +48,107 @@ def cleanup_downloads():
                     print(f"Warning: Could not remove {filepath}: {e}")
 
 
+def dpkg_phase(output):
+    for line in reversed(output.splitlines()):
+        for prefix, phase in DPKG_PHASES:
+            if line.startswith(prefix):
+                return phase
+    return "installed"
+
+
+def download_package(job):
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    downloaded = 0
+    try:
+        with requests.get(job.params["url"], stream=True, timeout=30) as r:
+            r.raise_for_status()
+            total = int(r.headers.get("Content-Length") or 0) or None
+            job.progress(bytes_downloaded=0, bytes_total=total)
+
+            with open(job.params["path"], "wb") as f:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    job.progress(bytes_downloaded=downloaded)
+    except requests.RequestException as e:
+        raise RuntimeError(f"Download failed: {e}") from None
+
+    return {"bytes": downloaded}
+
+
+def stop_hyperhdr(reason):
+    def stop(job):
+        expect_hyperhdr_downtime(reason, hold=10.0)
+
+        status_res = status_hyperhdr_service(job.params["user"])
+        if status_res["hyperhdr_status"] == "active":
+            stop_hyperhdr_service(job.params["user"])
+        return {"was": status_res["hyperhdr_status"]}
+
+    return stop
+
+
+def remove_current_package(job):
+    try:
+        curr_ver = get_hyperhdr_version()
+    except FileNotFoundError:
+        return {"removed": False}
+
+    job.progress(dpkg_phase="removing", previous_version=curr_ver["version"])
+    uninstall_current_hyper_hdr_service()
+    return {"removed": True, "version": curr_ver["version"]}
+
+
+def install_package(job):
+    job.progress(dpkg_phase="installing")
+    result = run_privileged("dpkg_install", path=job.params["path"])
+    job.progress(dpkg_phase=dpkg_phase(result.stdout))
+    return {"stdout": result.stdout}
+
+
+INSTALL_STEPS = [
+    ("download", download_package),
+    ("stop", stop_hyperhdr("installing HyperHDR")),
+    ("remove", remove_current_package),
+    ("install", install_package),
+]
+
+def job_accepted(job, message):
+    return jsonify({"status": "success", "data": job, "message": message}), 202
+
+
 @hyperhdr_install_bp.post("/install-hyperhdr")
 @modify_request(add_data={"user": get_current_user()})
 def install_hyperhdr():
+    """
+    Queue a download and install of the .deb at `url`. Returns the job at
+    once; follow it with `GET /jobs/<id>` or `GET /jobs/<id>/events`.
+    """
     json_data = request.get_json(silent=True) or {}
     if not json_data:
         return jsonify({"status": "failed", "error": "No JSON data provided"}), 400
 
-    req = InstallRequest(**json_data)
-    username = request.custom_data["user"]
-
     try:
-        with file_lock(LOCK_FILE):
-            os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-            filename = json_data["url"].split("/")[-1]
-            filepath = os.path.join(DOWNLOAD_DIR, filename)
-
-            try:
-                with requests.get(json_data["url"], stream=True, timeout=30) as r:
-                    r.raise_for_status()
-                    with open(filepath, "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
-            except Exception as e:
-                return jsonify({"status": "failed", "error": "Download failed"}), 500
-
-            curr_ver = {}
-            try:
-                curr_ver = get_hyperhdr_version()
-            except FileNotFoundError:
-                curr_ver = {
-                    "status": "failed",
-                    "error": "HyperHDR is not installed or not in PATH",
-                }
-
-            status_res = status_hyperhdr_service(username)
-
-            if status_res["hyperhdr_status"] == "active":
-                stop_res = stop_hyperhdr_service(username)
-
-            if curr_ver.get("status") == "success":
-                unins_res = uninstall_current_hyper_hdr_service()
-
-            # Install package
-            result = subprocess.run(
-                ["sudo", "dpkg", "-i", filepath],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            return (
-                jsonify(
-                    {
-                        "status": "success",
-                        "message": "Installation complete",
-                        "stdout": result.stdout,
-                    }
-                ),
-                200,
-            )
-
-    except subprocess.CalledProcessError as e:
-        return jsonify({"status": "failed", "error": e.stderr.strip()}), 500
-    except HTTPException as e:
-        return jsonify({"status": "failed", "error": e.description}), e.code
+        req = InstallRequest(**json_data)
+        filename = os.path.basename(urllib.parse.urlparse(req.url).path)
+        if not filename.endswith(".deb"):
+            return jsonify({"status": "failed", "error": "url must point to a .deb package"}), 400
+        params = {
+            "url": req.url,
+            "path": os.path.join(DOWNLOAD_DIR, filename),
+            "user": request.custom_data["user"],
+        }
+        job = jobs.submit("install", INSTALL_STEPS, params, cleanup=cleanup_downloads)
+        return job_accepted(job, "Installation started")
+    except ValidationError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
+    except JobBusy:
+        return jsonify({"status": "failed", "error": "Installation already in progress"}), 429
     except Exception as e:
         return (
             jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}),
             500,
         )
-    finally:
-        try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            cleanup_downloads()
-        except Exception as e:
-            print(f"Warning: Cleanup failed: {e}")
 
 
 @hyperhdr_install_bp.route("/current-version", methods=["GET"])
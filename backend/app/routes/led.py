@@ -1,148 +1,187 @@
+import json
 import asyncio
-from flask import Blueprint, jsonify, abort
+from flask import Blueprint, Response, jsonify, abort
 from flask import request
+from flask_sock import Sock
 from requests.exceptions import RequestException
 from werkzeug.exceptions import HTTPException, Unauthorized, NotFound, BadRequest
+from app.services.circuit_breaker import HyperHDRUnavailable
+from app.services.hyperhdr_target import UnknownTarget
 from app.services.led_commands import (
     set_hyperhdr_brightness,
-    get_hyperhdr_effects,
-    apply_hyperhdr_effect,
+    get_hyperhdr_effects_json,
+    is_known_effect,
+    apply_hyperhdr_effect_async,
     clear_hyperhdr_effect,
     get_current_brightness,
     check_input_signal,
-    apply_hyperhdr_color,
+    get_active_priority,
+    is_already_applied,
+    apply_hyperhdr_color_async,
     check_capture_card_signal,
     set_signal_detection,
-    get_led_postion_data,
-    get_led_stream,
-    check_top_bottom_led_for_fallback,
-    transform_flat_led_colors_for_each_led,
-    add_color_to_led_position_data,
-    get_leds_by_direction,
+    check_fallback_signal,
+    get_led_geometry,
+    get_edge_stats,
+    start_led_recording,
+    stop_led_recording,
+    list_led_recordings,
+    start_led_replay,
+    stop_led_replay,
+    get_hyperhdr_stats,
+    start_color_transition,
+    cancel_color_transition,
+    get_target,
+    list_targets,
+    fan_out_batch,
+    run_hyperhdr_batch,
+    BATCH_COMMANDS,
+    MAX_BATCH_SIZE,
+    MAX_TRANSITION_MS,
+    EASINGS,
 )
 
 led_bp = Blueprint("led", __name__)
+sock = Sock()
 
-@led_bp.route("/adjust-brightness", methods=["POST"])
-def adjust_brightness():
-    try:
-        body = request.get_json()
+# Viewers that receive nothing for this long get an SSE keep-alive comment.
+STREAM_KEEPALIVE = 15.0
 
-        brightness = body.get('brightness')
+# Pacing for client-driven frames on /push-ws. Lower priorities win, so
+# pushed frames cover the USB grabber (240) while they keep coming.
+PUSH_DEFAULT_FPS = 30
+PUSH_MAX_FPS = 60
+PUSH_PRIORITY = 50
 
-        if brightness is None:
-            raise NotFound(description="Missing 'brightness' in request body")
-        
-        brightness = int(brightness)
+# Fastest accepted recording replay, relative to the original timing.
+MAX_REPLAY_SPEED = 100.0
 
-        if brightness > 100 or brightness < 0:
-            raise BadRequest(description="Brightness should be between 0 to 100")
+def get_instance():
+    """Target instance named in the query string or JSON body, if any."""
+    instance = request.args.get("instance")
+    if instance is None and request.is_json:
+        instance = (request.get_json(silent=True) or {}).get("instance")
+    return instance
 
-        res = set_hyperhdr_brightness(brightness)
+def unavailable_response(e):
+    return (
+        jsonify({"status": "failed", "error": str(e)}),
+        503,
+        {"Retry-After": str(e.retry_after)},
+    )
 
-        return jsonify({
-            "status": "success",
-            "data": res,
-            "message": "Brightness adjusted successfully"
-        }), 200
+# Failures are reported the same way by every route below; a route only
+# catches what it maps differently, such as a ValueError from its input.
 
-    except NotFound as e:
-        return jsonify({"status": "failed", "error": str(e)}), 404
+@led_bp.errorhandler(HTTPException)
+def http_error(e):
+    return jsonify({"status": "failed", "error": str(e)}), e.code
 
-    except BadRequest as e:
-        return jsonify({"status": "failed", "error": str(e)}), 400
+@led_bp.errorhandler(UnknownTarget)
+def unknown_target(e):
+    return jsonify({"status": "failed", "error": str(e)}), 404
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+@led_bp.errorhandler(HyperHDRUnavailable)
+def hyperhdr_unavailable(e):
+    return unavailable_response(e)
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
+# RequestException comes from the HTTP client; ConnectionError and timeouts
+# from the WebSocket session, which non-default instances use for every call.
+@led_bp.errorhandler(RequestException)
+@led_bp.errorhandler(ConnectionError)
+@led_bp.errorhandler(asyncio.TimeoutError)
+def hyperhdr_failed(e):
+    return jsonify({"status": "failed", "error": f"API failed: {str(e) or type(e).__name__}"}), 500
 
-@led_bp.route("/get-brightness", methods=["GET"])
-def get_brightness():
-    try:
-        res = get_current_brightness()
-        
-        return jsonify({
-            "status": "success",
-            "data": res,
-            "message": "Fetched current brightness successfully"
-        }), 200
+@led_bp.errorhandler(Exception)
+def unexpected_error(e):
+    return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+@led_bp.route("/adjust-brightness", methods=["POST"])
+def adjust_brightness():
+    body = request.get_json()
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
+    brightness = body.get('brightness')
+
+    if brightness is None:
+        raise NotFound(description="Missing 'brightness' in request body")
+    
+    brightness = int(brightness)
+
+    if brightness > 100 or brightness < 0:
+        raise BadRequest(description="Brightness should be between 0 to 100")
+
+    res = set_hyperhdr_brightness(brightness, instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Brightness adjusted successfully"
+    }), 200
+
+@led_bp.route("/get-brightness", methods=["GET"])
+def get_brightness():
+    res = get_current_brightness(instance=get_instance())
+    
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Fetched current brightness successfully"
+    }), 200
 
 @led_bp.route("/get-effects", methods=["GET"])
 def get_effects():
-    try:
-        res = get_hyperhdr_effects()
-        
-        return jsonify({
-            "status": "success",
-            "data": res,
-            "message": "Fetched effect successfully"
-        }), 200
+    res = get_hyperhdr_effects_json(instance=get_instance())
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
-
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
+    # The effect list is serialized once per catalog load; only the
+    # envelope around it is added here.
+    body = b'{"status":"success","message":"Fetched effect successfully","data":' + res + b'}'
+    return Response(body, status=200, mimetype="application/json")
 
 @led_bp.route("/apply-effect", methods=["POST"])
 async def apply_effect():
-    try:
-        body = request.get_json()
-        effect = body.get('effect')
-        
-        if effect is None:
-            raise NotFound(description="Missing 'effect' in request body")
-
-        active_signal = await check_input_signal()
+    body = request.get_json()
+    effect = body.get('effect')
+    
+    if effect is None:
+        raise NotFound(description="Missing 'effect' in request body")
 
-        is_proto_running = 'proto' in active_signal.get("componentId","").lower()
+    if not isinstance(effect, str):
+        raise BadRequest(description="'effect' must be an effect name")
 
-        if is_proto_running:
-            raise BadRequest("Disconnect Hyperion Grabber.")
+    if not await is_known_effect(effect, instance=get_instance()):
+        raise BadRequest(description="Unknown Effect")
 
-        is_effect_running = active_signal.get("componentId","").lower() == "effect"
+    if is_already_applied("effect", effect, instance=get_instance()):
+        return jsonify({
+            "status": "success",
+            "data": None,
+            "message": "Effect already running"
+        }), 200
 
-        if is_effect_running and active_signal["value"] == effect:
-            return jsonify({
-                "status": "success",
-                "data": None,
-                "message": "Effect already running"
-            }), 200
+    active_signal = await get_active_priority(instance=get_instance())
 
-        avl_effects = get_hyperhdr_effects()
+    is_proto_running = 'proto' in active_signal.get("componentId","").lower()
 
-        list_of_effects = [effect["name"] for effect in avl_effects]
-        
-        if effect not in list_of_effects:
-            raise BadRequest(description="Unknown Effect")
+    if is_proto_running:
+        raise BadRequest("Disconnect Hyperion Grabber.")
 
-        res = apply_hyperhdr_effect(effect)
+    is_effect_running = active_signal.get("componentId","").lower() == "effect"
 
+    if is_effect_running and active_signal["value"] == effect:
         return jsonify({
             "status": "success",
-            "data": res,
-            "message": "effect applied successfully"
+            "data": None,
+            "message": "Effect already running"
         }), 200
 
-    except NotFound as e:
-        return jsonify({"status": "failed", "error": str(e)}), 404
+    res = await apply_hyperhdr_effect_async(effect, instance=get_instance())
 
-    except BadRequest as e:
-        return jsonify({"status": "failed", "error": str(e)}), 400
-
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
-
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "effect applied successfully"
+    }), 200
 
 def is_valid_rgb(color):
     return (
@@ -153,154 +192,452 @@ def is_valid_rgb(color):
 
 @led_bp.route("/apply-color", methods=["POST"])
 async def apply_color():
-    try:
-        body = request.get_json()
+    body = request.get_json()
 
-        color = body.get('color')
-        
-        if color is None:
-            raise NotFound(description="Missing 'color' in request body")
-
-        if not is_valid_rgb(color):
-            raise BadRequest("Color must be 3 integers [0–255].")
-
-        active_signal = await check_input_signal()
-
-        is_proto_running = 'proto' in active_signal.get("componentId","").lower()
-
-        if is_proto_running:
-            raise BadRequest("Disconnect Hyperion Grabber.")
+    color = body.get('color')
+    
+    if color is None:
+        raise NotFound(description="Missing 'color' in request body")
 
-        is_color_running = active_signal.get("componentId","").lower() == "color"
-        
-        if is_color_running and isinstance(active_signal["value"], dict) and active_signal["value"].get("RGB",[]) == color:
-            return jsonify({
-                "status": "success",
-                "data": None,
-                "message": "Color already applied"
-            }), 200
+    if not is_valid_rgb(color):
+        raise BadRequest("Color must be 3 integers [0–255].")
 
-        res = apply_hyperhdr_color(color)
+    # A running fade would paint over the new color, and its in-between
+    # frames must not count as this color being applied already.
+    fade_cancelled = cancel_color_transition(instance=get_instance())
 
+    if not fade_cancelled and is_already_applied("color", color, instance=get_instance()):
         return jsonify({
             "status": "success",
-            "data": res,
-            "message": "color applied successfully"
+            "data": None,
+            "message": "Color already applied"
         }), 200
 
-    except NotFound as e:
-        return jsonify({"status": "failed", "error": str(e)}), 404
+    active_signal = await get_active_priority(instance=get_instance())
 
-    except BadRequest as e:
-        return jsonify({"status": "failed", "error": str(e)}), 400
+    is_proto_running = 'proto' in active_signal.get("componentId","").lower()
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+    if is_proto_running:
+        raise BadRequest("Disconnect Hyperion Grabber.")
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
+    is_color_running = active_signal.get("componentId","").lower() == "color"
     
-@led_bp.route("/stop-effect", methods=["POST"])
-def stop_effect():
-    try:
-        res = clear_hyperhdr_effect() 
-        
+    if not fade_cancelled and is_color_running and isinstance(active_signal["value"], dict) and active_signal["value"].get("RGB",[]) == color:
         return jsonify({
             "status": "success",
-            "data": res,
-            "message": "Stopped effect successfully"
+            "data": None,
+            "message": "Color already applied"
         }), 200
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+    res = await apply_hyperhdr_color_async(color, instance=get_instance())
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "color applied successfully"
+    }), 200
+    
+@led_bp.route("/transition", methods=["POST"])
+async def transition_color():
+    """
+    Fade to a color on the backend. Body: `color`, `duration_ms`, and
+    optionally `start`, `easing` and `hold_ms`. Returns once the fade is
+    scheduled; any later color, effect or clear command cancels it.
+    """
+    body = request.get_json()
+
+    color = body.get('color')
+    if color is None:
+        raise NotFound(description="Missing 'color' in request body")
+
+    start = body.get('start')
+    if not is_valid_rgb(color) or (start is not None and not is_valid_rgb(start)):
+        raise BadRequest("Color must be 3 integers [0–255].")
+
+    duration_ms = body.get('duration_ms')
+    if not isinstance(duration_ms, int) or not 0 < duration_ms <= MAX_TRANSITION_MS:
+        raise BadRequest(f"'duration_ms' must be an integer between 1 and {MAX_TRANSITION_MS}.")
+
+    easing = body.get('easing', "linear")
+    if easing not in EASINGS:
+        raise BadRequest(f"'easing' must be one of: {', '.join(EASINGS)}")
+
+    hold_ms = body.get('hold_ms', 0)
+    if not isinstance(hold_ms, int) or hold_ms < 0:
+        raise BadRequest("'hold_ms' must be a non-negative integer.")
+
+    res = await start_color_transition(
+        color,
+        duration_ms,
+        easing,
+        start=start,
+        hold_ms=hold_ms,
+        instance=get_instance(),
+    )
 
-@led_bp.route("/get-active-signal", methods=["GET"])
-async def get_active_signal():
-    try:
-        res = await check_input_signal()
-        
-        return jsonify({
-            "status": "success",
-            "data": res,
-            "message": "Fetched active input successfully"
-        }), 200
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "transition started"
+    }), 200
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+@led_bp.route("/stop-effect", methods=["POST"])
+def stop_effect():
+    res = clear_hyperhdr_effect(instance=get_instance()) 
+    
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Stopped effect successfully"
+    }), 200
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500    
+@led_bp.route("/get-active-signal", methods=["GET"])
+async def get_active_signal():
+    res = await check_input_signal(instance=get_instance())
+    
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Fetched active input successfully"
+    }), 200
 
 @led_bp.route("/get-usb-signal", methods=["GET"])
 def get_usb_signal():
+    capture_card = check_capture_card_signal(instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": capture_card,
+        "message": "Fetched usb input successfully"
+    }), 200
+
+@led_bp.route("/is-fallback", methods=["GET"])
+async def is_fallback():
+    is_it_fallback = await check_fallback_signal(instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": { "is_fallback": is_it_fallback },
+        "message": "fetched fallback status successfully."
+    }), 200
+
+@led_bp.route("/edge-stats", methods=["GET"])
+async def edge_stats():
+    ema = request.args.get("ema")
+    if ema is not None:
+        ema = parse_float(ema, "ema")
+        if not 0 < ema <= 1:
+            raise BadRequest(description="ema must be in (0, 1]")
+
+    res = await get_edge_stats(ema, instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "fetched edge stats successfully."
+    }), 200
+
+@led_bp.route("/layout", methods=["GET"])
+def get_layout():
+    res = get_led_geometry(instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Fetched LED layout successfully"
+    }), 200
+
+@led_bp.route("/reconnect-signal", methods=["POST"])
+def reconnect_signal():
+    capture_card = check_capture_card_signal(instance=get_instance())
+
+    res = None
+    
+    if not capture_card.get("active") and not capture_card.get("visible"):
+        res = set_signal_detection(False, instance=get_instance())
+        res = set_signal_detection(True, instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res if res else {},
+        "message": "ran reconnection successfully"
+    }), 200
+
+def parse_batch_commands(body):
+    commands = body.get('commands')
+
+    if commands is None:
+        raise NotFound(description="Missing 'commands' in request body")
+
+    if not isinstance(commands, list) or not commands:
+        raise BadRequest(description="'commands' must be a non-empty list")
+
+    if len(commands) > MAX_BATCH_SIZE:
+        raise BadRequest(description=f"At most {MAX_BATCH_SIZE} commands per batch")
+
+    for command in commands:
+        if not isinstance(command, dict) or command.get("command") not in BATCH_COMMANDS:
+            raise BadRequest(description=f"Commands must be one of: {', '.join(sorted(BATCH_COMMANDS))}")
+
+    return commands
+
+@led_bp.route("/batch", methods=["POST"])
+async def batch():
+    commands = parse_batch_commands(request.get_json())
+
+    res = await run_hyperhdr_batch(commands, instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Batch applied successfully"
+    }), 200
+
+@led_bp.route("/fan-out", methods=["POST"])
+async def fan_out():
+    body = request.get_json()
+    commands = parse_batch_commands(body)
+
+    instances = body.get('instances')
+    if instances is not None and (
+        not isinstance(instances, list) or not all(isinstance(name, str) for name in instances)
+    ):
+        raise BadRequest(description="'instances' must be a list of instance names")
+
+    res = await fan_out_batch(commands, instances)
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Batch sent to instances"
+    }), 200
+
+@led_bp.route("/instances", methods=["GET"])
+def get_instances():
+    return jsonify({
+        "status": "success",
+        "data": list_targets(),
+        "message": "Fetched HyperHDR instances successfully"
+    }), 200
+
+@led_bp.route("/stats", methods=["GET"])
+def get_stats():
+    res = get_hyperhdr_stats(instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "Fetched HyperHDR stats successfully"
+    }), 200
+
+def parse_float(value, name):
     try:
-        capture_card = check_capture_card_signal()
+        return float(value)
+    except ValueError:
+        raise BadRequest(description=f"{name} must be a number") from None
+
+def parse_stream_fps():
+    fps = request.args.get("fps")
+    if fps is None:
+        return None
+
+    fps = parse_float(fps, "fps")
+    if fps <= 0:
+        raise BadRequest(description="fps must be greater than 0")
+    return fps
+
+@led_bp.route("/stream", methods=["GET"])
+def stream_leds():
+    """
+    LED frames as Server-Sent Events. SSE is text only, so frames are always
+    JSON here; the binary format is available on `/stream-ws`.
+    """
+    max_fps = parse_stream_fps()
+    if request.args.get("format", "json") != "json":
+        raise BadRequest(description="/led/stream only serves JSON; use /led/stream-ws for format=binary")
+
+    target = get_target(get_instance())
+    target.breaker.check()
+
+    broadcast_hub = target.broadcast
+    client = broadcast_hub.connect(max_fps)
+
+    def events():
+        try:
+            while True:
+                frame = client.next_frame(timeout=STREAM_KEEPALIVE)
+                if frame is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {frame.seq}\ndata: {broadcast_hub.encode_json(frame)}\n\n"
+        finally:
+            broadcast_hub.disconnect(client)
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        return jsonify({
-            "status": "success",
-            "data": capture_card,
-            "message": "Fetched usb input successfully"
-        }), 200
+@sock.route("/stream-ws", bp=led_bp)
+def stream_leds_ws(ws):
+    try:
+        max_fps = parse_stream_fps()
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+        stream_format = request.args.get("format", "json")
+        if stream_format not in ("json", "binary"):
+            raise BadRequest(description="format must be 'json' or 'binary'")
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500    
+        delta = request.args.get("delta", "0").lower() in ("1", "true")
+    except (BadRequest, ValueError) as e:
+        ws.close(reason=1008, message=str(e))
+        return
 
-@led_bp.route("/is-fallback", methods=["GET"])
-async def is_fallback():
     try:
-        led_position = get_led_postion_data()
+        target = get_target(get_instance())
+        target.breaker.check()
+    except UnknownTarget as e:
+        ws.close(reason=1008, message=str(e))
+        return
+    except HyperHDRUnavailable as e:
+        # 1013: try again later
+        ws.close(reason=1013, message=str(e))
+        return
+
+    broadcast_hub = target.broadcast
+    client = broadcast_hub.connect(max_fps)
+    try:
+        while ws.connected:
+            frame = client.next_frame(timeout=STREAM_KEEPALIVE)
+            if frame is None:
+                continue
+
+            if stream_format == "binary":
+                for payload in broadcast_hub.encode_binary(frame, client, delta):
+                    # simple_websocket only sends `bytes` as a binary message.
+                    ws.send(bytes(payload))
+            else:
+                ws.send(broadcast_hub.encode_json(frame))
+    finally:
+        broadcast_hub.disconnect(client)
+
+@sock.route("/push-ws", bp=led_bp)
+def push_leds_ws(ws):
+    """
+    Drive the LEDs from the client: each binary message is one frame of
+    RGB bytes (3 per LED). Frames are forwarded on a fixed clock, so a
+    client sending faster than `fps` only loses intermediate frames.
+    Any text message is answered with the gateway stats.
+    """
+    try:
+        fps = parse_stream_fps() or PUSH_DEFAULT_FPS
+        if fps > PUSH_MAX_FPS:
+            raise BadRequest(description=f"fps must be at most {PUSH_MAX_FPS}")
 
-        led_color = await get_led_stream()
-        led_color = led_color.get("result",{}).get("leds",[])
+        priority = int(request.args.get("priority", PUSH_PRIORITY))
+        if not 1 <= priority <= 253:
+            raise BadRequest(description="priority must be between 1 and 253")
+    except (BadRequest, ValueError) as e:
+        ws.close(reason=1008, message=str(e))
+        return
 
-        led_color = transform_flat_led_colors_for_each_led(led_color)
+    try:
+        target = get_target(get_instance())
+        target.breaker.check()
+    except UnknownTarget as e:
+        ws.close(reason=1008, message=str(e))
+        return
+    except HyperHDRUnavailable as e:
+        ws.close(reason=1013, message=str(e))
+        return
+
+    gateway = target.open_push(fps, priority)
+    try:
+        while ws.connected:
+            data = ws.receive(timeout=STREAM_KEEPALIVE)
+            if data is None:
+                continue
 
-        led_position = add_color_to_led_position_data(led_position, led_color)
+            if isinstance(data, str):
+                ws.send(json.dumps(gateway.stats()))
+            else:
+                gateway.offer(data)
+    finally:
+        target.close_push(gateway)
 
-        TOP_THRESHOLD = 0.05
-        BOTTOM_THRESHOLD = 0.95
 
-        result = get_leds_by_direction(led_position,TOP_THRESHOLD=TOP_THRESHOLD, BOTTOM_THRESHOLD = BOTTOM_THRESHOLD)
+@led_bp.route("/record", methods=["POST"])
+async def start_recording():
+    try:
+        body = request.get_json() or {}
+        name = body.get('name')
+        if name is None:
+            raise NotFound(description="Missing 'name' in request body")
 
-        is_it_fallback = check_top_bottom_led_for_fallback(result["top"], result["bottom"])
+        res = await start_led_recording(name, instance=get_instance())
 
         return jsonify({
             "status": "success",
-            "data": { "is_fallback": is_it_fallback },
-            "message": "fetched fallback status successfully."
+            "data": res,
+            "message": "recording started"
         }), 200
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
-
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500    
+    except ValueError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
 
-@led_bp.route("/reconnect-signal", methods=["POST"])
-def reconnect_signal():
+    except RuntimeError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 409
+
+@led_bp.route("/record/stop", methods=["POST"])
+def stop_recording():
+    res = stop_led_recording(instance=get_instance())
+
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "recording stopped"
+    }), 200
+
+@led_bp.route("/recordings", methods=["GET"])
+def get_recordings():
+    return jsonify({
+        "status": "success",
+        "data": list_led_recordings(),
+        "message": "fetched recordings successfully."
+    }), 200
+
+@led_bp.route("/replay", methods=["POST"])
+async def start_replay():
     try:
-        capture_card = check_capture_card_signal()
+        body = request.get_json() or {}
+        name = body.get('name')
+        if name is None:
+            raise NotFound(description="Missing 'name' in request body")
 
-        res = None
-        
-        if not capture_card.get("active") and not capture_card.get("visible"):
-            res = set_signal_detection(False)
-            res = set_signal_detection(True)
+        speed = body.get('speed', 1.0)
+        if not isinstance(speed, (int, float)) or not 0 < speed <= MAX_REPLAY_SPEED:
+            raise BadRequest(description=f"'speed' must be a number in (0, {MAX_REPLAY_SPEED:g}]")
+
+        res = await start_led_replay(name, float(speed), instance=get_instance())
 
         return jsonify({
             "status": "success",
-            "data": res if res else {},
-            "message": "ran reconnection successfully"
+            "data": res,
+            "message": "replay started"
         }), 200
 
-    except RequestException as e:
-        return jsonify({"status": "failed", "error": f"API failed: {str(e)}"}), 500
+    except FileNotFoundError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 404
+
+    except ValueError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
+
+@led_bp.route("/replay/stop", methods=["POST"])
+def stop_replay():
+    res = stop_led_replay(instance=get_instance())
 
-    except Exception as e:
-        return jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}), 500    
\ No newline at end of file
+    return jsonify({
+        "status": "success",
+        "data": res,
+        "message": "replay stopped"
+    }), 200
@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify, abort
+from flask import Blueprint, Response, jsonify, abort
+import json
 import subprocess
 from flask import request
 from werkzeug.exceptions import HTTPException, Unauthorized, NotFound, BadRequest
@@ -19,7 +20,12 @@ from app.services.pi_commands import (
     get_device_mac,
     set_hostname,
     restart_systemctl_service,
+    get_services_status,
+    wait_for_services_change,
 )
+from app.services.led_commands import expect_hyperhdr_downtime, probe_hyperhdr
+from app.services.job_engine import jobs, JobBusy, TERMINAL_STATES
+from utils.root_helper import build_command
 from utils.shared_services import (
     configure_wifi_nmcli,
     connect_wifi_nmcli,
@@ -37,6 +43,17 @@ class WifiRequest(BaseModel):
 
 main_bp = Blueprint("main", __name__)
 
+# Longest a `GET /services?wait=` long-poll is held open.
+MAX_SERVICES_WAIT = 60.0
+
+# Longest a `GET /jobs/<id>?wait=` long-poll is held open, and the
+# keep-alive interval of `GET /jobs/<id>/events`.
+MAX_JOB_WAIT = 60.0
+JOB_KEEPALIVE = 15.0
+
+# Services that advertise the hostname, restarted after it changes.
+HOSTNAME_SERVICES = ["avahi-daemon", "wifi_utilities.service", "auto_pair_agent.service"]
+
 
 @main_bp.route("/start-hyperhdr", methods=["POST"])
 @modify_request(add_data={"user": get_current_user()})
@@ -44,6 +61,7 @@ def start_hyperhdr():
     try:
         username = request.custom_data["user"]
         res = start_hyperhdr_service(username)
+        probe_hyperhdr()
         return jsonify(res), 200
     except subprocess.CalledProcessError as e:
         return jsonify({"status": "failed", "error": f"command failed : {str(e)}"}), 500
@@ -75,6 +93,7 @@ def enable_boot_hyperhdr():
 def stop_hyperhdr():
     try:
         username = request.custom_data["user"]
+        expect_hyperhdr_downtime("stopped by request")
         res = stop_hyperhdr_service(username)
         return jsonify(res), 200
     except subprocess.CalledProcessError as e:
@@ -134,6 +153,32 @@ def boot_status_hyperhdr():
         )
 
 
+@main_bp.route("/services", methods=["GET"])
+def services_status():
+    """
+    State of every tracked systemd unit. With `wait=<seconds>` and the
+    `since=<version>` of a previous response, the request is held until a
+    unit changes state or the wait runs out.
+    """
+    try:
+        wait = request.args.get("wait", type=float)
+        since = request.args.get("since", default=-1, type=int)
+
+        if wait is None or wait <= 0:
+            res = get_services_status()
+        else:
+            res = wait_for_services_change(since, min(wait, MAX_SERVICES_WAIT))
+
+        return jsonify({"status": "success", "data": res, "message": "Fetched services status successfully."}), 200
+    except subprocess.CalledProcessError as e:
+        return jsonify({"status": "failed", "error": f"command failed : {str(e)}"}), 500
+    except Exception as e:
+        return (
+            jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+
 @main_bp.route("/get-mac", methods=["GET"])
 def get_mac():
     try:
@@ -181,13 +226,29 @@ def set_unique_hostname():
         mac_suffix = res["mac"].replace(":", "")
         new_hostname = f"{hostname}-{mac_suffix}"
 
-        res = set_hostname(new_hostname)
+        # Rejects invalid hostnames before anything is queued.
+        build_command("set_hostname", {"hostname": new_hostname})
 
-        restart_systemctl_service("avahi-daemon")
-        restart_systemctl_service("wifi_utilities.service")
-        restart_systemctl_service("auto_pair_agent.service")
+        steps = [("set-hostname", lambda job: set_hostname(new_hostname))] + [
+            (f"restart {service}", lambda job, service=service: restart_systemctl_service(service))
+            for service in HOSTNAME_SERVICES
+        ]
+        job = jobs.submit("hostname", steps, {"hostname": new_hostname})
 
-        return jsonify(res), 200
+        return (
+            jsonify(
+                {
+                    "status": "success",
+                    "data": job,
+                    "message": f"Setting hostname to '{new_hostname}'.",
+                }
+            ),
+            202,
+        )
+    except ValueError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
+    except JobBusy as e:
+        return jsonify({"status": "failed", "error": str(e)}), 429
     except subprocess.CalledProcessError as e:
         return jsonify({"status": "failed", "error": f"command failed : {str(e)}"}), 500
     except Exception as e:
@@ -197,6 +258,76 @@ def set_unique_hostname():
         )
 
 
+@main_bp.route("/jobs", methods=["GET"])
+def list_jobs():
+    try:
+        return jsonify({"status": "success", "data": jobs.list(), "message": "Fetched jobs successfully."}), 200
+    except Exception as e:
+        return (
+            jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+
+@main_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """
+    Status of a job: its steps with timings and its progress. With
+    `wait=<seconds>` and the `since=<version>` of a previous response, the
+    request is held until the job changes or the wait runs out.
+    """
+    try:
+        wait = request.args.get("wait", type=float)
+        since = request.args.get("since", default=-1, type=int)
+
+        if wait is None or wait <= 0:
+            job = jobs.get(job_id)
+        else:
+            job = jobs.wait_for_change(job_id, since, min(wait, MAX_JOB_WAIT))
+
+        if job is None:
+            raise NotFound(description=f"Unknown job '{job_id}'")
+
+        return jsonify({"status": "success", "data": job, "message": "Fetched job successfully."}), 200
+    except HTTPException as e:
+        return jsonify({"status": "failed", "error": e.description}), e.code
+    except Exception as e:
+        return (
+            jsonify({"status": "failed", "error": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+
+@main_bp.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """Server-sent events with the job's state on every change, until it finishes."""
+    if jobs.get(job_id) is None:
+        return jsonify({"status": "failed", "error": f"Unknown job '{job_id}'"}), 404
+
+    since = request.headers.get("Last-Event-ID", default=-1, type=int)
+
+    def events():
+        nonlocal since
+        while True:
+            job = jobs.wait_for_change(job_id, since, JOB_KEEPALIVE)
+            if job is None:
+                return
+            if job["version"] > since:
+                since = job["version"]
+                yield f"id: {since}\ndata: {json.dumps(job)}\n\n"
+            elif job["status"] not in TERMINAL_STATES:
+                yield ": keep-alive\n\n"
+
+            if job["status"] in TERMINAL_STATES:
+                return
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @main_bp.route("/connect-wifi", methods=["POST"])
 def connect_wifi():
     if not request.is_json:
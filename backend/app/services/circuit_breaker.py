@@ -0,0 +1,158 @@
+import math
+import time
+import asyncio
+import threading
+from .event_loop import get_loop, submit
+
+
+class HyperHDRUnavailable(Exception):
+    """Raised instead of contacting HyperHDR while the breaker is open."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"HyperHDR is unavailable ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+async def tcp_probe(host, port, timeout=1.0):
+    """True if HyperHDR accepts a TCP connection on its JSON-RPC port."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class CircuitBreaker:
+    """
+    Fails HyperHDR calls fast while the service is down.
+
+    After `failure_threshold` consecutive connection failures the breaker
+    opens: callers get HyperHDRUnavailable immediately, and a background
+    task on the backend loop probes HyperHDR with exponential backoff. The
+    first successful probe closes the breaker again.
+    """
+
+    def __init__(self, probe, failure_threshold=3, base_delay=1.0, max_delay=30.0):
+        self._probe = probe
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._open = False
+        self._reason = None
+        self._failures = 0
+        self._delay = base_delay
+        self._next_probe = 0.0
+        self._prober = None
+        self._wake = None
+
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def check(self):
+        """Raise HyperHDRUnavailable if calls should not be attempted."""
+        if not self._open:
+            return
+        with self._lock:
+            if not self._open:
+                return
+            self.rejected += 1
+            retry_after = max(1, math.ceil(self._next_probe - time.monotonic()))
+            reason = self._reason
+        raise HyperHDRUnavailable(reason, retry_after)
+
+    def record_success(self):
+        if self._failures or self._open:
+            with self._lock:
+                self._failures = 0
+                self._close()
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            if not self._open and self._failures >= self.failure_threshold:
+                self._trip(f"{self._failures} failed calls, last: {type(error).__name__}", self.base_delay)
+
+    def expect_downtime(self, reason, hold=0.0):
+        """
+        Open the breaker ahead of a planned stop or restart.
+
+        Args:
+            reason (str): Reported to callers while the breaker is open.
+            hold (float): Seconds to wait before the first probe.
+        """
+        with self._lock:
+            self._trip(reason, max(hold, self.base_delay))
+
+    def probe_now(self):
+        """Probe immediately, e.g. right after the service was started."""
+        with self._lock:
+            if not self._open:
+                return
+            self._delay = self.base_delay
+            self._next_probe = time.monotonic()
+            wake = self._wake
+        if wake is not None:
+            get_loop().call_soon_threadsafe(wake.set)
+
+    def _trip(self, reason, delay):
+        self._open = True
+        self._reason = reason
+        self._delay = delay
+        self._next_probe = time.monotonic() + delay
+        self.opened += 1
+        if self._prober is None:
+            self._prober = submit(self._probe_loop())
+
+    def _close(self):
+        self._open = False
+        self._reason = None
+        self._delay = self.base_delay
+
+    async def _probe_loop(self):
+        self._wake = asyncio.Event()
+        while True:
+            with self._lock:
+                if not self._open:
+                    self._wake = None
+                    self._prober = None
+                    return
+                wait = self._next_probe - time.monotonic()
+
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            self.probes += 1
+            healthy = await self._probe()
+            with self._lock:
+                if healthy:
+                    self._failures = 0
+                    self._close()
+                else:
+                    self._delay = min(self._delay * 2, self.max_delay)
+                    self._next_probe = time.monotonic() + self._delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": self._open,
+                "reason": self._reason,
+                "failures": self._failures,
+                "retry_in": round(max(0.0, self._next_probe - time.monotonic()), 1) if self._open else None,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "probes": self.probes,
+            }
@@ -0,0 +1,156 @@
+import asyncio
+import numpy as np
+from .event_loop import get_loop, run_async
+
+
+def _ease_in_out(t):
+    return np.where(t < 0.5, 4 * t ** 3, 1 - (-2 * t + 2) ** 3 / 2)
+
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease-in": lambda t: t ** 2,
+    "ease-out": lambda t: 1 - (1 - t) ** 2,
+    "ease-in-out": _ease_in_out,
+    "sine": lambda t: (1 - np.cos(np.pi * t)) / 2,
+}
+
+
+def render_transition(start, end, duration_ms, fps, easing="linear"):
+    """
+    Every intermediate color of a fade, computed in one pass.
+
+    Args:
+        start (list[int]): RGB color the fade starts from.
+        end (list[int]): RGB color the fade ends on.
+        duration_ms (int): Length of the fade.
+        fps (float): Frames per second.
+        easing (str): One of EASINGS.
+
+    Returns:
+        np.ndarray: (frames, 3) uint8 colors, the last row equal to `end`.
+    """
+    frames = max(1, round(duration_ms / 1000 * fps))
+    t = np.arange(1, frames + 1, dtype=np.float64) / frames
+    weights = EASINGS[easing](t)[:, None]
+
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    colors = np.rint(start + (end - start) * weights)
+    return np.clip(colors, 0, 255).astype(np.uint8)
+
+
+class TransitionEngine:
+    """
+    Plays color fades for one HyperHDR target from the backend loop.
+
+    The frames of a fade are rendered up front and written to the target's
+    WebSocket session on a fixed clock without waiting for replies; only the
+    final color is confirmed. Starting a new fade, or calling `cancel()`
+    before any other color/effect/clear command, stops the running one.
+
+    Intermediate frames expire after `frame_hold_ms`, so an abandoned fade
+    does not leave an in-between color behind.
+    """
+
+    def __init__(self, session, fps=30, frame_hold_ms=1000, origin="Transition"):
+        self.session = session
+        self.fps = fps
+        self.frame_hold_ms = frame_hold_ms
+        self.origin = origin
+
+        self._task = None
+        self.current_rgb = None
+
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.frames_sent = 0
+        self.last_error = None
+
+    @property
+    def active(self):
+        return self._task is not None and not self._task.done()
+
+    async def play(self, start, end, duration_ms, easing="linear", priority=100, hold_ms=0):
+        """
+        Start a fade, replacing any fade still running.
+
+        Args:
+            start (list[int]): RGB start color.
+            end (list[int]): RGB end color.
+            duration_ms (int): Fade length in milliseconds.
+            easing (str): One of EASINGS.
+            priority (int): HyperHDR priority the fade is shown at.
+            hold_ms (int): How long the end color stays. 0 means infinite.
+
+        Returns:
+            dict: Frame count and rate of the scheduled fade.
+        """
+        frames = render_transition(start, end, duration_ms, self.fps, easing)
+        return await run_async(self._begin(frames, priority, hold_ms))
+
+    def cancel(self):
+        """Stop the running fade, if any. Safe to call from any thread."""
+        task = self._task
+        if task is None or task.done():
+            return False
+        get_loop().call_soon_threadsafe(task.cancel)
+        return True
+
+    async def _begin(self, frames, priority, hold_ms):
+        if self.active:
+            self._task.cancel()
+        await self.session.wait_connected()
+
+        self.started += 1
+        self._task = asyncio.get_running_loop().create_task(self._run(frames, priority, hold_ms))
+        return {"frames": len(frames), "fps": self.fps, "duration_ms": round(len(frames) / self.fps * 1000)}
+
+    def _color(self, rgb, priority, duration):
+        return {
+            "command": "color",
+            "color": rgb,
+            "priority": priority,
+            "duration": duration,
+            "origin": self.origin,
+        }
+
+    async def _run(self, frames, priority, hold_ms):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.fps
+        next_tick = loop.time()
+
+        try:
+            for rgb in frames[:-1].tolist():
+                await self.session.send_nowait(self._color(rgb, priority, self.frame_hold_ms))
+                self.frames_sent += 1
+                self.current_rgb = rgb
+
+                next_tick += interval
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+            rgb = frames[-1].tolist()
+            await self.session.request(self._color(rgb, priority, hold_ms))
+            self.frames_sent += 1
+            self.current_rgb = rgb
+            self.completed += 1
+            self.last_error = None
+
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+    def stats(self) -> dict:
+        return {
+            "fps": self.fps,
+            "active": self.active,
+            "current": self.current_rgb,
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "frames_sent": self.frames_sent,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,115 @@
+import json
+import threading
+
+
+def server_identity(sysinfo):
+    """Version/build of the running HyperHDR from a sysinfo `info` block."""
+    hyperion = sysinfo.get("hyperion") or {}
+    return hyperion.get("version"), hyperion.get("build")
+
+
+class EffectsCatalog:
+    """
+    Effects available on HyperHDR, loaded once and kept between requests.
+
+    serverinfo does not carry the HyperHDR version, so the version/build is
+    read with `sysinfo` whenever the WebSocket (re)connects. The catalog is
+    dropped when that identity differs from the one it was built under (an
+    upgrade) or cannot be read; edits to effects on a running HyperHDR
+    arrive as `effects-update` pushes and invalidate it as well. Music
+    effects are filtered out up front.
+    """
+
+    def __init__(self, load, load_async=None, identify_async=None):
+        self._load = load
+        self._load_async = load_async
+        self._identify_async = identify_async
+        self._lock = threading.Lock()
+        # (identity, effects by name, serialized list), swapped as a whole.
+        self._state = None
+        self._identity = None
+        self.loads = 0
+        self.invalidations = 0
+
+    def _build(self, info):
+        effects = [
+            effect for effect in info.get("effects", [])
+            if not effect["name"].lower().startswith("music")
+        ]
+        state = (
+            self._identity,
+            {effect["name"]: effect for effect in effects},
+            json.dumps(effects, separators=(",", ":")).encode("utf-8"),
+        )
+        with self._lock:
+            self._state = state
+            self.loads += 1
+        return state
+
+    # Loading goes through the serverinfo snapshot, which may already have
+    # handed the reply to `observe`; only build if that did not happen.
+    def _current(self):
+        state = self._state
+        if state is None:
+            info = self._load()
+            state = self._state or self._build(info)
+        return state
+
+    async def _current_async(self):
+        state = self._state
+        if state is None:
+            info = await self._load_async()
+            state = self._state or self._build(info)
+        return state
+
+    def get(self) -> dict:
+        """Effects keyed by name, loading them on first use."""
+        return self._current()[1]
+
+    async def get_async(self) -> dict:
+        return (await self._current_async())[1]
+
+    def effects(self) -> list:
+        return list(self.get().values())
+
+    async def effects_async(self) -> list:
+        return list((await self.get_async()).values())
+
+    def payload(self) -> bytes:
+        """The filtered effect list, already serialized to JSON."""
+        return self._current()[2]
+
+    def observe(self, info):
+        """Called with every fresh serverinfo reply; builds the catalog if it is empty."""
+        if self._state is None:
+            self._build(info)
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+            self.invalidations += 1
+
+    async def on_reconnect(self):
+        identity = None
+        if self._identify_async is not None:
+            try:
+                identity = server_identity((await self._identify_async()).get("info", {}))
+            except Exception as e:
+                print(f"Failed to read HyperHDR version: {e}")
+
+        if identity == (None, None):
+            identity = None
+        state = self._state
+        self._identity = identity
+        if identity is None or state is None or state[0] != identity:
+            self.invalidate()
+
+    def stats(self) -> dict:
+        state = self._state
+        return {
+            "loaded": state is not None,
+            "effects": len(state[1]) if state else None,
+            "version": state[0][0] if state and state[0] else None,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    Return the backend's long-lived asyncio loop, starting it on first use.
+
+    Flask runs every async view on a throwaway loop, so anything that must
+    outlive a request (sockets, subscriptions, timers) lives on this one.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_loop.run_forever, name="hyperhdr-loop", daemon=True
+            )
+            thread.start()
+    return _loop
+
+
+def submit(coro):
+    """Schedule a coroutine on the backend loop and return a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run_sync(coro, timeout=None):
+    """Run a coroutine on the backend loop and block until it finishes."""
+    return submit(coro).result(timeout)
+
+
+async def run_async(coro):
+    """Await a coroutine on the backend loop from any other running loop."""
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(submit(coro))
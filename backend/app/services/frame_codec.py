@@ -0,0 +1,133 @@
+import zlib
+import struct
+import threading
+import numpy as np
+from collections import OrderedDict
+
+# magic, version, flags, seq, timestamp, led_count, keyframe seq
+HEADER = struct.Struct("<2sBBIdHI")
+MAGIC = b"LF"
+VERSION = 1
+
+FLAG_DELTA = 0x01  # payload is XOR against the referenced keyframe
+FLAG_DEFLATE = 0x02  # payload is zlib-compressed
+
+
+def _pack(flags, frame, keyframe_seq, payload) -> memoryview:
+    """
+    Write the header and `payload` into one buffer sized for both, so the
+    payload is copied once, straight into the message, with no intermediate
+    header object or concatenation.
+    """
+    buffer = bytearray(HEADER.size + len(payload))
+    HEADER.pack_into(
+        buffer, 0, MAGIC, VERSION, flags, frame.seq, frame.timestamp, frame.led_count, keyframe_seq
+    )
+    view = memoryview(buffer)
+    view[HEADER.size:] = payload
+    return view.toreadonly()
+
+
+def encode_keyframe(frame) -> memoryview:
+    """Header followed by the raw RGB bytes of `frame`."""
+    return _pack(0, frame, frame.seq, frame.rgb)
+
+
+def encode_delta(frame, keyframe, compress_level=1) -> memoryview:
+    """Header followed by the deflated XOR of `frame` against `keyframe`."""
+    current = np.frombuffer(frame.rgb, dtype=np.uint8)
+    reference = np.frombuffer(keyframe.rgb, dtype=np.uint8)
+    payload = zlib.compress(np.bitwise_xor(current, reference).tobytes(), compress_level)
+    return _pack(FLAG_DELTA | FLAG_DEFLATE, frame, keyframe.seq, payload)
+
+
+def decode_frame(data, keyframe_rgb=None):
+    """
+    Decode one binary frame.
+
+    Args:
+        data (bytes | memoryview): Encoded frame.
+        keyframe_rgb (bytes | None): RGB bytes of the referenced keyframe,
+            required for delta frames.
+
+    Returns:
+        dict: seq, timestamp, keyframe_seq, is_delta and the decoded `rgb` bytes.
+    """
+    view = memoryview(data)
+    magic, version, flags, seq, timestamp, led_count, keyframe_seq = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a binary LED frame")
+
+    payload = view[HEADER.size:]
+    if flags & FLAG_DEFLATE:
+        payload = zlib.decompress(payload)
+
+    if flags & FLAG_DELTA:
+        if keyframe_rgb is None:
+            raise ValueError(f"Delta frame {seq} needs keyframe {keyframe_seq}")
+        rgb = np.bitwise_xor(
+            np.frombuffer(payload, dtype=np.uint8),
+            np.frombuffer(keyframe_rgb, dtype=np.uint8),
+        ).tobytes()
+    else:
+        rgb = bytes(payload)
+
+    if len(rgb) != led_count * 3:
+        raise ValueError(f"Frame {seq} carries {len(rgb)} bytes for {led_count} LEDs")
+
+    return {
+        "seq": seq,
+        "timestamp": timestamp,
+        "keyframe_seq": keyframe_seq,
+        "is_delta": bool(flags & FLAG_DELTA),
+        "rgb": rgb,
+    }
+
+
+class FrameEncoder:
+    """
+    Shared binary encoder for the broadcast hub.
+
+    Every `keyframe_interval` frames (or when the LED count changes) a raw
+    keyframe is emitted; frames in between are deltas against it. Each
+    frame is encoded once and the result is reused for every viewer.
+    """
+
+    def __init__(self, keyframe_interval=30, delta=True):
+        self.keyframe_interval = keyframe_interval
+        self.delta = delta
+        self._lock = threading.Lock()
+        self._keyframe = None
+        self._keyframe_bytes = None
+        # Viewers can be a couple of frames apart, so keep a few encodings.
+        self._recent = OrderedDict()
+
+    def encode(self, frame):
+        """
+        Returns:
+            tuple: (payload, keyframe_seq, keyframe_payload). Viewers that have
+            not yet received `keyframe_seq` must be sent `keyframe_payload` first.
+        """
+        with self._lock:
+            cached = self._recent.get(frame.seq)
+            if cached is not None:
+                return cached
+
+            keyframe = self._keyframe
+            if (
+                not self.delta
+                or keyframe is None
+                or keyframe.led_count != frame.led_count
+                or abs(frame.seq - keyframe.seq) >= self.keyframe_interval
+            ):
+                payload = encode_keyframe(frame)
+                self._keyframe = keyframe = frame
+                self._keyframe_bytes = payload
+            else:
+                payload = encode_delta(frame, keyframe)
+
+            encoded = (payload, keyframe.seq, self._keyframe_bytes)
+            self._recent[frame.seq] = encoded
+            if len(self._recent) > 4:
+                self._recent.popitem(last=False)
+            return encoded
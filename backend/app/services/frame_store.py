@@ -0,0 +1,222 @@
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from .event_loop import get_loop, submit, run_async
+
+LEDSTREAM_UPDATE = "ledcolors-ledstream-update"
+
+
+@dataclass(frozen=True)
+class LedFrame:
+    """One LED stream update; `rgb` holds 3 bytes per LED."""
+
+    seq: int
+    timestamp: float
+    rgb: bytes
+
+    @property
+    def leds(self):
+        """Flat [r, g, b, r, g, b, ...] list as sent by HyperHDR."""
+        return list(self.rgb)
+
+    @property
+    def led_count(self):
+        return len(self.rgb) // 3
+
+
+class LedFrameStore:
+    """
+    Background subscriber to HyperHDR's LED stream.
+
+    Keeps the latest frame plus a bounded history of recent frames. The
+    stream is started on the first read and stopped again once nobody has
+    read a frame for `idle_timeout` seconds and no listener is attached.
+    """
+
+    def __init__(self, session, history_size=64, idle_timeout=30.0, frame_timeout=3.0):
+        self.session = session
+        self.idle_timeout = idle_timeout
+        self.frame_timeout = frame_timeout
+
+        self.latest = None
+        self.history = deque(maxlen=history_size)
+
+        self._seq = 0
+        self._received = 0
+        self._dropped = 0
+        self._suppressed = 0
+        self.replaying = False
+        self._arrivals = deque(maxlen=history_size)
+        self._subscribed = False
+        self._last_read = 0.0
+        self._frame_ready = None
+        self._idle_task = None
+        self._listeners = []
+
+        session.subscribe(LEDSTREAM_UPDATE, self._on_frame)
+        session.on_connect(self._on_connect)
+        session.on_disconnect(self._on_disconnect)
+
+    async def read(self, timeout=None):
+        """
+        Latest frame, subscribing first if needed. Must run on the backend loop.
+        """
+        timeout = timeout or self.frame_timeout
+        self._last_read = time.monotonic()
+
+        if self._frame_ready is None:
+            self._frame_ready = asyncio.Event()
+
+        if not self._subscribed:
+            await self._start_stream(timeout)
+
+        if self.latest is None:
+            await asyncio.wait_for(self._frame_ready.wait(), timeout)
+
+        return self.latest
+
+    async def get_frame(self, timeout=None):
+        """`read` from any thread's event loop."""
+        return await run_async(self.read(timeout))
+
+    def add_listener(self, callback):
+        """
+        Call `callback(frame)` on the backend loop for every new frame.
+        The stream stays subscribed while at least one listener is attached.
+        """
+        submit(self._attach(callback))
+
+    def remove_listener(self, callback):
+        submit(self._detach(callback))
+
+    def frames(self):
+        """Snapshot of the history window, oldest first."""
+        return list(self.history)
+
+    def _on_frame(self, data):
+        if not self._subscribed:
+            return
+
+        leds = data.get("result", {}).get("leds")
+        try:
+            rgb = bytes(leds)
+        except (TypeError, ValueError):
+            self._dropped += 1
+            return
+
+        if not rgb or len(rgb) % 3:
+            self._dropped += 1
+            return
+
+        # A replay owns the pipeline until it ends; live frames would
+        # interleave with the recorded ones.
+        if self.replaying:
+            self._suppressed += 1
+            return
+
+        self._received += 1
+        self.publish(rgb)
+
+    def publish(self, rgb):
+        """
+        Hand a frame to readers, history and listeners as if HyperHDR had
+        sent it. Must run on the backend loop.
+        """
+        self._seq += 1
+        frame = LedFrame(self._seq, time.time(), rgb)
+        self.latest = frame
+        self.history.append(frame)
+        self._arrivals.append(time.monotonic())
+
+        if self._frame_ready is not None:
+            self._frame_ready.set()
+
+        for callback in list(self._listeners):
+            try:
+                callback(frame)
+            except Exception as e:
+                print(f"LED frame listener failed: {e}")
+
+    async def _attach(self, callback):
+        self._listeners.append(callback)
+        self._last_read = time.monotonic()
+        if self._frame_ready is None:
+            self._frame_ready = asyncio.Event()
+        if not self._subscribed:
+            try:
+                await self._start_stream(self.frame_timeout)
+            except Exception as e:
+                # Retried from _on_connect once HyperHDR is reachable again.
+                print(f"Failed to start LED stream: {e}")
+
+    async def _detach(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+        self._last_read = time.monotonic()
+
+    async def _on_connect(self):
+        if self._listeners and not self._subscribed:
+            try:
+                await self._start_stream(self.frame_timeout)
+            except Exception as e:
+                print(f"Failed to resume LED stream: {e}")
+
+    def _on_disconnect(self):
+        # The next connection starts without any stream subscription.
+        self._subscribed = False
+        self.latest = None
+        if self._frame_ready is not None:
+            self._frame_ready.clear()
+
+    async def _start_stream(self, timeout):
+        self._subscribed = True
+        self._frame_ready.clear()
+        try:
+            await self.session.request(
+                {"command": "ledcolors", "subcommand": "ledstream-start"}, timeout
+            )
+        except BaseException:
+            self._subscribed = False
+            raise
+
+        if self._idle_task is None or self._idle_task.done():
+            self._idle_task = get_loop().create_task(self._stop_when_idle())
+
+    async def _stop_when_idle(self):
+        while self._subscribed:
+            idle_for = time.monotonic() - self._last_read
+            if idle_for < self.idle_timeout:
+                await asyncio.sleep(self.idle_timeout - idle_for)
+                continue
+
+            if self._listeners:
+                await asyncio.sleep(self.idle_timeout)
+                continue
+
+            self._subscribed = False
+            self.latest = None
+            try:
+                await self.session.request(
+                    {"command": "ledcolors", "subcommand": "ledstream-stop"}
+                )
+            except Exception as e:
+                print(f"Failed to stop LED stream: {e}")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        recent = [t for t in self._arrivals if now - t <= 2.0]
+        fps = (len(recent) - 1) / (recent[-1] - recent[0]) if len(recent) > 1 and recent[-1] > recent[0] else 0.0
+
+        return {
+            "subscribed": self._subscribed,
+            "fps": round(fps, 2),
+            "received": self._received,
+            "dropped": self._dropped,
+            "suppressed": self._suppressed,
+            "replaying": self.replaying,
+            "frame_age": round(time.time() - self.latest.timestamp, 3) if self.latest else None,
+            "history": len(self.history),
+            "led_count": self.latest.led_count if self.latest else None,
+            "listeners": len(self._listeners),
+        }
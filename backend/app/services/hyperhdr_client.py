@@ -0,0 +1,272 @@
+import abc
+import time
+import asyncio
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from .event_loop import run_sync
+
+# (connect, read) timeouts in seconds. serverinfo replies carry the whole LED
+# layout and effect list, so they get a longer read budget than writes.
+DEFAULT_TIMEOUT = (1.5, 3.0)
+COMMAND_TIMEOUTS = {
+    "serverinfo": (1.5, 5.0),
+    "sysinfo": (1.5, 3.0),
+    "color": (1.5, 3.0),
+    "effect": (1.5, 3.0),
+    "clear": (1.5, 3.0),
+    "adjustment": (1.5, 3.0),
+    "componentstate": (1.5, 5.0),
+}
+
+# Only commands without side effects are safe to resend after a dropped
+# connection or timeout.
+IDEMPOTENT_COMMANDS = {"serverinfo", "sysinfo"}
+
+
+class CommandStats:
+    """Thread-safe per-command latency counters."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, command, elapsed, failed=False, retried=False):
+        with self._lock:
+            stat = self._stats.setdefault(
+                command,
+                {"count": 0, "errors": 0, "retried": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0},
+            )
+            elapsed_ms = elapsed * 1000
+            stat["count"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["last_ms"] = elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            if failed:
+                stat["errors"] += 1
+            if retried:
+                stat["retried"] += 1
+
+    def snapshot(self) -> dict:
+        """Per-command latency counters in milliseconds."""
+        with self._lock:
+            return {
+                command: {
+                    **stat,
+                    "avg_ms": round(stat["total_ms"] / stat["count"], 3) if stat["count"] else 0.0,
+                    "total_ms": round(stat["total_ms"], 3),
+                    "max_ms": round(stat["max_ms"], 3),
+                    "last_ms": round(stat["last_ms"], 3),
+                }
+                for command, stat in self._stats.items()
+            }
+
+
+def adjustment_command(**adjustment) -> dict:
+    return {"command": "adjustment", "adjustment": adjustment}
+
+
+def color_command(rgb: list[int], priority: int = 100, duration_ms: int = 0) -> dict:
+    return {"command": "color", "color": rgb, "priority": priority, "duration": duration_ms}
+
+
+def effect_command(name: str, priority: int = 100, duration_ms: int = 0) -> dict:
+    return {
+        "command": "effect",
+        "effect": {"name": name},
+        "priority": priority,
+        "duration": duration_ms,
+    }
+
+
+def clear_command(priority: int = 100) -> dict:
+    return {"command": "clear", "priority": priority}
+
+
+def component_state_command(component: str, state: bool) -> dict:
+    return {
+        "command": "componentstate",
+        "componentstate": {"component": component, "state": state},
+    }
+
+
+class HyperHDRCommands(abc.ABC):
+    """
+    Typed JSON-RPC commands on top of a transport's `send(payload)`.
+
+    On the async client every method returns an awaitable, since `send`
+    is a coroutine there. The `*_command` builders above produce the same
+    payloads for batching.
+    """
+
+    breaker = None
+
+    @abc.abstractmethod
+    def send(self, payload: dict):
+        """Send one raw JSON-RPC command; a coroutine on async transports."""
+
+    def _check_breaker(self):
+        if self.breaker is not None:
+            self.breaker.check()
+
+    def _record_success(self):
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _record_failure(self, error):
+        if self.breaker is not None:
+            self.breaker.record_failure(error)
+
+    def serverinfo(self):
+        return self.send({"command": "serverinfo"})
+
+    def sysinfo(self):
+        return self.send({"command": "sysinfo"})
+
+    def set_adjustment(self, **adjustment):
+        return self.send(adjustment_command(**adjustment))
+
+    def set_color(self, rgb: list[int], priority: int = 100, duration_ms: int = 0):
+        return self.send(color_command(rgb, priority, duration_ms))
+
+    def set_effect(self, name: str, priority: int = 100, duration_ms: int = 0):
+        return self.send(effect_command(name, priority, duration_ms))
+
+    def clear(self, priority: int = 100):
+        return self.send(clear_command(priority))
+
+    def set_component_state(self, component: str, state: bool):
+        return self.send(component_state_command(component, state))
+
+    def stats(self) -> dict:
+        return self._stats.snapshot()
+
+
+class HyperHDRClient(HyperHDRCommands):
+    """
+    Pooled keep-alive client for the HyperHDR JSON-RPC endpoint.
+
+    A single requests.Session is shared by every caller so consecutive
+    commands reuse the same TCP connection instead of opening a new one.
+    """
+
+    def __init__(self, host, port, pool_size=4, read_retries=2, retry_backoff=0.1, breaker=None):
+        self.breaker = breaker
+        self.base_url = f"http://{host}:{port}"
+        self.url = f"{self.base_url}/json-rpc"
+        self.read_retries = read_retries
+        self.retry_backoff = retry_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+        self._stats = CommandStats()
+
+    def send(self, payload: dict):
+        """
+        Send a raw JSON-RPC command and return the decoded reply.
+
+        Idempotent reads are retried on connection errors and timeouts;
+        writes are sent exactly once.
+        """
+        command = payload["command"]
+        timeout = COMMAND_TIMEOUTS.get(command, DEFAULT_TIMEOUT)
+        attempts = 1 + (self.read_retries if command in IDEMPOTENT_COMMANDS else 0)
+        self._check_breaker()
+
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                response = self.session.post(self.url, json=payload, timeout=timeout)
+                response.raise_for_status()
+                data = response.json()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._stats.record(command, time.perf_counter() - start, failed=True)
+                if attempt + 1 >= attempts:
+                    self._record_failure(e)
+                    raise
+                time.sleep(self.retry_backoff * (2**attempt))
+                continue
+            except requests.RequestException:
+                self._stats.record(command, time.perf_counter() - start, failed=True)
+                raise
+
+            self._stats.record(command, time.perf_counter() - start, retried=attempt > 0)
+            self._record_success()
+            return data
+
+
+class AsyncHyperHDRClient(HyperHDRCommands):
+    """
+    asyncio-native JSON-RPC client speaking over the shared WebSocket session.
+
+    Awaiting a command never blocks the caller's event loop, so independent
+    commands can run concurrently with `asyncio.gather`.
+    """
+
+    def __init__(self, session, read_retries=2, retry_backoff=0.1, breaker=None):
+        self.breaker = breaker
+        self.session = session
+        self.read_retries = read_retries
+        self.retry_backoff = retry_backoff
+        self._stats = CommandStats()
+
+    async def send(self, payload: dict):
+        command = payload["command"]
+        timeout = COMMAND_TIMEOUTS.get(command, DEFAULT_TIMEOUT)[1]
+        attempts = 1 + (self.read_retries if command in IDEMPOTENT_COMMANDS else 0)
+        self._check_breaker()
+
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                data = await self.session.call(payload, timeout)
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                self._stats.record(command, time.perf_counter() - start, failed=True)
+                if attempt + 1 >= attempts:
+                    self._record_failure(e)
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2**attempt))
+                continue
+
+            self._stats.record(command, time.perf_counter() - start, retried=attempt > 0)
+            self._record_success()
+            return data
+
+    async def batch(self, payloads: list[dict]):
+        """
+        Send `payloads` pipelined over the WebSocket and return their replies
+        in order. Batches are never retried since they usually contain writes.
+        """
+        timeout = max(COMMAND_TIMEOUTS.get(p["command"], DEFAULT_TIMEOUT)[1] for p in payloads)
+        self._check_breaker()
+        start = time.perf_counter()
+        try:
+            replies = await self.session.call_batch(payloads, timeout)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            self._stats.record("batch", time.perf_counter() - start, failed=True)
+            self._record_failure(e)
+            raise
+
+        self._stats.record("batch", time.perf_counter() - start)
+        self._record_success()
+        return replies
+
+
+class BlockingSessionClient(HyperHDRCommands):
+    """
+    Synchronous facade over an AsyncHyperHDRClient.
+
+    HTTP JSON-RPC always talks to HyperHDR's first instance, so targets that
+    select another instance route their blocking calls through the
+    WebSocket session (which has switched instance) on the backend loop.
+    """
+
+    def __init__(self, async_client):
+        self.async_client = async_client
+        self.breaker = async_client.breaker
+        self._stats = async_client._stats
+
+    def send(self, payload: dict):
+        return run_sync(self.async_client.send(payload))
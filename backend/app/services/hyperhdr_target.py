@@ -0,0 +1,238 @@
+import re
+import asyncio
+from .hyperhdr_client import HyperHDRClient, AsyncHyperHDRClient, BlockingSessionClient
+from .circuit_breaker import CircuitBreaker, tcp_probe
+from .hyperhdr_ws import HyperHDRSession
+from .serverinfo_snapshot import ServerInfoSnapshot
+from .frame_store import LedFrameStore
+from .led_broadcast import LedBroadcastHub
+from .led_analysis import LedGeometryCache
+from .effects_catalog import EffectsCatalog
+from .write_coalescer import WriteCoalescer
+from .state_shadow import StateShadow, LastAppliedMemo
+from .led_push import LedPushGateway
+from .color_transition import TransitionEngine
+from .led_recorder import LedRecorder, LedReplay
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+TARGET_PATTERN = re.compile(r"^(?P<name>[\w-]+)=(?P<host>[^:/]+)(?::(?P<port>\d+))?(?:/(?P<instance>\d+))?$")
+
+
+class UnknownTarget(LookupError):
+    pass
+
+
+def parse_targets(spec, default_port=8090):
+    """
+    Parse a target list such as
+    "living=localhost:8090,bar=localhost:8090/1,garage=192.168.1.50".
+
+    Each entry is `name=host[:port][/instance]`; the instance index selects
+    one of several LED instances of the same HyperHDR server.
+
+    Returns:
+        list[tuple]: (name, host, port, instance) in the given order.
+    """
+    targets = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        match = TARGET_PATTERN.match(entry)
+        if match is None:
+            raise ValueError(f"Invalid HyperHDR target '{entry}', expected name=host[:port][/instance]")
+        targets.append((
+            match["name"],
+            match["host"],
+            int(match["port"] or default_port),
+            int(match["instance"] or 0),
+        ))
+
+    if not targets:
+        raise ValueError("No HyperHDR targets configured")
+    return targets
+
+
+class HyperHDRTarget:
+    """
+    Everything the backend keeps per HyperHDR instance: pooled HTTP client,
+    WebSocket session, circuit breaker, serverinfo snapshot, state shadow,
+    effects catalog, LED frame store and broadcast hub.
+    """
+
+    def __init__(
+        self,
+        name,
+        host,
+        port,
+        instance=0,
+        serverinfo_ttl=1.0,
+        frame_history=64,
+        stream_idle_timeout=30.0,
+        coalesce_window=0.05,
+        transition_fps=30,
+    ):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.instance = instance
+
+        # Shared by both clients and the LED stream: once HyperHDR stops
+        # answering, every path fails fast until a background probe sees it.
+        self.breaker = CircuitBreaker(lambda: tcp_probe(self.host, self.port))
+
+        self.ws = HyperHDRSession(host, port, instance)
+        self.async_client = AsyncHyperHDRClient(self.ws, breaker=self.breaker)
+        if instance:
+            self.client = BlockingSessionClient(self.async_client)
+        else:
+            self.client = HyperHDRClient(host, port, breaker=self.breaker)
+
+        self.snapshot = ServerInfoSnapshot(
+            self.client.serverinfo,
+            serverinfo_ttl,
+            fetch_async=self.async_client.serverinfo,
+        )
+        self.geometry = LedGeometryCache()
+
+        self.effects = EffectsCatalog(
+            self.snapshot.get, self.snapshot.get_async, identify_async=self.async_client.sysinfo
+        )
+        self.snapshot.add_listener(self.effects.observe)
+        self.ws.on_connect(self.effects.on_reconnect)
+
+        self.shadow = StateShadow(self.ws)
+        self.shadow.add_listener(self._on_shadow_change)
+        self.applied = LastAppliedMemo(self.shadow)
+
+        self.frame_store = LedFrameStore(
+            self.ws,
+            history_size=frame_history,
+            idle_timeout=stream_idle_timeout,
+        )
+        self.broadcast = LedBroadcastHub(self.frame_store)
+        self.recorder = LedRecorder(self.frame_store)
+        self.replay = LedReplay(self.frame_store)
+
+        self.coalescer = WriteCoalescer(self._send_adjustment, coalesce_window)
+        self.pushers = set()
+        self.transitions = TransitionEngine(self.ws, transition_fps)
+
+    @property
+    def is_local(self):
+        return self.host in LOCAL_HOSTS
+
+    def _on_shadow_change(self, command, info):
+        if command == "effects-update":
+            self.effects.invalidate()
+
+    async def _send_adjustment(self, key, value):
+        try:
+            return await self.async_client.set_adjustment(**{key: value})
+        finally:
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop cached serverinfo after this backend wrote to HyperHDR: the
+        snapshot is refetched and the shadow is read back before either is
+        served again.
+        """
+        self.snapshot.invalidate()
+        self.shadow.mark_stale()
+
+    def current_info(self):
+        """
+        Serverinfo for read routes: the push-driven shadow when it is in sync,
+        otherwise the polled snapshot.
+        """
+        self.breaker.check()
+        return self.shadow.info() or self.snapshot.get()
+
+    async def current_info_async(self):
+        self.breaker.check()
+        return self.shadow.info() or await self.snapshot.get_async()
+
+    async def get_frame(self):
+        """
+        Latest LED frame from the background frame store.
+
+        The stream subscription stays open while frames are being read, so
+        only the first call after an idle period waits for HyperHDR.
+        """
+        self.breaker.check()
+        try:
+            frame = await self.frame_store.get_frame()
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return frame
+
+    def open_push(self, fps, priority) -> LedPushGateway:
+        """Start a paced push gateway for one client connection."""
+        gateway = LedPushGateway(self.ws, fps, priority).start()
+        self.pushers.add(gateway)
+        return gateway
+
+    def close_push(self, gateway):
+        self.pushers.discard(gateway)
+        gateway.close()
+        self.invalidate()
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "host": self.host,
+            "port": self.port,
+            "instance": self.instance,
+            "available": not self.breaker.is_open,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "target": self.describe(),
+            "breaker": self.breaker.stats(),
+            "client": self.client.stats(),
+            "async_client": self.async_client.stats(),
+            "serverinfo": self.snapshot.stats(),
+            "effects": self.effects.stats(),
+            "coalescer": self.coalescer.stats(),
+            "websocket": self.ws.stats(),
+            "shadow": self.shadow.stats(),
+            "applied": self.applied.stats(),
+            "frames": self.frame_store.stats(),
+            "broadcast": self.broadcast.stats(),
+            "recorder": self.recorder.stats(),
+            "replay": self.replay.stats(),
+            "push": [gateway.stats() for gateway in list(self.pushers)],
+            "transitions": self.transitions.stats(),
+        }
+
+
+class TargetRegistry:
+    """HyperHDR targets by name; the first configured one is the default."""
+
+    def __init__(self, targets):
+        self.targets = {target.name: target for target in targets}
+        self.default = targets[0]
+
+    def get(self, name=None) -> HyperHDRTarget:
+        if not name:
+            return self.default
+        try:
+            return self.targets[name]
+        except KeyError:
+            raise UnknownTarget(
+                f"Unknown instance '{name}', expected one of: {', '.join(self.targets)}"
+            ) from None
+
+    def select(self, names=None) -> list:
+        """Targets for a fan-out; all of them when `names` is empty."""
+        if not names:
+            return list(self.targets.values())
+        return [self.get(name) for name in names]
+
+    def local(self) -> list:
+        return [target for target in self.targets.values() if target.is_local]
+
+    def __iter__(self):
+        return iter(self.targets.values())
@@ -0,0 +1,256 @@
+import json
+import asyncio
+import itertools
+import websockets
+from collections import defaultdict
+from .event_loop import get_loop, submit, run_async, run_sync
+
+
+class HyperHDRSession:
+    """
+    Long-lived, auto-reconnecting WebSocket connection to HyperHDR.
+
+    Replies are matched to their request through the JSON-RPC `tan` field.
+    Push messages (`*-update` commands) are handed to the listeners
+    registered for that command. All socket work runs on the backend loop.
+    """
+
+    def __init__(self, host, port, instance=0, open_timeout=3.0, request_timeout=5.0, max_backoff=10.0):
+        self.uri = f"ws://{host}:{port}"
+        self.instance = instance
+        self.open_timeout = open_timeout
+        self.request_timeout = request_timeout
+        self.max_backoff = max_backoff
+
+        self.connects = 0
+        self.last_error = None
+
+        self._ws = None
+        self._connected = None
+        self._settled = None
+        self._runner = None
+        self._tan = itertools.count(1)
+        self._pending = {}
+        self._listeners = defaultdict(list)
+        self._on_connect = []
+        self._on_disconnect = []
+
+    @property
+    def is_connected(self):
+        return self._ws is not None
+
+    def start(self):
+        """Start the connection loop if it is not running yet. Thread-safe."""
+        if self._runner is None:
+            submit(self._ensure_running())
+
+    def subscribe(self, command, callback):
+        """Call `callback(message)` on the backend loop for every `command` push."""
+        self._listeners[command].append(callback)
+
+    def unsubscribe(self, command, callback):
+        if callback in self._listeners[command]:
+            self._listeners[command].remove(callback)
+
+    def on_connect(self, callback):
+        """Register an async callback that runs after every (re)connect."""
+        self._on_connect.append(callback)
+
+    def on_disconnect(self, callback):
+        """Register a plain callback that runs whenever the connection drops."""
+        self._on_disconnect.append(callback)
+
+    async def wait_connected(self, timeout=None):
+        """
+        Start the connection loop if needed and wait for a connection attempt
+        in progress. Between attempts, while HyperHDR is unreachable, this
+        fails right away instead of waiting out `timeout`.
+
+        Raises:
+            ConnectionError: If the last connection attempt failed or the
+                connection dropped.
+        """
+        await self._ensure_running()
+        if self._connected.is_set():
+            return
+        await asyncio.wait_for(self._settled.wait(), timeout or self.request_timeout)
+        if not self._connected.is_set():
+            raise ConnectionError(f"HyperHDR WebSocket is not connected: {self.last_error or 'closed'}")
+
+    async def request(self, payload: dict, timeout=None):
+        """
+        Send a command and wait for the reply carrying the same `tan`.
+        Must be awaited on the backend loop; see `call`/`call_sync` otherwise.
+        """
+        timeout = timeout or self.request_timeout
+        await self.wait_connected(timeout)
+
+        tan = next(self._tan)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[tan] = future
+        try:
+            await self._send(json.dumps({**payload, "tan": tan}))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(tan, None)
+
+    async def request_batch(self, payloads: list[dict], timeout=None):
+        """
+        Pipeline several commands: all of them are written back to back
+        before any reply is awaited, so the batch costs one round trip.
+        Replies are returned in the order of `payloads`.
+        """
+        timeout = timeout or self.request_timeout
+        await self.wait_connected(timeout)
+
+        loop = asyncio.get_running_loop()
+        tans = [next(self._tan) for _ in payloads]
+        futures = []
+        for tan in tans:
+            futures.append(loop.create_future())
+            self._pending[tan] = futures[-1]
+        try:
+            for tan, payload in zip(tans, payloads):
+                await self._send(json.dumps({**payload, "tan": tan}))
+            return await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        finally:
+            for tan in tans:
+                self._pending.pop(tan, None)
+
+    async def call_batch(self, payloads: list[dict], timeout=None):
+        return await run_async(self.request_batch(payloads, timeout))
+
+    def call_batch_sync(self, payloads: list[dict], timeout=None):
+        return run_sync(self.request_batch(payloads, timeout))
+
+    async def send_nowait(self, payload: dict):
+        """
+        Write a command without waiting for its reply. Meant for high-rate
+        traffic such as pushed LED frames; the reply carries no tan we wait
+        for and is discarded on arrival. Must be awaited on the backend loop.
+        """
+        await self._send(json.dumps(payload, separators=(",", ":")))
+
+    async def _send(self, message):
+        """
+        Write one message, reporting a dropped connection as ConnectionError
+        like every other transport failure, so callers retry it and the
+        circuit breaker counts it.
+        """
+        ws = self._ws
+        if ws is None:
+            raise ConnectionError("HyperHDR WebSocket is not connected")
+        try:
+            await ws.send(message)
+        except websockets.ConnectionClosed as e:
+            raise ConnectionError(f"HyperHDR WebSocket closed: {e}") from e
+
+    async def call(self, payload: dict, timeout=None):
+        return await run_async(self.request(payload, timeout))
+
+    def call_sync(self, payload: dict, timeout=None):
+        return run_sync(self.request(payload, timeout))
+
+    async def _ensure_running(self):
+        if self._runner is None:
+            self._connected = asyncio.Event()
+            # Set while no connection attempt is in progress.
+            self._settled = asyncio.Event()
+            self._runner = get_loop().create_task(self._run())
+
+    async def _run(self):
+        backoff = 0.5
+        while True:
+            self._settled.clear()
+            try:
+                async with websockets.connect(
+                    self.uri, open_timeout=self.open_timeout, max_size=None
+                ) as ws:
+                    if self.instance:
+                        await self._switch_instance(ws)
+
+                    self._ws = ws
+                    self.connects += 1
+                    self.last_error = None
+                    backoff = 0.5
+                    self._connected.set()
+                    self._settled.set()
+
+                    for callback in self._on_connect:
+                        get_loop().create_task(callback())
+
+                    async for message in ws:
+                        self._dispatch(message)
+
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                self.last_error = str(e)
+
+            finally:
+                was_connected = self._ws is not None
+                self._ws = None
+                self._connected.clear()
+                self._settled.set()
+                if was_connected:
+                    for callback in self._on_disconnect:
+                        callback()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("HyperHDR WebSocket closed"))
+                self._pending.clear()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _switch_instance(self, ws):
+        """
+        Point this connection at a non-default HyperHDR instance. The choice
+        is per connection, so it is repeated after every reconnect before
+        any request is let through.
+        """
+        await ws.send(json.dumps({
+            "command": "instance",
+            "subcommand": "switchTo",
+            "instance": self.instance,
+            "tan": 0,
+        }))
+        while True:
+            reply = json.loads(await asyncio.wait_for(ws.recv(), self.open_timeout))
+            if reply.get("command") == "instance-switchTo":
+                break
+        if not reply.get("success"):
+            raise websockets.WebSocketException(
+                f"Cannot switch to instance {self.instance}: {reply.get('error')}"
+            )
+
+    def _dispatch(self, message):
+        if isinstance(message, bytes):
+            return
+
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            return
+
+        command = data.get("command", "")
+
+        # Stream updates reuse the tan of the request that started them,
+        # so route them by command before looking at pending replies.
+        if command.endswith("-update"):
+            for callback in list(self._listeners[command]):
+                try:
+                    callback(data)
+                except Exception as e:
+                    print(f"Listener for {command} failed: {e}")
+            return
+
+        future = self._pending.get(data.get("tan"))
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.is_connected,
+            "connects": self.connects,
+            "pending": len(self._pending),
+            "last_error": self.last_error,
+        }
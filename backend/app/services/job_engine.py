@@ -0,0 +1,285 @@
+import os
+import copy
+import json
+import time
+import uuid
+import queue
+import threading
+import subprocess
+from werkzeug.exceptions import HTTPException
+
+JOBS_FILE = os.getenv("HYPERHDR_JOBS_FILE", os.path.expanduser("~/.hyperhdr-controller/jobs.json"))
+
+TERMINAL_STATES = {"succeeded", "failed", "interrupted"}
+
+
+class JobBusy(RuntimeError):
+    """A job of the same kind is already queued or running."""
+
+
+def describe_error(error):
+    if isinstance(error, subprocess.CalledProcessError):
+        return (error.stderr or "").strip() or str(error)
+    if isinstance(error, HTTPException):
+        return error.description
+    return str(error) or type(error).__name__
+
+
+class JobContext:
+    """Handed to every step: the job's parameters and a way to report progress."""
+
+    def __init__(self, engine, job_id, kind, params):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self._engine = engine
+
+    def progress(self, **fields):
+        """Merge `fields` (bytes_downloaded, dpkg_phase, ...) into the job's progress."""
+        self._engine._progress(self.id, fields)
+
+
+class JobEngine:
+    """
+    Runs long operations (package installs, resets, service restarts) on a
+    worker thread, so the request that starts one returns a job ID at once.
+
+    Jobs run one at a time, in submission order, as a list of named steps;
+    each step's start, end and duration is recorded. The job list is
+    persisted to `path` after every state change, written to a temporary
+    file and renamed over the old one, so a crash never leaves a torn file.
+    Jobs that were still queued or running when the backend stopped are
+    marked "interrupted" on the next start.
+
+    Progress reported in between (download bytes, dpkg phase) is written at
+    most every `save_interval` seconds; waiters are woken on every change.
+    """
+
+    def __init__(self, path, history=50, save_interval=0.5):
+        self.path = path
+        self.history = history
+        self.save_interval = save_interval
+
+        self.version = 0
+        self.last_error = None
+
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._last_save = 0.0
+
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load jobs from {self.path}: {e}")
+            return
+
+        self.version = data.get("version", 0)
+        now = time.time()
+        for job in data.get("jobs", []):
+            if job["status"] not in TERMINAL_STATES:
+                job["status"] = "interrupted"
+                job["error"] = "Backend stopped before the job finished"
+                job["finished_at"] = now
+                for step in job["steps"]:
+                    if step["status"] == "running":
+                        step["status"] = "interrupted"
+            self._jobs[job["id"]] = job
+
+    def _save(self):
+        """Write the job list atomically. Called with the lock held."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "jobs": list(self._jobs.values())}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.last_error = None
+        except OSError as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"Warning: Could not save jobs to {self.path}: {e}")
+        self._last_save = time.monotonic()
+
+    def _publish(self, job, save=True):
+        """Bump the job's version and wake waiters. Called with the lock held."""
+        self.version += 1
+        job["version"] = self.version
+        self._cond.notify_all()
+        if save or time.monotonic() - self._last_save >= self.save_interval:
+            self._save()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in TERMINAL_STATES]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def submit(self, kind, steps, params=None, cleanup=None):
+        """
+        Queue a job.
+
+        Args:
+            kind (str): Job type, e.g. "install". Only one job per kind may
+                be queued or running at a time.
+            steps (list[tuple[str, callable]]): (name, fn) pairs run in order;
+                each fn takes a JobContext and may return a JSON-serializable
+                result. The first exception fails the job.
+            params (dict | None): JSON-serializable parameters, kept with the job.
+            cleanup (callable | None): Run with the JobContext after the last
+                step, whether the job succeeded or not.
+
+        Returns:
+            dict: Snapshot of the queued job.
+
+        Raises:
+            JobBusy: If a job of the same kind is already queued or running.
+        """
+        with self._cond:
+            if any(job["kind"] == kind and job["status"] not in TERMINAL_STATES for job in self._jobs.values()):
+                raise JobBusy(f"A '{kind}' job is already in progress")
+
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "kind": kind,
+                "status": "queued",
+                "params": params or {},
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "duration": None,
+                "current_step": None,
+                "error": None,
+                "steps": [
+                    {"name": name, "status": "pending", "started_at": None, "duration": None, "result": None}
+                    for name, _ in steps
+                ],
+                "progress": {},
+            }
+            self._jobs[job["id"]] = job
+            self._prune()
+            self._publish(job)
+            snapshot = copy.deepcopy(job)
+
+        self._queue.put((job["id"], steps, cleanup))
+        self._start_worker()
+        return snapshot
+
+    def _start_worker(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="job-engine", daemon=True)
+                self._thread.start()
+
+    def _work(self):
+        while True:
+            job_id, steps, cleanup = self._queue.get()
+            try:
+                self._run(job_id, steps, cleanup)
+            except Exception as e:
+                print(f"Job {job_id} crashed: {e}")
+
+    def _run(self, job_id, steps, cleanup):
+        with self._cond:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            self._publish(job)
+            context = JobContext(self, job_id, job["kind"], job["params"])
+
+        started = time.monotonic()
+        error = None
+        for step, (name, fn) in zip(job["steps"], steps):
+            with self._cond:
+                job["current_step"] = name
+                step["status"] = "running"
+                step["started_at"] = time.time()
+                self._publish(job)
+
+            step_started = time.monotonic()
+            try:
+                result = fn(context)
+            except Exception as e:
+                error = describe_error(e)
+
+            with self._cond:
+                step["duration"] = round(time.monotonic() - step_started, 3)
+                if error is None:
+                    step["status"] = "succeeded"
+                    step["result"] = result
+                else:
+                    step["status"] = "failed"
+                    step["error"] = error
+                self._publish(job)
+
+            if error is not None:
+                break
+
+        if cleanup is not None:
+            try:
+                cleanup(context)
+            except Exception as e:
+                print(f"Warning: Cleanup of job {job_id} failed: {e}")
+
+        with self._cond:
+            job["status"] = "succeeded" if error is None else "failed"
+            job["error"] = error
+            job["current_step"] = None
+            job["finished_at"] = time.time()
+            job["duration"] = round(time.monotonic() - started, 3)
+            self._publish(job)
+
+    def _progress(self, job_id, fields):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["progress"].update(fields)
+            self._publish(job, save=False)
+
+    def get(self, job_id):
+        """Snapshot of a job, or None if it is unknown or pruned."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job is not None else None
+
+    def list(self) -> list:
+        """Snapshots of all known jobs, newest first."""
+        with self._cond:
+            return [copy.deepcopy(job) for job in reversed(self._jobs.values())]
+
+    def wait_for_change(self, job_id, since, timeout):
+        """
+        Block until the job's version moves past `since`. A finished job
+        returns at once.
+
+        Returns:
+            dict | None: The job snapshot, or None if it is unknown.
+        """
+        def changed():
+            job = self._jobs.get(job_id)
+            return job is None or job["version"] > since or job["status"] in TERMINAL_STATES
+
+        with self._cond:
+            self._cond.wait_for(changed, timeout)
+            return self.get(job_id)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "path": self.path,
+                "version": self.version,
+                "jobs": len(self._jobs),
+                "queued": self._queue.qsize(),
+                "last_error": self.last_error,
+            }
+
+
+jobs = JobEngine(JOBS_FILE)
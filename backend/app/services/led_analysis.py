@@ -0,0 +1,301 @@
+import math
+import hashlib
+import threading
+import numpy as np
+
+# Colors HyperHDR shows on the capture card's "no signal" test pattern.
+FALLBACK_PALETTE = np.array(
+    [
+        (255, 255, 6),  # Bright yellow (slightly greenish)
+        (255, 0, 255),  # Pure magenta
+        (0, 10, 255),  # Deep blue (slightly purplish)
+        (0, 255, 0),  # Pure green
+        (6, 255, 255),  # Cyan / aqua
+        (255, 11, 0),  # Bright red (slightly orange)
+    ],
+    dtype=np.uint8,
+)
+
+# Every palette color must cover at least this share of a side's LEDs.
+FALLBACK_MIN_SHARE = 0.09
+
+
+def pack_rgb(colors):
+    """Pack an (N, 3) uint8 array into one uint32 key per LED."""
+    colors = colors.astype(np.uint32)
+    return (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+
+
+FALLBACK_KEYS = pack_rgb(FALLBACK_PALETTE)
+
+
+def frame_to_array(rgb, led_count=None):
+    """
+    View a flat RGB frame as an (N, 3) uint8 array without copying.
+
+    Args:
+        rgb (bytes | list[int]): Flat [r, g, b, ...] LED colors.
+        led_count (int | None): Number of LEDs the layout expects.
+    """
+    if isinstance(rgb, (bytes, bytearray, memoryview)):
+        colors = np.frombuffer(rgb, dtype=np.uint8)
+    else:
+        colors = np.asarray(rgb, dtype=np.uint8)
+
+    colors = colors[: len(colors) - len(colors) % 3].reshape(-1, 3)
+
+    if led_count is not None:
+        if len(colors) < led_count:
+            raise ValueError(
+                f"LED frame has {len(colors)} colors but the layout has {led_count} LEDs"
+            )
+        colors = colors[:led_count]
+
+    return colors
+
+
+class LedLayout:
+    """
+    LED positions from serverinfo held as NumPy arrays.
+
+    Side classification mirrors `get_leds_by_direction` in
+    benchmarks/fallback_reference.py: an LED belongs to the top/bottom edge
+    when its horizontal start lies inside (0.05, 0.95) and to the left/right
+    edge when its vertical start does.
+    """
+
+    def __init__(self, leds):
+        self.count = len(leds)
+        self.bounds = np.array(
+            [(led["hmin"], led["hmax"], led["vmin"], led["vmax"]) for led in leds],
+            dtype=np.float64,
+        ).reshape(self.count, 4)
+        self.hmin, self.hmax, self.vmin, self.vmax = self.bounds.T
+
+    def fingerprint(self):
+        """Stable hash of the LED coordinates, used as the geometry cache key."""
+        return hashlib.sha1(self.bounds.tobytes()).hexdigest()
+
+    def side_masks(
+        self,
+        top_threshold=0.05,
+        bottom_threshold=0.95,
+        left_threshold=0.05,
+        right_threshold=0.95,
+    ):
+        horizontal = (self.hmin > 0.05) & (self.hmin < 0.95)
+        vertical = (self.vmin > 0.05) & (self.vmin < 0.95)
+
+        return {
+            "top": horizontal & (self.vmin <= top_threshold),
+            "bottom": horizontal & (self.vmax >= bottom_threshold),
+            "left": vertical & (self.hmin <= left_threshold),
+            "right": vertical & (self.hmax >= right_threshold),
+        }
+
+
+def count_palette_matches(colors, sides, palette_keys=FALLBACK_KEYS):
+    """
+    Count, per side, how many LEDs show each palette color.
+
+    Args:
+        colors (np.ndarray): (N, 3) uint8 LED colors.
+        sides (dict): Side name to boolean mask or index array over the N LEDs.
+
+    Returns:
+        dict: Side name to an array with one count per palette color.
+    """
+    matches = pack_rgb(colors)[:, None] == palette_keys[None, :]
+
+    counts = {}
+    for side, selector in sides.items():
+        counts[side] = np.count_nonzero(matches[selector], axis=0)
+    return counts
+
+
+def is_fallback_pattern(counts, led_totals):
+    """
+    True when every palette color reaches FALLBACK_MIN_SHARE on every side.
+    """
+    for side, side_counts in counts.items():
+        min_freq = math.floor(led_totals[side] * FALLBACK_MIN_SHARE)
+        if not np.all(side_counts >= min_freq):
+            return False
+    return True
+
+
+class LedGeometryIndex:
+    """
+    Per-side LED index arrays for one layout, built once per fingerprint.
+    Accepts either the serverinfo `leds` list or an already built LedLayout.
+
+    LEDs that sit on an edge but fall outside every side's range (the
+    strip corners) are kept separately per corner.
+    """
+
+    SIDES = ("top", "bottom", "left", "right")
+    CORNERS = ("top_left", "top_right", "bottom_left", "bottom_right")
+
+    def __init__(self, leds):
+        layout = leds if isinstance(leds, LedLayout) else LedLayout(leds)
+        self.fingerprint = layout.fingerprint()
+        self.count = layout.count
+
+        masks = layout.side_masks()
+        self.sides = {side: np.flatnonzero(masks[side]) for side in self.SIDES}
+        self.totals = {side: len(indices) for side, indices in self.sides.items()}
+
+        on_edge = (layout.vmin <= 0.05) | (layout.vmax >= 0.95) | (layout.hmin <= 0.05) | (layout.hmax >= 0.95)
+        unassigned = on_edge & ~(masks["top"] | masks["bottom"] | masks["left"] | masks["right"])
+        upper = (layout.vmin + layout.vmax) / 2 < 0.5
+        leftmost = (layout.hmin + layout.hmax) / 2 < 0.5
+        self.corners = {
+            "top_left": np.flatnonzero(unassigned & upper & leftmost),
+            "top_right": np.flatnonzero(unassigned & upper & ~leftmost),
+            "bottom_left": np.flatnonzero(unassigned & ~upper & leftmost),
+            "bottom_right": np.flatnonzero(unassigned & ~upper & ~leftmost),
+        }
+
+        self._as_dict = None
+
+    def to_dict(self):
+        """JSON-ready index lists, built on first use and reused afterwards."""
+        if self._as_dict is None:
+            self._as_dict = {
+                "fingerprint": self.fingerprint,
+                "led_count": self.count,
+                "sides": {side: indices.tolist() for side, indices in self.sides.items()},
+                "corners": {corner: indices.tolist() for corner, indices in self.corners.items()},
+            }
+        return self._as_dict
+
+
+class LedGeometryCache:
+    """
+    Holds the LedGeometryIndex of the current layout.
+
+    The same `leds` object (as handed out by the serverinfo snapshot) skips
+    hashing entirely; a new object is hashed and the index is rebuilt only
+    when its fingerprint differs from the cached one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._source = None
+        self.rebuilds = 0
+
+    def get(self, leds):
+        with self._lock:
+            if self._index is not None and leds is self._source:
+                return self._index
+
+            layout = LedLayout(leds)
+            if self._index is None or self._index.fingerprint != layout.fingerprint():
+                self._index = LedGeometryIndex(layout)
+                self.rebuilds += 1
+
+            self._source = leds
+            return self._index
+
+
+def detect_fallback(geometry, rgb):
+    """
+    Vectorized equivalent of running `get_leds_by_direction` and
+    `check_top_bottom_led_for_fallback` (benchmarks/fallback_reference.py)
+    over one frame.
+
+    Args:
+        geometry (LedGeometryIndex): Precomputed side indices of the layout.
+        rgb (bytes | list[int]): Flat LED colors of the frame.
+    """
+    colors = frame_to_array(rgb, geometry.count)
+    sides = {"top": geometry.sides["top"], "bottom": geometry.sides["bottom"]}
+
+    counts = count_palette_matches(colors, sides)
+    return is_fallback_pattern(counts, geometry.totals)
+
+
+# Rec. 709 luma weights, used to pick the brightest LED of a side.
+LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+
+def side_color_stats(colors):
+    """
+    Average, dominant and brightest color of one side.
+
+    Args:
+        colors (np.ndarray): (N, 3) uint8 colors of the side's LEDs.
+
+    Returns:
+        dict: `average`, `dominant` (most frequent exact color) with its
+        `dominant_share`, and `peak` (highest luma), or None if N is 0.
+    """
+    if not len(colors):
+        return None
+
+    keys, counts = np.unique(pack_rgb(colors), return_counts=True)
+    top = np.argmax(counts)
+    dominant = keys[top]
+
+    return {
+        "average": np.rint(colors.mean(axis=0)).astype(int).tolist(),
+        "dominant": [int(dominant >> 16), int(dominant >> 8 & 0xFF), int(dominant & 0xFF)],
+        "dominant_share": round(counts[top] / len(colors), 3),
+        "peak": colors[np.argmax(colors @ LUMA_WEIGHTS)].tolist(),
+    }
+
+
+def side_averages_ema(geometry, frames, alpha):
+    """
+    Exponential moving average of each side's average color over a frame
+    window, oldest frame first, computed in one pass instead of per frame.
+
+    Args:
+        geometry (LedGeometryIndex): Side indices of the layout.
+        frames (list[bytes]): Flat RGB frames of the same layout.
+        alpha (float): Weight of the newest frame, in (0, 1].
+
+    Returns:
+        dict: Side name to the smoothed [r, g, b], or None for empty sides.
+    """
+    stack = np.stack([frame_to_array(rgb, geometry.count) for rgb in frames]).astype(np.float64)
+
+    # EMA seeded with the oldest frame: it keeps the (1 - alpha)^(n-1) share.
+    weights = alpha * (1 - alpha) ** np.arange(len(frames) - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (len(frames) - 1)
+
+    smoothed = {}
+    for side, indices in geometry.sides.items():
+        if not len(indices):
+            smoothed[side] = None
+            continue
+        means = stack[:, indices].mean(axis=1)
+        smoothed[side] = np.rint(weights @ means).astype(int).tolist()
+    return smoothed
+
+
+def edge_stats(geometry, rgb, history=None, alpha=None):
+    """
+    Per-side color statistics of one LED frame.
+
+    Args:
+        geometry (LedGeometryIndex): Precomputed side indices of the layout.
+        rgb (bytes | list[int]): Flat LED colors of the frame.
+        history (list[bytes] | None): Recent frames, oldest first and ending
+            with `rgb`, for the moving average.
+        alpha (float | None): EMA weight of the newest frame; no `ema` entry
+            when omitted.
+
+    Returns:
+        dict: Side name to `side_color_stats`, plus `ema` when requested.
+    """
+    colors = frame_to_array(rgb, geometry.count)
+    stats = {side: side_color_stats(colors[indices]) for side, indices in geometry.sides.items()}
+
+    if alpha is not None:
+        frames = [frame for frame in history or [] if len(frame) >= geometry.count * 3] or [rgb]
+        for side, smoothed in side_averages_ema(geometry, frames, alpha).items():
+            if stats[side] is not None:
+                stats[side]["ema"] = smoothed
+    return stats
@@ -0,0 +1,142 @@
+import json
+import time
+import threading
+from collections import deque
+from .frame_codec import FrameEncoder
+
+
+class BroadcastClient:
+    """
+    One downstream viewer of the LED stream.
+
+    Frames are offered from the backend loop and consumed by the viewer's
+    worker thread. The queue is tiny and drops its oldest frame when full,
+    so a slow viewer only ever lags by `queue_size` frames.
+    """
+
+    def __init__(self, max_fps=None, queue_size=2):
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.queue = deque(maxlen=queue_size)
+        self.closed = False
+        self.keyframe_seq = None
+
+        self.sent = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.connected_at = time.time()
+
+        self._last_offer = 0.0
+        self._cond = threading.Condition()
+
+    def offer(self, frame):
+        now = time.monotonic()
+        if now - self._last_offer < self.min_interval:
+            self.skipped += 1
+            return
+        self._last_offer = now
+
+        with self._cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(frame)
+            self._cond.notify()
+
+    def next_frame(self, timeout=None):
+        """Block until a frame is queued; None on timeout or after close."""
+        with self._cond:
+            if not self.queue and not self.closed:
+                self._cond.wait(timeout)
+            if self.closed or not self.queue:
+                return None
+            self.sent += 1
+            return self.queue.popleft()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "max_fps": round(1.0 / self.min_interval, 2) if self.min_interval else None,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "queued": len(self.queue),
+            "connected_for": round(time.time() - self.connected_at, 1),
+        }
+
+
+class LedBroadcastHub:
+    """
+    Fans one upstream LED stream out to any number of viewers.
+
+    The hub attaches a single listener to the frame store while at least one
+    viewer is connected, so HyperHDR sees one subscription regardless of the
+    number of viewers. Each frame is encoded once per format and shared.
+    """
+
+    def __init__(self, frame_store, keyframe_interval=30):
+        self.frame_store = frame_store
+        self.clients = set()
+        self.frames_in = 0
+        self.binary = FrameEncoder(delta=False)
+        self.binary_delta = FrameEncoder(keyframe_interval)
+        self._lock = threading.Lock()
+        self._encoded = (None, None)
+
+    def connect(self, max_fps=None, queue_size=2) -> BroadcastClient:
+        client = BroadcastClient(max_fps, queue_size)
+        with self._lock:
+            first = not self.clients
+            self.clients.add(client)
+        if first:
+            self.frame_store.add_listener(self._fan_out)
+        return client
+
+    def disconnect(self, client):
+        client.close()
+        with self._lock:
+            self.clients.discard(client)
+            last = not self.clients
+        if last:
+            self.frame_store.remove_listener(self._fan_out)
+
+    def encode_json(self, frame) -> str:
+        """JSON payload for `frame`, encoded once no matter how many viewers."""
+        seq, payload = self._encoded
+        if seq != frame.seq:
+            payload = json.dumps(
+                {"seq": frame.seq, "timestamp": frame.timestamp, "leds": frame.leds},
+                separators=(",", ":"),
+            )
+            self._encoded = (frame.seq, payload)
+        return payload
+
+    def encode_binary(self, frame, client, delta=False):
+        """
+        Binary payloads to send `client` for `frame`. With `delta`, that is the
+        delta alone, or the referenced keyframe first if this client has not
+        received it yet.
+        """
+        encoder = self.binary_delta if delta else self.binary
+        payload, keyframe_seq, keyframe_payload = encoder.encode(frame)
+        if client.keyframe_seq == keyframe_seq:
+            return [payload]
+
+        client.keyframe_seq = keyframe_seq
+        if payload is keyframe_payload:
+            return [payload]
+        return [keyframe_payload, payload]
+
+    def _fan_out(self, frame):
+        self.frames_in += 1
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.offer(frame)
+
+    def stats(self) -> dict:
+        with self._lock:
+            clients = [client.stats() for client in self.clients]
+        return {"frames_in": self.frames_in, "clients": clients}
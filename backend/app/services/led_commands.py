@@ -1,139 +1,218 @@
-import math
-import json
+import os
+import re
 import asyncio
-import requests
-import websockets
+import inspect
+from functools import wraps
+from .hyperhdr_client import clear_command, effect_command, COMMAND_TIMEOUTS
+from .event_loop import run_sync
+from .hyperhdr_target import HyperHDRTarget, TargetRegistry, parse_targets
+from .led_analysis import detect_fallback, edge_stats
+from .state_shadow import visible_priority
+from .color_transition import EASINGS
+from .led_recorder import LedRecording
 
 HOST = "localhost"
 PORT = 8090
-TAN = 1
 
-base_url = f"http://{HOST}:{PORT}"
-ws_url = f"ws://{HOST}:{PORT}"
+# HyperHDR instances this backend controls, as name=host[:port][/instance]
+# entries. The first one is used when a route does not name an instance.
+HYPERHDR_TARGETS = os.getenv("HYPERHDR_TARGETS", f"default={HOST}:{PORT}")
+
+# How long a serverinfo reply may be reused before it is fetched again.
+SERVERINFO_TTL = float(os.getenv("HYPERHDR_SERVERINFO_TTL", "1.0"))
+
+# Number of recent LED frames kept in memory.
+LED_FRAME_HISTORY = int(os.getenv("HYPERHDR_LED_FRAME_HISTORY", "64"))
+
+# Stop the LED stream after this many seconds without a reader.
+LED_STREAM_IDLE_TIMEOUT = float(os.getenv("HYPERHDR_LED_STREAM_IDLE_TIMEOUT", "30"))
+
+# Brightness writes arriving within this many seconds are merged into one.
+WRITE_COALESCE_WINDOW = float(os.getenv("HYPERHDR_WRITE_COALESCE_WINDOW", "0.05"))
+
+# Frame rate of server-side color fades, and the longest fade accepted.
+TRANSITION_FPS = float(os.getenv("HYPERHDR_TRANSITION_FPS", "30"))
+MAX_TRANSITION_MS = 60000
+
+# Where LED stream recordings are written, and the largest one kept.
+RECORDINGS_DIR = os.getenv("HYPERHDR_RECORDINGS_DIR", os.path.expanduser("~/led-recordings"))
+RECORDING_MAX_BYTES = int(os.getenv("HYPERHDR_RECORDING_MAX_BYTES", str(256 * 1024 * 1024)))
+# A recording keeps the LED stream subscribed, so it also ends after this long.
+RECORDING_MAX_SECONDS = float(os.getenv("HYPERHDR_RECORDING_MAX_SECONDS", "3600"))
+RECORDING_NAME = re.compile(r"^[\w-]{1,64}$")
+RECORDING_SUFFIX = ".ledrec"
+
+# Commands accepted by `POST /led/batch`.
+BATCH_COMMANDS = {"serverinfo", "color", "effect", "clear", "adjustment", "componentstate"}
+MAX_BATCH_SIZE = 16
+
+targets = TargetRegistry([
+    HyperHDRTarget(
+        name,
+        host,
+        port,
+        instance,
+        serverinfo_ttl=SERVERINFO_TTL,
+        frame_history=LED_FRAME_HISTORY,
+        stream_idle_timeout=LED_STREAM_IDLE_TIMEOUT,
+        coalesce_window=WRITE_COALESCE_WINDOW,
+        transition_fps=TRANSITION_FPS,
+    )
+    for name, host, port, instance in parse_targets(HYPERHDR_TARGETS, PORT)
+])
+
+
+def get_target(instance: str | None = None) -> HyperHDRTarget:
+    """
+    Resolve an instance name to its target.
+
+    Raises:
+        UnknownTarget: If no target with that name is configured.
+    """
+    return targets.get(instance)
 
-async def get_led_stream():
-    uri = f"ws://{HOST}:{PORT}"
-    led_data = None
-    async with websockets.connect(uri) as ws:
 
-        # 1. Start LED colors stream
-        start_msg = {
-            "command": "ledcolors",
-            "subcommand": "ledstream-start",
-            "tan": TAN
-        }
+def list_targets():
+    return [target.describe() for target in targets]
 
-        await ws.send(json.dumps(start_msg))
 
-        try:
-            for _ in range(10):
-                msg = await ws.recv()
-                try:
-                    data = json.loads(msg)
-                    if data.get('command', '') == "ledcolors-ledstream-update":
-                        led_data = data  
-                        break
-                except json.JSONDecodeError:
-                    print("[Binary frame received]", type(msg), len(msg))
+async def get_led_frame(instance: str | None = None):
+    return await get_target(instance).get_frame()
+
+
+def expect_hyperhdr_downtime(reason: str, hold: float = 5.0):
+    """
+    Tell the LED routes that the local HyperHDR service is about to go away
+    on purpose, so they answer 503 right away instead of waiting on
+    connection attempts.
+    """
+    for target in targets.local():
+        target.breaker.expect_downtime(reason, hold)
+
+
+def probe_hyperhdr():
+    """Check for the local HyperHDR right away instead of waiting for the next backoff step."""
+    for target in targets.local():
+        target.breaker.probe_now()
+
+
+def invalidates_serverinfo(f):
+    """Drop the target's cached serverinfo once a write command has been sent."""
+
+    if inspect.iscoroutinefunction(f):
+
+        @wraps(f)
+        async def wrapped_async(*args, **kwargs):
+            try:
+                return await f(*args, **kwargs)
+            finally:
+                get_target(kwargs.get("instance")).invalidate()
 
+        return wrapped_async
+
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
         finally:
-            # 3. Stop LED colors stream
-            stop_msg = {
-                "command": "ledcolors",
-                "subcommand": "ledstream-stop",
-                "tan": TAN
-            }
-            await ws.send(json.dumps(stop_msg))
+            get_target(kwargs.get("instance")).invalidate()
 
-            # 4. Close connection
-            await ws.close()
-        
-        return led_data
+    return wrapped
 
-def set_hyperhdr_brightness(brightness: int):
+def set_hyperhdr_brightness(brightness: int, *, instance: str | None = None):
     """
     Adjust the brightness of HyperHDR.
 
+    Slider drags send many values in quick succession; only the latest one
+    within the coalescing window is forwarded.
+
     Args:
-        ip (str): IP address of the HyperHDR instance (e.g., "192.168.1.100").
-        brightness (int): Brightness level (0-255).
+        brightness (int): Brightness level (0-100).
+        instance (str | None): Target name, the default target if omitted.
     
     Returns:
-        dict: JSON response from HyperHDR.
-    """
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "adjustment",
-        "adjustment": {
-            "brightness": max(0, min(brightness, 100))
-        }
-    }
-
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    return response.json()
+        dict: JSON response from HyperHDR, or {"coalesced": True} if a newer
+        value replaced this one before it was sent.
 
-def get_current_brightness():
+    Raises:
+        asyncio.TimeoutError: If HyperHDR did not answer in time.
+    """
+    coalescer = get_target(instance).coalescer
+    # A write never waits longer than its coalescing window plus the
+    # adjustment command itself, even if the WebSocket send is stuck.
+    timeout = coalescer.window + sum(COMMAND_TIMEOUTS["adjustment"])
+    return run_sync(
+        asyncio.wait_for(coalescer.write("brightness", max(0, min(brightness, 100))), timeout)
+    )
+
+def get_current_brightness(*, instance: str | None = None):
     """
     Get the current brightness level (0–100) from HyperHDR.
 
     Returns:
         int | None: Brightness level if found, else None.
     """
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "serverinfo"
-    }
-
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    data = response.json()
-
-    adjustments = data.get("info", {}).get("adjustment", [])
+    adjustments = get_target(instance).current_info().get("adjustment", [])
     if adjustments:
         return {"brightness" : adjustments[0].get("brightness")}
 
     return None
 
 
-def get_hyperhdr_effects():
+def get_hyperhdr_effects(*, instance: str | None = None):
     """
     Fetch the list of available effects from HyperHDR.
 
     Returns:
         list: List of effect names.
     """
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "serverinfo"
-    }
-
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    data = response.json()
+    return get_target(instance).effects.effects()
 
-    effects = data.get("info", {}).get("effects", [])
+async def get_hyperhdr_effects_async(*, instance: str | None = None):
+    return await get_target(instance).effects.effects_async()
 
-    filtered_effects = [effect for effect in effects if not effect['name'].lower().startswith("music")]
+def get_hyperhdr_effects_json(*, instance: str | None = None) -> bytes:
+    """Effects list serialized once per catalog load."""
+    return get_target(instance).effects.payload()
 
-    return filtered_effects
+async def is_known_effect(effect_name: str, *, instance: str | None = None) -> bool:
+    if not isinstance(effect_name, str):
+        return False
+    return effect_name in await get_target(instance).effects.get_async()
 
-def clear_hyperhdr_effect(priority: int = 100):
+@invalidates_serverinfo
+def clear_hyperhdr_effect(priority: int = 100, *, instance: str | None = None):
     """
     Clear any currently running effect at the given priority.
     """
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "clear",
-        "priority": priority
-    }
+    target = get_target(instance)
+    target.transitions.cancel()
+    target.applied.forget()
+    return target.client.clear(priority)
+
+
+async def apply_tracked(target: HyperHDRTarget, kind: str, value, duration_ms: int, write):
+    """
+    Run a color/effect `write` and keep the last-applied memo in step with it.
 
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    return response.json()
+    Every color and effect write goes through here, whichever route sent it,
+    so no write can leave a stale "already applied" entry behind. Only writes
+    that stay up (no duration) are remembered.
+
+    Returns:
+        dict: HyperHDR's reply to the write (the last reply of a batch).
+    """
+    target.transitions.cancel()
+    target.applied.forget()
+    res = await write
+    if isinstance(res, list):
+        res = res[-1]
 
+    if res.get("success") and not duration_ms:
+        target.applied.remember(kind, value)
+    return res
 
-def apply_hyperhdr_effect(effect_name: str, duration_ms: int = 0):
+def apply_hyperhdr_effect(effect_name: str, duration_ms: int = 0, *, instance: str | None = None):
     """
     Apply an effect to HyperHDR after clearing any running effect at the same priority.
 
@@ -144,79 +223,168 @@ def apply_hyperhdr_effect(effect_name: str, duration_ms: int = 0):
     Returns:
         dict: JSON response from HyperHDR.
     """
+    return run_sync(apply_hyperhdr_effect_async(effect_name, duration_ms, instance=instance))
+
+@invalidates_serverinfo
+async def apply_hyperhdr_effect_async(effect_name: str, duration_ms: int = 0, *, instance: str | None = None):
+    target = get_target(instance)
     priority = 100
-    clear_hyperhdr_effect(priority)
-
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "effect",
-        "effect": {
-            "name": effect_name
-        },
-        "priority": priority,
-        "duration": duration_ms
+    return await apply_tracked(
+        target,
+        "effect",
+        effect_name,
+        duration_ms,
+        target.async_client.batch(
+            [clear_command(priority), effect_command(effect_name, priority, duration_ms)]
+        ),
+    )
+
+@invalidates_serverinfo
+async def run_hyperhdr_batch(commands: list[dict], *, instance: str | None = None):
+    """
+    Send several JSON-RPC commands to HyperHDR in one round trip.
+
+    Args:
+        commands (list[dict]): Raw commands, e.g. a color followed by an adjustment.
+
+    Returns:
+        list: Replies in the same order as `commands`.
+    """
+    target = get_target(instance)
+    target.transitions.cancel()
+    target.applied.forget()
+    return await target.async_client.batch(commands)
+
+async def fan_out_batch(commands: list[dict], instances: list[str] | None = None):
+    """
+    Send the same batch to several instances at once.
+
+    Args:
+        commands (list[dict]): Raw commands, as for `run_hyperhdr_batch`.
+        instances (list[str] | None): Target names, every target if omitted.
+
+    Returns:
+        dict: Per instance name, {"status": "success", "data": replies} or
+        {"status": "failed", "error": ...}; one failing instance does not
+        affect the others.
+    """
+    selected = targets.select(instances)
+    results = await asyncio.gather(
+        *(run_hyperhdr_batch(commands, instance=target.name) for target in selected),
+        return_exceptions=True,
+    )
+
+    return {
+        target.name: (
+            {"status": "failed", "error": str(result) or type(result).__name__}
+            if isinstance(result, Exception)
+            else {"status": "success", "data": result}
+        )
+        for target, result in zip(selected, results)
     }
 
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    return response.json()
+async def check_fallback_signal(*, instance: str | None = None):
+    """
+    Check whether the latest LED frame shows HyperHDR's "no signal" pattern
+    on the top and bottom edges.
+
+    Returns:
+        bool: True if the capture card is showing the fallback pattern.
+    """
+    target = get_target(instance)
+    info, frame = await asyncio.gather(target.current_info_async(), target.get_frame())
+    return detect_fallback(target.geometry.get(info.get('leds')), frame.rgb)
+
+async def get_edge_stats(ema: float | None = None, *, instance: str | None = None):
+    """
+    Average, dominant and peak color of every screen edge in the latest LED
+    frame, e.g. to drive room lights.
 
-async def check_input_signal():
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "serverinfo"
+    Args:
+        ema (float | None): Weight of the newest frame for an exponential
+            moving average of each side's average color over the frame
+            history. Omitted when None.
+
+    Returns:
+        dict: Frame `seq` and `timestamp`, layout `fingerprint`, and per-side stats.
+    """
+    target = get_target(instance)
+    info, frame = await asyncio.gather(target.current_info_async(), target.get_frame())
+    geometry = target.geometry.get(info.get('leds'))
+
+    history = None
+    if ema is not None:
+        history = [past.rgb for past in target.frame_store.frames() if past.seq <= frame.seq]
+
+    return {
+        "seq": frame.seq,
+        "timestamp": frame.timestamp,
+        "fingerprint": geometry.fingerprint,
+        "sides": edge_stats(geometry, frame.rgb, history, ema),
     }
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    data = response.json()
 
-    priorities = data.get('info', {}).get('priorities')
+async def check_input_signal(*, instance: str | None = None):
+    target = get_target(instance)
+
+    # While the LED stream is warm the frame costs nothing extra, so fetch it
+    # alongside serverinfo; otherwise only subscribe when the check needs it.
+    if target.frame_store.latest is not None:
+        info, frame = await asyncio.gather(
+            target.current_info_async(), target.get_frame(), return_exceptions=True
+        )
+        if isinstance(info, BaseException):
+            raise info
+    else:
+        info, frame = await target.current_info_async(), None
+
+    priorities = info.get('priorities')
     if not priorities:
-        return {"status": "failed", error: "priorities are missing in serverinfo"}
+        return {"status": "failed", "error": "priorities are missing in serverinfo"}
     
     is_it_fallback = True
     
     any_other_active_source = any(["usb" not in priority.get("owner","").lower() and priority["visible"] for priority in priorities])
 
     if not any_other_active_source:
-        led_position = get_led_postion_data()
-        led_color = await get_led_stream()    
-        led_color = led_color.get("result",{}).get("leds",[])
-        led_color = transform_flat_led_colors_for_each_led(led_color)
-        led_position = add_color_to_led_position_data(led_position, led_color)
-        TOP_THRESHOLD = 0.05
-        BOTTOM_THRESHOLD = 0.95
-        result = get_leds_by_direction(led_position,TOP_THRESHOLD=TOP_THRESHOLD, BOTTOM_THRESHOLD = BOTTOM_THRESHOLD)
-        is_it_fallback = check_top_bottom_led_for_fallback(result["top"], result["bottom"])
-
-
-    current_input = {}
-    valid_effects = [effect["name"] for effect in get_hyperhdr_effects()]
-    
-    for priority in priorities:
-        usb_owner = "usb" in priority.get("owner","").lower()
-        is_valid_effect = priority.get("owner","") in valid_effects
+        if frame is None or isinstance(frame, BaseException):
+            frame = await target.get_frame()
+        is_it_fallback = detect_fallback(target.geometry.get(info.get('leds')), frame.rgb)
 
-        if priority["visible"]:
-            current_input = { **priority, "value": priority.get("owner","") } if is_valid_effect else priority
-            current_input = { **current_input, "isFallBack": is_it_fallback } if usb_owner else current_input
-            break
+
+    current_input = describe_priority(visible_priority(priorities), await target.effects.get_async())
+
+    if "usb" in current_input.get("owner","").lower():
+        current_input = { **current_input, "isFallBack": is_it_fallback }
 
     return current_input
 
-def check_capture_card_signal():
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "serverinfo"
-    }
+def describe_priority(priority, valid_effects):
+    if priority is None:
+        return {}
 
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    data = response.json()
+    is_valid_effect = priority.get("owner","") in valid_effects
+    return { **priority, "value": priority.get("owner","") } if is_valid_effect else priority
 
-    priorities = data.get('info', {}).get('priorities')
+async def get_active_priority(*, instance: str | None = None):
+    """
+    The visible priority without the fallback check, so the LED stream is
+    never touched. Enough for writes that only need to know what is showing.
+
+    Returns:
+        dict: Visible priority (effects carry their name in `value`), or {}.
+    """
+    target = get_target(instance)
+    info = await target.current_info_async()
+    return describe_priority(visible_priority(info.get('priorities')), await target.effects.get_async())
+
+def is_already_applied(kind: str, value, *, instance: str | None = None) -> bool:
+    """True when this backend applied exactly (kind, value) and nothing replaced it since."""
+    return get_target(instance).applied.matches(kind, value)
+
+def check_capture_card_signal(*, instance: str | None = None):
+    priorities = get_target(instance).current_info().get('priorities')
     if not priorities:
-        return {"status": "failed", error: "priorities are missing in serverinfo"}
+        return {"status": "failed", "error": "priorities are missing in serverinfo"}
 
     capture_card = {}
 
@@ -227,21 +395,13 @@ def check_capture_card_signal():
     
     return capture_card
 
-def set_signal_detection(enabled: bool):
-    url = f"{base_url}/json-rpc"
-
-    grabber_on = {
-        "command": "componentstate",
-        "componentstate": {
-            "component": "VIDEOGRABBER",
-            "state": enabled
-        }
-    }
-    res = requests.post(url, json = grabber_on)
-    print(f"{'Enabled' if enabled else 'Disabled'} signal detection:", res.json())
-    return res.json()
+@invalidates_serverinfo
+def set_signal_detection(enabled: bool, *, instance: str | None = None):
+    res = get_target(instance).client.set_component_state("VIDEOGRABBER", enabled)
+    print(f"{'Enabled' if enabled else 'Disabled'} signal detection:", res)
+    return res
 
-def apply_hyperhdr_color(rgb: list[int], duration_ms: int = 0):
+def apply_hyperhdr_color(rgb: list[int], duration_ms: int = 0, *, instance: str | None = None):
     """
     Apply a static color to HyperHDR.
 
@@ -252,167 +412,159 @@ def apply_hyperhdr_color(rgb: list[int], duration_ms: int = 0):
     Returns:
         dict: JSON response from HyperHDR.
     """
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "color",
-        "color": rgb,
-        "priority": 100,
-        "duration": duration_ms
-    }
-
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    return response.json()
+    return run_sync(apply_hyperhdr_color_async(rgb, duration_ms, instance=instance))
+
+@invalidates_serverinfo
+async def apply_hyperhdr_color_async(rgb: list[int], duration_ms: int = 0, *, instance: str | None = None):
+    target = get_target(instance)
+    return await apply_tracked(
+        target, "color", rgb, duration_ms, target.async_client.set_color(rgb, 100, duration_ms)
+    )
+
+def cancel_color_transition(*, instance: str | None = None) -> bool:
+    """Stop a running fade so the next command is not overwritten by its frames."""
+    return get_target(instance).transitions.cancel()
+
+@invalidates_serverinfo
+async def start_color_transition(
+    rgb: list[int],
+    duration_ms: int,
+    easing: str = "linear",
+    start: list[int] | None = None,
+    hold_ms: int = 0,
+    *,
+    instance: str | None = None,
+):
+    """
+    Fade to a color on the backend instead of the client sending every step.
 
+    Args:
+        rgb (list[int]): Color the fade ends on.
+        duration_ms (int): Fade length in milliseconds.
+        easing (str): Curve of the fade, see `color_transition.EASINGS`.
+        start (list[int] | None): Color the fade starts from. Defaults to
+            where a running fade currently is, else the visible static color,
+            else black.
+        hold_ms (int): How long the end color stays. 0 means infinite.
 
-def get_led_postion_data():
-    url = f"{base_url}/json-rpc"
-    payload = {
-        "command": "serverinfo"
-    }
+    Returns:
+        dict: Frame count, frame rate and effective duration of the fade.
+    """
+    target = get_target(instance)
+    target.breaker.check()
+    if start is None:
+        start = target.transitions.current_rgb if target.transitions.active else None
+    if start is None:
+        info = await target.current_info_async()
+        visible = visible_priority(info.get("priorities")) or {}
+        value = visible.get("value")
+        if visible.get("componentId") == "COLOR" and isinstance(value, dict):
+            start = value.get("RGB")
+
+    target.applied.forget()
+    return await target.transitions.play(start or [0, 0, 0], rgb, duration_ms, easing, 100, hold_ms)
+
+
+def recording_path(name: str) -> str:
+    if not RECORDING_NAME.match(name or ""):
+        raise ValueError("Recording name may only contain letters, digits, '_' and '-'")
+    return os.path.join(RECORDINGS_DIR, name + RECORDING_SUFFIX)
+
+async def start_led_recording(name: str, *, instance: str | None = None):
+    """
+    Record the LED stream of a target to `RECORDINGS_DIR/<name>.ledrec`
+    until stopped, RECORDING_MAX_BYTES is reached or RECORDING_MAX_SECONDS
+    have passed.
 
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    data = response.json()
+    Returns:
+        dict: Recorder stats.
+    """
+    target = get_target(instance)
+    path = recording_path(name)
+    info = await target.current_info_async()
+    geometry = target.geometry.get(info.get('leds'))
+
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    target.recorder.start(
+        path, geometry.count, geometry.fingerprint, RECORDING_MAX_BYTES, RECORDING_MAX_SECONDS
+    )
+    return target.recorder.stats()
+
+def stop_led_recording(*, instance: str | None = None):
+    return get_target(instance).recorder.stop()
+
+def list_led_recordings():
+    if not os.path.isdir(RECORDINGS_DIR):
+        return []
+
+    recordings = []
+    for file_name in sorted(os.listdir(RECORDINGS_DIR)):
+        if not file_name.endswith(RECORDING_SUFFIX):
+            continue
+        try:
+            recordings.append(LedRecording(os.path.join(RECORDINGS_DIR, file_name)).describe())
+        except (OSError, ValueError) as e:
+            print(f"Skipping recording {file_name}: {e}")
+    return recordings
 
-    leds = data.get('info', {}).get('leds')
-    
-    return leds
+async def start_led_replay(name: str, speed: float = 1.0, *, instance: str | None = None):
+    """
+    Replay a recording through the target's frame store, so the fallback
+    check, edge stats and LED stream viewers all see the recorded frames.
 
-def check_top_bottom_led_for_fallback(top_leds, bottom_leds):
-    no_of_top_leds = len(top_leds)
-    no_of_bottom_leds = len(bottom_leds)
+    Args:
+        name (str): Recording name as listed by `list_led_recordings`.
+        speed (float): Playback speed, 1 being the original timing.
 
-    # print({
-    #     "top": top_leds,
-    #     "bottom": bottom_leds
-    # })
-    
-    top_fallback_colors = {
-        (255, 255, 6): 0,   # Bright yellow (slightly greenish)
-        (255, 0, 255): 0,   # Pure magenta
-        (0, 10, 255): 0,    # Deep blue (slightly purplish)
-        (0, 255, 0): 0,     # Pure green
-        (6, 255, 255): 0,   # Cyan / aqua
-        (255, 11, 0): 0     # Bright red (slightly orange)
-    }
-    
-    bottom_fallback_colors = {
-        (255, 255, 6): 0,   # Bright yellow (slightly greenish)
-        (255, 0, 255): 0,   # Pure magenta
-        (0, 10, 255): 0,    # Deep blue (slightly purplish)
-        (0, 255, 0): 0,     # Pure green
-        (6, 255, 255): 0,   # Cyan / aqua
-        (255, 11, 0): 0     # Bright red (slightly orange)
-    }
+    Returns:
+        dict: Replay stats, plus whether the recording matches the current
+        LED layout.
+    """
+    target = get_target(instance)
+    path = recording_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Recording '{name}' not found")
+    recording = LedRecording(path)
 
-    loop_til = max(len(top_leds),len(bottom_leds))
+    info = await target.current_info_async()
+    geometry = target.geometry.get(info.get('leds'))
 
-    for led_ind in range(loop_til):
-        if led_ind < len(top_leds):
-            curr_top_color = tuple(top_leds[led_ind]['color'])
-            if curr_top_color in top_fallback_colors:
-                top_fallback_colors[curr_top_color] += 1 
-        
-        if led_ind < len(bottom_leds):
-            curr_bottom_color = tuple(bottom_leds[led_ind]['color'])
-            if curr_bottom_color in bottom_fallback_colors:
-                bottom_fallback_colors[curr_bottom_color] += 1
+    target.replay.start(recording, speed)
+    return {**target.replay.stats(), "layout_matches": recording.fingerprint == geometry.fingerprint}
 
-    min_top_colors_freq = math.floor(no_of_top_leds * 0.09)
-    min_bottom_colors_freq = math.floor(no_of_bottom_leds * 0.09)
+def stop_led_replay(*, instance: str | None = None):
+    target = get_target(instance)
+    target.replay.stop()
+    return target.replay.stats()
 
-    are_these_top_colors_fallback = all([ freq >= min_top_colors_freq for _,freq in top_fallback_colors.items()])
-    are_these_bottom_colors_fallback = all([ freq >= min_bottom_colors_freq for _,freq in bottom_fallback_colors.items()])
 
-    # print(top_fallback_colors)
-    # print(f"{min_top_colors_freq}/{no_of_top_leds}")
-    # print(are_these_top_colors_fallback)
-    
-    # print(bottom_fallback_colors)
-    # print(f"{min_bottom_colors_freq}/{no_of_bottom_leds}")
-    # print(are_these_bottom_colors_fallback)
-    return are_these_bottom_colors_fallback and are_these_top_colors_fallback
-
-def transform_flat_led_colors_for_each_led(led_color):
-    return [led_color[i:i+3] for i in range(0, len(led_color), 3)]
-
-def add_color_to_led_position_data(led_position,led_color):
-    return [{**each_position ,"color": led_color[index],"led_ind": index} for index,each_position in enumerate(led_position)]
-
-def get_leds_by_direction(
-    led_position,
-    TOP_THRESHOLD=0.05,
-    BOTTOM_THRESHOLD=0.95,
-    LEFT_THRESHOLD=0.05,
-    RIGHT_THRESHOLD=0.95
-):
-    top_leds = []
-    bottom_leds = []
-    left_leds = []
-    right_leds = []
-
-    for led in led_position:
-        # Top
-        if 0.05 < led["hmin"] < 0.95 and led["vmin"] <= TOP_THRESHOLD:
-            top_leds.append(led)
-
-        # Bottom
-        if 0.05 < led["hmin"] < 0.95 and led["vmax"] >= BOTTOM_THRESHOLD:
-            bottom_leds.append(led)
-
-        # Left
-        if 0.05 < led["vmin"] < 0.95 and led["hmin"] <= LEFT_THRESHOLD:
-            left_leds.append(led)
-
-        # Right
-        if 0.05 < led["vmin"] < 0.95 and led["hmax"] >= RIGHT_THRESHOLD:
-            right_leds.append(led)
-
-    mapping = {
-        "top": top_leds,
-        "bottom": bottom_leds,
-        "left": left_leds,
-        "right": right_leds
-    }
+def get_hyperhdr_stats(*, instance: str | None = None):
+    """
+    Collect runtime counters of the HyperHDR connection.
 
-    return mapping
+    Returns:
+        dict: Breaker state, JSON-RPC latency counters, serverinfo snapshot
+        usage, WebSocket session and state shadow, LED frame store and
+        broadcast counters of one target.
+    """
+    return get_target(instance).stats()
 
-async def get_led_stream():
-    uri = f"ws://{HOST}:{PORT}"
-    led_data = None
-    async with websockets.connect(uri) as ws:
+def get_broadcast_hub(*, instance: str | None = None):
+    return get_target(instance).broadcast
 
-        # 1. Start LED colors stream
-        start_msg = {
-            "command": "ledcolors",
-            "subcommand": "ledstream-start",
-            "tan": TAN
-        }
+def get_led_postion_data(*, instance: str | None = None):
+    leds = get_target(instance).snapshot.get().get('leds')
+    
+    return leds
 
-        await ws.send(json.dumps(start_msg))
+async def get_led_postion_data_async(*, instance: str | None = None):
+    return (await get_target(instance).snapshot.get_async()).get('leds')
 
-        try:
-            for _ in range(10):
-                msg = await ws.recv()
-                try:
-                    data = json.loads(msg)
-                    if data.get('command', '') == "ledcolors-ledstream-update":
-                        led_data = data  
-                        break
-                except json.JSONDecodeError:
-                    print("[Binary frame received]", type(msg), len(msg))
+def get_led_geometry(*, instance: str | None = None):
+    """
+    Per-side LED indices of the current layout.
 
-        finally:
-            # 3. Stop LED colors stream
-            stop_msg = {
-                "command": "ledcolors",
-                "subcommand": "ledstream-stop",
-                "tan": TAN
-            }
-            await ws.send(json.dumps(stop_msg))
-
-            # 4. Close connection
-            await ws.close()
-        
-        return led_data
\ No newline at end of file
+    Returns:
+        dict: Layout fingerprint, LED count, and index lists per side and corner.
+    """
+    return get_target(instance).geometry.get(get_led_postion_data(instance=instance)).to_dict()
@@ -0,0 +1,134 @@
+import time
+import asyncio
+import threading
+import statistics
+from collections import deque
+from .event_loop import submit, run_sync
+
+
+class LedPushGateway:
+    """
+    Forwards client-driven per-LED frames to HyperHDR on a fixed clock.
+
+    Frames arrive from the viewer's thread at whatever rate the client
+    produces them. A pacing task on the backend loop wakes every 1/fps
+    seconds and sends only the newest frame as a `color` command with one
+    RGB triple per LED. Frames replaced before their tick are dropped, never
+    queued, so the LEDs show the client's latest state with bounded latency.
+
+    Each frame holds its priority for `hold_ms`, so the LEDs fall back to
+    the previous source on their own if the client disappears.
+    """
+
+    def __init__(self, session, fps=30, priority=50, hold_ms=1000, origin="LED push"):
+        self.session = session
+        self.fps = fps
+        self.priority = priority
+        self.hold_ms = hold_ms
+        self.origin = origin
+
+        self.received = 0
+        self.forwarded = 0
+        self.dropped = 0
+        self.invalid = 0
+        self.missed_ticks = 0
+        self.errors = 0
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._closed = False
+        # loop.time() readings; the default loop clock is time.monotonic().
+        self._sent_at = deque(maxlen=int(fps * 2) + 1)
+        self._lateness = deque(maxlen=int(fps * 2) + 1)
+        self._runner = None
+
+    def start(self):
+        self.session.start()
+        self._runner = submit(self._run())
+        return self
+
+    def offer(self, rgb: bytes) -> bool:
+        """Queue a frame for the next tick, replacing any frame still waiting."""
+        if not rgb or len(rgb) % 3:
+            self.invalid += 1
+            return False
+
+        with self._lock:
+            self.received += 1
+            if self._latest is not None:
+                self.dropped += 1
+            self._latest = bytes(rgb)
+        return True
+
+    def close(self, timeout=2.0):
+        """Stop the clock and release the priority."""
+        self._closed = True
+        if self._runner is not None:
+            try:
+                self._runner.result(timeout)
+            except Exception:
+                pass
+        try:
+            run_sync(self.session.send_nowait({"command": "clear", "priority": self.priority}), timeout)
+        except Exception:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.fps
+        next_tick = loop.time() + interval
+
+        while not self._closed:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            now = loop.time()
+            lateness = now - next_tick
+            self._lateness.append(lateness)
+
+            # Fell more than a tick behind (busy loop, slow send): skip ahead
+            # instead of firing the missed ticks back to back.
+            if lateness > interval:
+                self.missed_ticks += int(lateness // interval)
+                next_tick = now
+            next_tick += interval
+
+            with self._lock:
+                rgb, self._latest = self._latest, None
+            if rgb is None:
+                continue
+
+            try:
+                await self.session.send_nowait({
+                    "command": "color",
+                    "color": list(rgb),
+                    "priority": self.priority,
+                    "duration": self.hold_ms,
+                    "origin": self.origin,
+                })
+            except Exception:
+                self.errors += 1
+                continue
+
+            self.forwarded += 1
+            self._sent_at.append(now)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        window = min(2.0, time.time() - self.started_at)
+        recent = [sent for sent in self._sent_at if sent >= now - window]
+        lateness = list(self._lateness)
+        fps = round(len(recent) / window, 2) if window > 0 else None
+
+        return {
+            "target_fps": self.fps,
+            "fps": fps,
+            "jitter_ms": round(statistics.pstdev(lateness) * 1000, 3) if len(lateness) > 1 else None,
+            "received": self.received,
+            "forwarded": self.forwarded,
+            "dropped": self.dropped,
+            "invalid": self.invalid,
+            "missed_ticks": self.missed_ticks,
+            "errors": self.errors,
+            "priority": self.priority,
+            "connected_for": round(time.time() - self.started_at, 1),
+        }
@@ -0,0 +1,325 @@
+import os
+import time
+import queue
+import struct
+import asyncio
+import threading
+import numpy as np
+from .event_loop import submit
+
+MAGIC = b"HLED"
+VERSION = 1
+
+# magic, version, LED count, record size, start time, layout fingerprint
+HEADER = struct.Struct("<4sHHId20s")
+HEADER_SIZE = 64
+
+# Each record: capture time, frame seq, then 3 bytes per LED.
+RECORD_PREFIX = struct.Struct("<dI")
+
+# Queued after the last frame to end the writer thread.
+_STOP = object()
+
+# Longest `stop` waits for the writer to put queued frames on disk.
+STOP_TIMEOUT = 10.0
+
+
+def record_dtype(led_count):
+    return np.dtype([("timestamp", "<f8"), ("seq", "<u4"), ("rgb", "u1", (led_count * 3,))])
+
+
+class LedRecorder:
+    """
+    Appends LED stream frames to a fixed-record binary file.
+
+    The file starts with a HEADER_SIZE header holding the LED count and the
+    layout fingerprint, followed by one RECORD_PREFIX + RGB record per frame,
+    so any frame can be located by index.
+
+    The frame listener only queues frames; a writer thread packs them, writes
+    them through a large buffer and flushes about once a second, so no file
+    I/O happens on the backend loop next to the WebSocket session. If the
+    disk falls `queue_size` frames behind, newer frames are dropped.
+
+    A recording is a frame store listener, so it keeps the LED stream
+    subscribed and the idle stop does not fire while it runs. It therefore
+    always ends: on request, at `max_bytes`, or after `max_seconds`.
+    """
+
+    def __init__(self, frame_store, buffer_size=256 * 1024, flush_interval=1.0, queue_size=256):
+        self.frame_store = frame_store
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+
+        self.path = None
+        self.led_count = None
+        self.max_bytes = None
+        self.max_seconds = None
+        self.frames = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.started_at = None
+        self.stopped_reason = None
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._writer = None
+
+    @property
+    def active(self):
+        return self._queue is not None
+
+    def start(self, path, led_count, fingerprint, max_bytes=None, max_seconds=None):
+        """
+        Args:
+            path (str): File to create; an existing file is replaced.
+            led_count (int): LEDs per frame; other frame sizes are skipped.
+            fingerprint (str): Hex layout fingerprint from LedGeometryIndex.
+            max_bytes (int | None): Stop once the file reaches this size.
+            max_seconds (float | None): Stop after recording this long.
+        """
+        with self._lock:
+            if self.active:
+                raise RuntimeError(f"Already recording to {self.path}")
+
+            self.started_at = time.time()
+            header = HEADER.pack(MAGIC, VERSION, led_count, RECORD_PREFIX.size + led_count * 3,
+                                 self.started_at, bytes.fromhex(fingerprint))
+
+            file = open(path, "wb", buffering=self.buffer_size)
+            file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+            self.path = path
+            self.led_count = led_count
+            self.max_bytes = max_bytes
+            self.max_seconds = max_seconds
+            self.frames = 0
+            self.skipped = 0
+            self.dropped = 0
+            self.bytes_written = HEADER_SIZE
+            self.stopped_reason = None
+
+            deadline = time.monotonic() + max_seconds if max_seconds else None
+            self._queue = queue.Queue(self.queue_size)
+            self._writer = threading.Thread(
+                target=self._write,
+                args=(file, self._queue, deadline),
+                name="led-recorder",
+                daemon=True,
+            )
+            self._writer.start()
+
+        self.frame_store.add_listener(self._on_frame)
+
+    def stop(self, reason="stopped by request"):
+        """Stop recording and wait until queued frames are on disk."""
+        with self._lock:
+            frames = self._detach(reason)
+            writer = self._writer
+        if frames is not None:
+            # A writer that already ended on a limit no longer drains the queue.
+            while writer.is_alive():
+                try:
+                    frames.put(_STOP, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            writer.join(STOP_TIMEOUT)
+        return self.stats()
+
+    def _detach(self, reason):
+        """Stop taking frames; returns the writer's queue if it was still open."""
+        frames = self._queue
+        if frames is None:
+            return None
+        self.frame_store.remove_listener(self._on_frame)
+        self._queue = None
+        self.stopped_reason = reason
+        return frames
+
+    def _on_frame(self, frame):
+        frames = self._queue
+        if frames is None:
+            return
+        if frame.led_count != self.led_count:
+            self.skipped += 1
+            return
+        try:
+            frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, file, frames, deadline):
+        last_flush = time.monotonic()
+        reason = None
+        try:
+            while reason is None:
+                try:
+                    frame = frames.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    frame = None
+                if frame is _STOP:
+                    break
+
+                if frame is not None:
+                    file.write(RECORD_PREFIX.pack(frame.timestamp, frame.seq))
+                    file.write(frame.rgb)
+                    self.frames += 1
+                    self.bytes_written += RECORD_PREFIX.size + len(frame.rgb)
+                    if self.max_bytes and self.bytes_written >= self.max_bytes:
+                        reason = "size limit reached"
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    reason = reason or "time limit reached"
+                if now - last_flush >= self.flush_interval:
+                    file.flush()
+                    last_flush = now
+        except OSError as e:
+            reason = f"write failed: {e}"
+        finally:
+            file.close()
+
+        if reason is not None:
+            with self._lock:
+                if self._queue is frames:
+                    self._detach(reason)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "path": self.path,
+            "led_count": self.led_count,
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "bytes": self.bytes_written,
+            "max_seconds": self.max_seconds,
+            "started_at": self.started_at,
+            "stopped_reason": self.stopped_reason,
+        }
+
+
+class LedRecording:
+    """
+    Read-only view of a recording file, memory-mapped so frames are only
+    paged in when replayed. A file that is still being written is read up
+    to its last complete record.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not an LED recording")
+
+        magic, version, led_count, record_size, started_at, fingerprint = HEADER.unpack_from(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an LED recording")
+
+        self.path = path
+        self.led_count = led_count
+        self.started_at = started_at
+        self.fingerprint = fingerprint.hex()
+
+        dtype = record_dtype(led_count)
+        if dtype.itemsize != record_size:
+            raise ValueError(f"{path} has an unexpected record size")
+
+        count = (os.path.getsize(path) - HEADER_SIZE) // record_size
+        self.records = (
+            np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+            if count
+            else np.empty(0, dtype=dtype)
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        if len(self.records) < 2:
+            return 0.0
+        return float(self.records["timestamp"][-1] - self.records["timestamp"][0])
+
+    def describe(self) -> dict:
+        return {
+            "name": os.path.splitext(os.path.basename(self.path))[0],
+            "led_count": self.led_count,
+            "fingerprint": self.fingerprint,
+            "frames": len(self),
+            "duration": round(self.duration, 3),
+            "started_at": self.started_at,
+        }
+
+
+class LedReplay:
+    """
+    Pushes a recording back through the frame store, so fallback checks,
+    edge stats and every stream viewer see it as if HyperHDR sent it.
+    Live frames are held back while a replay runs.
+    """
+
+    def __init__(self, frame_store):
+        self.frame_store = frame_store
+        self.recording = None
+        self.speed = 1.0
+        self.position = 0
+        self.replays = 0
+        self._runner = None
+        self._generation = 0
+
+    @property
+    def active(self):
+        return self._runner is not None and not self._runner.done()
+
+    def start(self, recording, speed=1.0):
+        """
+        Args:
+            recording (LedRecording): Frames to replay.
+            speed (float): 1 for the original timing, 2 for twice as fast, ...
+        """
+        self.stop()
+        self._generation += 1
+        self.recording = recording
+        self.speed = speed
+        self.position = 0
+        self.replays += 1
+        self.frame_store.replaying = True
+        self._runner = submit(self._run(recording, speed, self._generation))
+
+    def stop(self):
+        if self.active:
+            self._runner.cancel()
+        self.frame_store.replaying = False
+
+    async def _run(self, recording, speed, generation):
+        loop = asyncio.get_running_loop()
+        timestamps = recording.records["timestamp"]
+        started = loop.time()
+
+        try:
+            for index in range(len(recording)):
+                due = started + (timestamps[index] - timestamps[0]) / speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                self.frame_store.publish(recording.records["rgb"][index].tobytes())
+                self.position = index + 1
+        finally:
+            # A replay started in the meantime keeps the pipeline.
+            if generation == self._generation:
+                self.frame_store.replaying = False
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "recording": self.recording.describe()["name"] if self.recording else None,
+            "speed": self.speed,
+            "position": self.position,
+            "frames": len(self.recording) if self.recording else 0,
+            "replays": self.replays,
+        }
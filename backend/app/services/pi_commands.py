@@ -6,6 +6,11 @@ import requests
 import subprocess
 from collections import defaultdict
 from .release_cache import save_to_releases_json, load_from_releases_json
+from .systemd_manager import systemd, SystemdError
+from .unit_states import UnitStateCache
+from app.middlewares.req_modifier import get_current_user
+from utils.root_helper import run_privileged
+from utils.device_facts import device_facts
 from dotenv import load_dotenv
 
 agent_process = None
@@ -19,11 +24,36 @@ load_dotenv()
 
 PAIRING_FLAG = "/home/pi/.paired"
 
+TRACKED_UNITS = [
+    f"hyperhdr@{get_current_user()}.service",
+    "auto_pair_agent.service",
+    "wifi_utilities.service",
+    "avahi-daemon.service",
+]
+
+# Kept current by systemd signals, so status reads stay in-process.
+unit_states = UnitStateCache(TRACKED_UNITS)
+
 
 def _get_service_status(service_name, type="status"):
+    cached = unit_states.get(service_name)
+    if cached is not None:
+        if type == "status":
+            return cached.get("active_state", "unknown")
+        return cached.get("unit_file_state") or "not-found"
+
+    if systemd.available:
+        try:
+            if type == "status":
+                return systemd.active_state(service_name)
+            return systemd.unit_file_state(service_name)
+        except SystemdError as e:
+            print(f"Failed to read {service_name} state: {e}")
+            return "unknown"
+
     cmd = "is-active" if type == "status" else "is-enabled"
     result = subprocess.run(
-        ["sudo", "systemctl", cmd, service_name],
+        ["systemctl", cmd, service_name],
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
@@ -31,6 +61,68 @@ def _get_service_status(service_name, type="status"):
     return result.stdout.strip()
 
 
+# polkit can only scope unit start/stop to single units; enabling unit files
+# and reloading systemd are global, so those go through the root helper's
+# allow-listed systemctl instead of D-Bus.
+HELPER_SYSTEMCTL_ACTIONS = {"enable", "disable", "daemon-reload"}
+
+
+def _systemctl(action, service_name=None, check=True):
+    """
+    Start/stop/restart a unit over D-Bus, falling back to systemctl through
+    the root helper where the system bus is not available. Enable, disable
+    and daemon-reload always use the root helper.
+
+    Raises:
+        subprocess.CalledProcessError: If `check` is set and the action failed.
+    """
+    if action not in HELPER_SYSTEMCTL_ACTIONS and systemd.available:
+        try:
+            getattr(systemd, action)(service_name)
+        except SystemdError:
+            if check:
+                raise
+        return
+
+    run_privileged("systemctl", check=check, action=action, unit=service_name)
+
+
+def get_services_status():
+    """
+    State of every tracked unit.
+
+    Returns:
+        dict: `version` (bumped on every transition), `synced` (whether the
+        states come from the signal-fed cache) and per-unit states.
+    """
+    snapshot = unit_states.snapshot()
+    if snapshot["synced"]:
+        return snapshot
+
+    return {
+        **snapshot,
+        "units": {
+            unit: {
+                "active_state": _get_service_status(unit),
+                "unit_file_state": _get_service_status(unit, type="boot"),
+            }
+            for unit in TRACKED_UNITS
+        },
+    }
+
+
+def wait_for_services_change(since, timeout):
+    """
+    Long-poll for a unit state transition after version `since`.
+    Without signal support this only waits out the timeout.
+    """
+    if unit_states.supported:
+        unit_states.wait_for_change(since, timeout)
+    else:
+        time.sleep(timeout)
+    return get_services_status()
+
+
 def fetch_github_versions(fetch_bookworm: bool = False):
     """Fetch HyperHDR releases with architecture- and Bookworm-aware filtering."""
 
@@ -139,31 +231,10 @@ def fetch_github_versions(fetch_bookworm: bool = False):
 
 
 def get_system_info():
-    command = "uname -m && (cat /etc/os-release || cat /etc/*release || lsb_release -a)"
-    result = subprocess.run(
-        command, shell=True, capture_output=True, text=True, check=True
-    )
-
-    output = result.stdout.strip().splitlines()
-
-    data = {}
-    if output:
-        # First line is architecture
-        data["ARCH"] = output[0].strip()
-
-        # Remaining lines are OS info
-        for line in output[1:]:
-            if "=" in line:
-                key, val = line.split("=", 1)
-                data[key.strip()] = val.strip().strip('"')
-            elif ":" in line:
-                key, val = line.split(":", 1)
-                data[key.strip().upper()] = val.strip()
-
     return {
         "status": "success",
         "message": "Fetched system info successfully",
-        "data": data,
+        "data": device_facts.system_info(),
     }
 
 
@@ -185,18 +256,12 @@ def get_hyperhdr_version():
 
 
 def start_hyperhdr_service(username):
-    result = subprocess.run(
-        ["sudo", "systemctl", "start", f"hyperhdr@{username}.service"],
-        capture_output=True,
-        text=True,
-    )
+    _systemctl("start", f"hyperhdr@{username}.service", check=False)
     return {"status": "success", "message": "Service started successfully."}
 
 
 def stop_hyperhdr_service(username):
-    subprocess.run(
-        ["sudo", "systemctl", "stop", f"hyperhdr@{username}.service"], check=True
-    )
+    _systemctl("stop", f"hyperhdr@{username}.service")
     return {"status": "success", "message": "Service stopped successfully."}
 
 
@@ -210,16 +275,12 @@ def status_hyperhdr_service(username):
 
 
 def enable_hyperhdr_service_on_boot(username):
-    subprocess.run(
-        ["sudo", "systemctl", "enable", f"hyperhdr@{username}.service"], check=True
-    )
+    _systemctl("enable", f"hyperhdr@{username}.service")
     return {"status": "success", "message": "Service enabled on boot successfully."}
 
 
 def disable_hyperhdr_service_on_boot(username):
-    subprocess.run(
-        ["sudo", "systemctl", "disable", f"hyperhdr@{username}.service"], check=True
-    )
+    _systemctl("disable", f"hyperhdr@{username}.service")
     return {"status": "success", "message": "Service disabled from boot successfully."}
 
 
@@ -234,9 +295,7 @@ def boot_status_hyperhdr_service(username):
 
 
 def uninstall_current_hyper_hdr_service():
-    subprocess.run(
-        ["sudo", "dpkg", "-r", "hyperhdr"], check=True, capture_output=True, text=True
-    )
+    run_privileged("dpkg_remove")
     return {"status": "success", "message": "Current hyperhdr unistalled successfully."}
 
 
@@ -257,25 +316,7 @@ def start_hotspot(ssid="Pi-Hotspot", password="raspberry123", interface="wlan0")
         )
 
         # Start the hotspot
-        result = subprocess.run(
-            [
-                "sudo",
-                "nmcli",
-                "device",
-                "wifi",
-                "hotspot",
-                f"ifname",
-                interface,
-                f"ssid",
-                ssid,
-                f"password",
-                password,
-            ],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+        result = run_privileged("hotspot_start", ifname=interface, ssid=ssid, password=password)
         return {"status": "success", "output": result.stdout}
     except subprocess.CalledProcessError as e:
         return {"status": "error", "error": e.stderr}
@@ -284,7 +325,7 @@ def start_hotspot(ssid="Pi-Hotspot", password="raspberry123", interface="wlan0")
 def stop_hotspot():
     # Get list of active connections
     result = subprocess.run(
-        ["sudo", "nmcli", "-t", "-f", "NAME,TYPE", "con", "show", "--active"],
+        ["nmcli", "-t", "-f", "NAME,TYPE", "con", "show", "--active"],
         check=True,
         stdout=subprocess.PIPE,
         text=True,
@@ -296,7 +337,7 @@ def stop_hotspot():
         name, conn_type = conn.split(":")
         if name.lower() == "hotspot":
             # Bring down the hotspot connection
-            subprocess.run(["sudo", "nmcli", "con", "down", name], check=True)
+            run_privileged("wifi_down", name=name)
             return {"status": "success", "message": f"Hotspot '{name}' stopped."}
 
     return {"status": "error", "message": "No active hotspot found."}
@@ -353,8 +394,8 @@ def start_ble_service():
     if res["ble_status"] == "active":
         return {"status": "success", "message": "BLE services already running."}
 
-    subprocess.run(["sudo", "systemctl", "start", "auto_pair_agent.service"])
-    subprocess.run(["sudo", "systemctl", "start", "wifi_utilities.service"])
+    _systemctl("start", "auto_pair_agent.service", check=False)
+    _systemctl("start", "wifi_utilities.service", check=False)
 
     return {"status": "success", "message": "BLE services started successfully."}
 
@@ -364,64 +405,28 @@ def stop_ble_service():
     if res["ble_status"] != "active":
         return {"status": "success", "message": "BLE services are already stopped."}
 
-    subprocess.run(["sudo", "systemctl", "stop", "wifi_utilities.service"])
-    subprocess.run(["sudo", "systemctl", "stop", "auto_pair_agent.service"])
+    _systemctl("stop", "wifi_utilities.service", check=False)
+    _systemctl("stop", "auto_pair_agent.service", check=False)
 
     return {"status": "success", "message": "BLE services stopped successfully."}
 
 
 def get_device_mac():
-    try:
-        ble_output = subprocess.check_output(["hciconfig"], text=True)
-        match = re.search(r"BD Address: ([0-9A-F:]{17})", ble_output)
-        if match:
-            return {
-                "status": "success",
-                "mac": match.group(1).lower(),
-                "message": "Fetched MAC successfully.",
-            }
-    except subprocess.CalledProcessError:
-        pass
-
-    for iface in ["eth0", "wlan0"]:
-        try:
-            result = subprocess.run(
-                ["cat", f"/sys/class/net/{iface}/address"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True,
-            )
-            mac = result.stdout.strip()
-            if mac and mac != "00:00:00:00:00:00":
-                return {
-                    "status": "success",
-                    "mac": mac,
-                    "message": "Fetched MAC successfully.",
-                }
-        except subprocess.CalledProcessError:
-            continue
+    mac = device_facts.mac()
+    if mac:
+        return {
+            "status": "success",
+            "mac": mac,
+            "message": "Fetched MAC successfully.",
+        }
 
     return {"status": "failed", "mac": None, "message": "Failed ti fetched MAC."}
 
 
 def set_hostname(hostname):
-    result = subprocess.run(
-        ["sudo", "hostnamectl", "set-hostname", hostname],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    subprocess.run(
-        [
-            "sudo",
-            "sed",
-            "-i",
-            f"s/^127\\.0\\.1\\.1[[:space:]]\\+.*/127.0.1.1       {hostname}/",
-            "/etc/hosts",
-        ],
-        check=True,
-    )
+    result = run_privileged("set_hostname", check=False, hostname=hostname)
+    run_privileged("set_hosts_hostname", hostname=hostname)
+    device_facts.refresh()
 
     return {
         "status": "success",
@@ -431,37 +436,32 @@ def set_hostname(hostname):
 
 
 def restart_systemctl_service(service):
-    subprocess.run(
-        ["sudo", "systemctl", "restart", service],
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    _systemctl("restart", service)
     return {"status": "success", "message": f"{service} restarted successfully."}
 
 
-def reset_service():
-    subprocess.run(
-        ["sudo", "dpkg", "--purge", "hyperhdr"],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
+def purge_hyperhdr(job):
+    job.progress(dpkg_phase="purging")
+    run_privileged("dpkg_purge")
+    job.progress(dpkg_phase="purged")
 
-    subprocess.run(
-        ["sudo", "apt", "autoremove", "-y"], check=True, capture_output=True, text=True
-    )
 
-    subprocess.run(["sudo", "rm", "-rf", "/etc/hyperhdr"], check=False)
-    subprocess.run(["sudo", "rm", "-rf", "/opt/hyperhdr"], check=False)
-    subprocess.run(["sudo", "rm", "-rf", "/var/lib/hyperhdr"], check=False)
-    subprocess.run(
-        ["sudo", "rm", "-f", "/etc/systemd/system/hyperhdr.service"], check=False
-    )
-    subprocess.run(["sudo", "systemctl", "daemon-reload"], check=False)
+def autoremove_packages(job):
+    return {"stdout": run_privileged("apt_autoremove").stdout}
 
-    return {
-        "status": "success",
-        "message": "HyperHDR fully uninstalled and orphaned packages removed.",
-    }
+
+def remove_hyperhdr_files(job):
+    run_privileged("remove_hyperhdr_files", check=False)
+
+
+def reload_systemd(job):
+    _systemctl("daemon-reload", check=False)
+
+
+# Full HyperHDR uninstall, as job engine steps; orphaned packages go too.
+RESET_STEPS = [
+    ("purge", purge_hyperhdr),
+    ("autoremove", autoremove_packages),
+    ("remove-files", remove_hyperhdr_files),
+    ("daemon-reload", reload_systemd),
+]
@@ -0,0 +1,119 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class ServerInfoSnapshot:
+    """
+    Shared copy of the serverinfo `info` block with a short TTL.
+
+    Concurrent callers that find the snapshot stale wait on the same
+    in-flight fetch instead of each issuing their own serverinfo, whether
+    they come through `get` or `get_async`.
+    """
+
+    def __init__(self, fetch, ttl, fetch_async=None):
+        self._fetch = fetch
+        self._fetch_async = fetch_async
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._info = None
+        self._fetched_at = 0.0
+        self._generation = 0
+        self._inflight = None
+        self._listeners = []
+        self._stats = {"hits": 0, "fetches": 0, "shared": 0, "invalidations": 0}
+
+    def add_listener(self, callback):
+        """Register a callback that receives every freshly fetched `info` block."""
+        self._listeners.append(callback)
+
+    def _claim(self):
+        """
+        Returns:
+            tuple: (info, future, generation). `info` is set on a cache hit;
+            otherwise `generation` is None when joining someone else's fetch
+            and set when the caller owns `future` and must fetch.
+        """
+        with self._lock:
+            if self._info is not None and time.monotonic() - self._fetched_at < self.ttl:
+                self._stats["hits"] += 1
+                return self._info, None, None
+
+            if self._inflight is not None:
+                self._stats["shared"] += 1
+                return None, self._inflight, None
+
+            self._stats["fetches"] += 1
+            self._inflight = Future()
+            return None, self._inflight, self._generation
+
+    def _settle(self, future, generation, reply=None, error=None):
+        with self._lock:
+            if self._inflight is future:
+                self._inflight = None
+            # A write that landed while we were fetching makes this reply
+            # stale: it is handed to the caller but neither cached nor
+            # passed on to listeners.
+            current = error is None and generation == self._generation
+            if current:
+                self._info = reply.get("info", {})
+                self._fetched_at = time.monotonic()
+
+        if error is not None:
+            future.set_exception(error)
+            return None
+
+        info = reply.get("info", {})
+        for callback in self._listeners if current else ():
+            try:
+                callback(info)
+            except Exception as e:
+                print(f"Serverinfo listener failed: {e}")
+        future.set_result(info)
+        return info
+
+    def get(self) -> dict:
+        info, future, generation = self._claim()
+        if info is not None:
+            return info
+        if generation is None:
+            return future.result()
+
+        try:
+            reply = self._fetch()
+        except BaseException as e:
+            self._settle(future, generation, error=e)
+            raise
+        return self._settle(future, generation, reply)
+
+    async def get_async(self) -> dict:
+        """Same as `get`, but waits for the fetch without blocking the event loop."""
+        info, future, generation = self._claim()
+        if info is not None:
+            return info
+        if generation is None:
+            return await asyncio.wrap_future(future)
+
+        try:
+            if self._fetch_async is not None:
+                reply = await self._fetch_async()
+            else:
+                reply = await asyncio.to_thread(self._fetch)
+        except BaseException as e:
+            self._settle(future, generation, error=e)
+            raise
+        return self._settle(future, generation, reply)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._info = None
+            self._inflight = None
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = time.monotonic() - self._fetched_at if self._info is not None else None
+            return {**self._stats, "ttl": self.ttl, "age": age}
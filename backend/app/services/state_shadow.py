@@ -0,0 +1,231 @@
+import time
+from .event_loop import submit
+
+SUBSCRIPTIONS = [
+    "priorities-update",
+    "adjustment-update",
+    "components-update",
+    "effects-update",
+    "leds-update",
+]
+
+
+class StateShadow:
+    """
+    In-memory copy of the serverinfo `info` block kept current by pushes.
+
+    On every (re)connect a full serverinfo is requested together with the
+    subscriptions above; after that HyperHDR pushes each change and the
+    matching key is patched. Readers get an immutable dict that is swapped
+    on every change, or None while the shadow is not in sync.
+
+    Writes made by this backend mark the shadow stale until a serverinfo
+    read back after the write has replaced it, so a read right after a
+    write never sees the state from before it.
+    """
+
+    def __init__(self, session, resync_timeout=5.0):
+        self.session = session
+        self.resync_timeout = resync_timeout
+
+        self.resyncs = 0
+        self.refreshes = 0
+        self.updates = 0
+        self.last_error = None
+
+        self._info = None
+        self._stale = False
+        self._writes = 0
+        self._synced_at = None
+        self._updated_at = None
+        self._started = False
+        self._listeners = []
+
+        session.on_connect(self._resync)
+        session.on_disconnect(self._on_disconnect)
+        session.subscribe("priorities-update", self._on_priorities)
+        session.subscribe("adjustment-update", self._on_adjustment)
+        session.subscribe("components-update", self._on_component)
+        session.subscribe("effects-update", self._on_effects)
+        session.subscribe("leds-update", self._on_leds)
+
+    def start(self):
+        """Connect in the background; the first sync happens on connect."""
+        if not self._started:
+            self._started = True
+            self.session.start()
+
+    def info(self):
+        """
+        Returns:
+            dict | None: The shadowed serverinfo, or None until the first
+            sync after a (re)connect has completed and while a local write
+            has not been read back yet.
+        """
+        self.start()
+        return None if self._stale else self._info
+
+    def mark_stale(self):
+        """
+        Called after this backend sent a write. Readers fall back to the
+        serverinfo snapshot until a fresh serverinfo has been read back.
+        """
+        self._writes += 1
+        if self._info is not None:
+            self._stale = True
+            submit(self._refresh(self._writes))
+
+    def add_listener(self, callback):
+        """Register a callback run with (command, info) after every change."""
+        self._listeners.append(callback)
+
+    async def _resync(self):
+        try:
+            reply = await self.session.request(
+                {"command": "serverinfo", "subscribe": SUBSCRIPTIONS},
+                self.resync_timeout,
+            )
+        except Exception as e:
+            self.last_error = str(e) or type(e).__name__
+            return
+
+        self._info = reply.get("info", {})
+        self._stale = False
+        self._synced_at = self._updated_at = time.monotonic()
+        self.resyncs += 1
+        self._notify("serverinfo")
+
+    async def _refresh(self, writes):
+        try:
+            reply = await self.session.request({"command": "serverinfo"}, self.resync_timeout)
+        except Exception as e:
+            # Stays stale; the next write or reconnect reads it back again.
+            self.last_error = str(e) or type(e).__name__
+            return
+
+        # A newer write has its own refresh in flight.
+        if writes != self._writes or self._info is None:
+            return
+        self._info = reply.get("info", {})
+        self._stale = False
+        self._updated_at = time.monotonic()
+        self.refreshes += 1
+        self._notify("serverinfo")
+
+    def _on_disconnect(self):
+        self._info = None
+        self._stale = False
+
+    def _patch(self, command, key, value):
+        if self._info is None:
+            return
+        self._info = {**self._info, key: value}
+        self._updated_at = time.monotonic()
+        self.updates += 1
+        self._notify(command)
+
+    def _on_priorities(self, data):
+        update = data.get("data", {})
+        self._patch("priorities-update", "priorities", update.get("priorities", []))
+
+    def _on_adjustment(self, data):
+        self._patch("adjustment-update", "adjustment", data.get("data", []))
+
+    def _on_component(self, data):
+        if self._info is None:
+            return
+        component = data.get("data", {})
+        components = [
+            {**current, "enabled": component.get("enabled")}
+            if current.get("name") == component.get("name") else current
+            for current in self._info.get("components", [])
+        ]
+        self._patch("components-update", "components", components)
+
+    def _on_effects(self, data):
+        update = data.get("data", {})
+        self._patch("effects-update", "effects", update.get("effects", []))
+
+    def _on_leds(self, data):
+        update = data.get("data", {})
+        self._patch("leds-update", "leds", update.get("leds", []))
+
+    def _notify(self, command):
+        for callback in self._listeners:
+            try:
+                callback(command, self._info)
+            except Exception as e:
+                print(f"State shadow listener failed: {e}")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "synced": self._info is not None,
+            "stale": self._stale,
+            "resyncs": self.resyncs,
+            "refreshes": self.refreshes,
+            "updates": self.updates,
+            "synced_age": round(now - self._synced_at, 3) if self._synced_at else None,
+            "updated_age": round(now - self._updated_at, 3) if self._updated_at else None,
+            "last_error": self.last_error,
+        }
+
+
+def visible_priority(priorities):
+    """The priority HyperHDR is currently showing, or None."""
+    for priority in priorities or []:
+        if priority.get("visible"):
+            return priority
+    return None
+
+
+def priority_shows(priority, kind, value):
+    """True when `priority` is the color or effect described by (kind, value)."""
+    if priority is None:
+        return False
+    component = priority.get("componentId", "").lower()
+    if kind == "color":
+        shown = priority.get("value")
+        return component == "color" and isinstance(shown, dict) and shown.get("RGB") == value
+    if kind == "effect":
+        return component == "effect" and priority.get("owner") == value
+    return False
+
+
+class LastAppliedMemo:
+    """
+    Remembers the last color/effect this backend applied, so an identical
+    write can be answered without asking HyperHDR.
+
+    The memo is only trusted while the state shadow is in sync: every
+    priorities push is checked against it and anything that shows a
+    different visible priority (another client, a timeout, a grabber
+    taking over) forgets it.
+    """
+
+    def __init__(self, shadow):
+        self.shadow = shadow
+        self.hits = 0
+        self._applied = None
+        shadow.add_listener(self._on_change)
+
+    def remember(self, kind, value):
+        self._applied = (kind, value)
+
+    def forget(self):
+        self._applied = None
+
+    def matches(self, kind, value) -> bool:
+        if self.shadow.info() is None or self._applied != (kind, value):
+            return False
+        self.hits += 1
+        return True
+
+    def _on_change(self, command, info):
+        if command not in ("priorities-update", "serverinfo") or self._applied is None:
+            return
+        if not priority_shows(visible_priority(info.get("priorities")), *self._applied):
+            self._applied = None
+
+    def stats(self) -> dict:
+        return {"applied": list(self._applied) if self._applied else None, "hits": self.hits}
@@ -0,0 +1,181 @@
+import time
+import threading
+import subprocess
+
+try:
+    import dbus
+except ImportError:  # dev machines without dbus-python; pi_commands falls back to sudo
+    dbus = None
+
+SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+MANAGER_IFACE = "org.freedesktop.systemd1.Manager"
+UNIT_IFACE = "org.freedesktop.systemd1.Unit"
+JOB_IFACE = "org.freedesktop.systemd1.Job"
+DBUS_PROP_IFACE = "org.freedesktop.DBus.Properties"
+
+# Errors after which the cached bus connection is dropped and the call retried once.
+RECONNECT_ERRORS = {
+    "org.freedesktop.DBus.Error.Disconnected",
+    "org.freedesktop.DBus.Error.NoReply",
+    "org.freedesktop.DBus.Error.ServiceUnknown",
+}
+
+
+class SystemdError(subprocess.CalledProcessError):
+    """
+    A failed systemd call. Subclasses CalledProcessError so the routes that
+    handled failed `sudo systemctl` runs handle it unchanged.
+    """
+
+    def __init__(self, action, unit, message):
+        super().__init__(1, ["systemctl", action, unit], stderr=message)
+        self.action = action
+        self.unit = unit
+        self.message = message
+
+    def __str__(self):
+        return f"systemctl {self.action} {self.unit} failed: {self.message}"
+
+
+class SystemdManager:
+    """
+    Talks to systemd over one shared system-bus connection instead of
+    forking `sudo systemctl` per query. Unit states are read as D-Bus
+    properties; start/stop/restart wait for their job like systemctl does.
+
+    Unprivileged callers need the polkit rule installed by setup.sh, which
+    only covers starting, stopping and restarting the backend's own units.
+    """
+
+    RETRY_AFTER = 30.0
+
+    def __init__(self, job_timeout=90.0, poll_interval=0.05):
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+
+        self._lock = threading.RLock()
+        self._bus = None
+        self._manager = None
+        self._unit_paths = {}
+        self._unavailable_until = 0.0
+
+        self.calls = 0
+        self.reconnects = 0
+
+    @property
+    def available(self):
+        """
+        False without dbus-python or a reachable system bus. A failed
+        connection is retried after `RETRY_AFTER` seconds.
+        """
+        if dbus is None or time.monotonic() < self._unavailable_until:
+            return False
+        try:
+            self._connect()
+        except dbus.exceptions.DBusException as e:
+            print(f"systemd D-Bus unavailable, using systemctl: {e}")
+            self._unavailable_until = time.monotonic() + self.RETRY_AFTER
+            return False
+        return True
+
+    def _connect(self):
+        with self._lock:
+            if self._manager is None:
+                self._bus = dbus.SystemBus(private=True)
+                self._manager = dbus.Interface(
+                    self._bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_PATH, introspect=False),
+                    MANAGER_IFACE,
+                )
+                self._unit_paths.clear()
+            return self._manager
+
+    def _reset(self):
+        with self._lock:
+            if self._bus is not None:
+                try:
+                    self._bus.close()
+                except Exception:
+                    pass
+            self._bus = None
+            self._manager = None
+            self._unit_paths.clear()
+            self.reconnects += 1
+
+    def _call(self, action, unit, fn):
+        """Run `fn(manager)` under the lock, reconnecting once on a dropped bus."""
+        with self._lock:
+            self.calls += 1
+            for attempt in range(2):
+                try:
+                    return fn(self._connect())
+                except dbus.exceptions.DBusException as e:
+                    if attempt == 0 and e.get_dbus_name() in RECONNECT_ERRORS:
+                        self._reset()
+                        continue
+                    raise SystemdError(action, unit, e.get_dbus_message() or str(e)) from None
+
+    def _properties(self, path):
+        return dbus.Interface(self._bus.get_object(SYSTEMD_BUS_NAME, path, introspect=False), DBUS_PROP_IFACE)
+
+    def _unit_path(self, manager, unit):
+        path = self._unit_paths.get(unit)
+        if path is None:
+            # LoadUnit also resolves units that are not loaded, unlike GetUnit.
+            path = self._unit_paths[unit] = manager.LoadUnit(unit)
+        return path
+
+    def unit_property(self, unit, name):
+        return self._call(
+            "show",
+            unit,
+            lambda manager: self._properties(self._unit_path(manager, unit)).Get(UNIT_IFACE, name),
+        )
+
+    def active_state(self, unit) -> str:
+        """Same value `systemctl is-active` prints, e.g. "active" or "failed"."""
+        return str(self.unit_property(unit, "ActiveState"))
+
+    def unit_file_state(self, unit) -> str:
+        """Same value `systemctl is-enabled` prints, e.g. "enabled" or "disabled"."""
+        return str(self.unit_property(unit, "UnitFileState")) or "not-found"
+
+    def start(self, unit):
+        self._run_job("start", unit, "StartUnit")
+        if self.active_state(unit) == "failed":
+            raise SystemdError("start", unit, "unit entered the failed state")
+
+    def stop(self, unit):
+        self._run_job("stop", unit, "StopUnit")
+
+    def restart(self, unit):
+        self._run_job("restart", unit, "RestartUnit")
+        if self.active_state(unit) == "failed":
+            raise SystemdError("restart", unit, "unit entered the failed state")
+
+    def _run_job(self, action, unit, method):
+        job = self._call(action, unit, lambda manager: getattr(manager, method)(unit, "replace"))
+
+        # The job object disappears from the bus once systemd has finished it.
+        deadline = time.monotonic() + self.job_timeout
+        while time.monotonic() < deadline:
+            try:
+                with self._lock:
+                    self._connect()
+                    self._properties(job).Get(JOB_IFACE, "State")
+            except dbus.exceptions.DBusException:
+                return
+            time.sleep(self.poll_interval)
+        raise SystemdError(action, unit, f"job did not finish within {self.job_timeout:g}s")
+
+    def stats(self) -> dict:
+        return {
+            "available": dbus is not None and time.monotonic() >= self._unavailable_until,
+            "connected": self._manager is not None,
+            "calls": self.calls,
+            "reconnects": self.reconnects,
+            "units": sorted(self._unit_paths),
+        }
+
+
+systemd = SystemdManager()
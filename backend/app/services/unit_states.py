@@ -0,0 +1,228 @@
+import time
+import threading
+from .systemd_manager import (
+    dbus,
+    SYSTEMD_BUS_NAME,
+    SYSTEMD_PATH,
+    MANAGER_IFACE,
+    UNIT_IFACE,
+    DBUS_PROP_IFACE,
+)
+
+try:
+    from gi.repository import GLib
+    from dbus.mainloop.glib import DBusGMainLoop
+except ImportError:  # no signal support; status reads go to systemd directly
+    GLib = None
+
+# Unit properties mirrored from systemd, by the key they are reported under.
+TRACKED_PROPERTIES = {
+    "ActiveState": "active_state",
+    "SubState": "sub_state",
+    "UnitFileState": "unit_file_state",
+}
+
+
+def unit_name(name):
+    """`avahi-daemon` and `avahi-daemon.service` name the same unit."""
+    return name if "." in name else f"{name}.service"
+
+
+class UnitStateCache:
+    """
+    In-memory copy of the state of a few systemd units, kept current by
+    systemd's PropertiesChanged signals instead of querying on every read.
+
+    A GLib main loop on its own daemon thread owns a private system-bus
+    connection: it reads every unit once, then applies the signals as they
+    arrive. `UnitFilesChanged` and `Reloading` trigger a full re-read, as
+    enable/disable and daemon-reload do not signal per-unit changes.
+
+    Readers block in `wait_for_change` to be woken on the next transition.
+    """
+
+    def __init__(self, units, retry_delay=5.0):
+        self.units = [unit_name(unit) for unit in units]
+        self.retry_delay = retry_delay
+
+        self.version = 0
+        self.signals = 0
+        self.refreshes = 0
+        self.last_error = None
+
+        self._cond = threading.Condition()
+        self._states = {}
+        self._paths = {}
+        self._synced = False
+        self._thread = None
+        self._loop = None
+        self._bus = None
+        self._manager = None
+
+    @property
+    def supported(self):
+        return dbus is not None and GLib is not None
+
+    @property
+    def synced(self):
+        return self._synced
+
+    def start(self):
+        if self._thread is None and self.supported:
+            self._thread = threading.Thread(target=self._run, name="unit-states", daemon=True)
+            self._thread.start()
+
+    def get(self, unit):
+        """Cached state of `unit`, or None while the cache is not in sync."""
+        self.start()
+        if not self._synced:
+            return None
+        return self._states.get(unit_name(unit))
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "version": self.version,
+                "synced": self._synced,
+                "units": {unit: dict(state) for unit, state in self._states.items()},
+            }
+
+    def wait_for_change(self, since, timeout):
+        """
+        Block until the state version moves past `since`.
+
+        Returns:
+            dict: `snapshot()` after the change, or on timeout.
+        """
+        self.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > since, timeout)
+        return self.snapshot()
+
+    def _run(self):
+        while True:
+            try:
+                self._loop = GLib.MainLoop()
+                self._connect()
+                self._loop.run()
+                self.last_error = "system bus disconnected"
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Unit state cache lost systemd: {e}")
+            finally:
+                self._close_bus()
+
+            with self._cond:
+                self._synced = False
+                self.version += 1
+                self._cond.notify_all()
+            time.sleep(self.retry_delay)
+
+    def _close_bus(self):
+        """Close the private connection so retries do not leak one each."""
+        bus, self._bus, self._manager = self._bus, None, None
+        if bus is not None:
+            try:
+                bus.close()
+            except dbus.DBusException:
+                pass
+
+    def _connect(self):
+        bus = dbus.SystemBus(mainloop=DBusGMainLoop(), private=True)
+        self._bus = bus
+        self._manager = dbus.Interface(
+            bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_PATH, introspect=False),
+            MANAGER_IFACE,
+        )
+        # systemd only emits unit signals while some client is subscribed.
+        self._manager.Subscribe()
+
+        self._paths = {}
+        for unit in self.units:
+            path = str(self._manager.LoadUnit(unit))
+            self._paths[path] = unit
+            bus.add_signal_receiver(
+                self._on_properties_changed,
+                signal_name="PropertiesChanged",
+                dbus_interface=DBUS_PROP_IFACE,
+                bus_name=SYSTEMD_BUS_NAME,
+                path=path,
+                path_keyword="path",
+            )
+
+        for signal in ("UnitFilesChanged", "Reloading"):
+            bus.add_signal_receiver(
+                self._on_manager_signal,
+                signal_name=signal,
+                dbus_interface=MANAGER_IFACE,
+                bus_name=SYSTEMD_BUS_NAME,
+                path=SYSTEMD_PATH,
+            )
+
+        bus.call_on_disconnection(lambda _: self._loop.quit())
+        self._refresh()
+
+    def _refresh(self):
+        states = {}
+        for path, unit in self._paths.items():
+            properties = dbus.Interface(
+                self._bus.get_object(SYSTEMD_BUS_NAME, path, introspect=False),
+                DBUS_PROP_IFACE,
+            ).GetAll(UNIT_IFACE)
+            states[unit] = self._convert(properties)
+
+        with self._cond:
+            for unit, state in states.items():
+                self._update(unit, state)
+            self._synced = True
+            self.refreshes += 1
+            self.version += 1
+            self._cond.notify_all()
+
+    def _convert(self, properties):
+        return {
+            key: str(properties[name])
+            for name, key in TRACKED_PROPERTIES.items()
+            if name in properties
+        }
+
+    def _update(self, unit, changes):
+        state = self._states.setdefault(unit, {})
+        if all(state.get(key) == value for key, value in changes.items()):
+            return False
+        state.update(changes)
+        state["changed_at"] = time.time()
+        return True
+
+    def _on_properties_changed(self, interface, changed, invalidated, path=None):
+        if interface != UNIT_IFACE or path not in self._paths:
+            return
+
+        changes = self._convert(changed)
+        if not changes:
+            return
+
+        with self._cond:
+            self.signals += 1
+            if self._update(self._paths[path], changes):
+                self.version += 1
+                self._cond.notify_all()
+
+    def _on_manager_signal(self, *args):
+        # Reloading(True) announces a reload; the state is read after it.
+        if args and bool(args[0]):
+            return
+        try:
+            self._refresh()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    def stats(self) -> dict:
+        return {
+            "supported": self.supported,
+            "synced": self._synced,
+            "version": self.version,
+            "signals": self.signals,
+            "refreshes": self.refreshes,
+            "last_error": self.last_error,
+        }
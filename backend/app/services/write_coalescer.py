@@ -0,0 +1,76 @@
+import asyncio
+from collections import defaultdict
+
+
+class WriteCoalescer:
+    """
+    Collapses bursts of writes to the same key into one upstream command.
+
+    A write waits `window` seconds before it is sent. Writes to the same key
+    arriving in that time replace its value, and the superseded callers are
+    acknowledged with `{"coalesced": True}` without reaching HyperHDR.
+    Forwarded writes for one key are sent in order, one at a time.
+
+    Runs on the backend loop; use `event_loop.run_sync` from other threads.
+    """
+
+    def __init__(self, send, window=0.05):
+        self._send = send
+        self.window = window
+        self._pending = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+        self.received = 0
+        self.forwarded = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    async def write(self, key, value):
+        """
+        Args:
+            key (str): What is being written, e.g. "brightness".
+            value: New value for `key`.
+
+        Returns:
+            The HyperHDR reply, or `{"coalesced": True}` if a newer write
+            for the same key replaced this one.
+        """
+        self.received += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            _, superseded = pending
+            if not superseded.done():
+                superseded.set_result({"coalesced": True})
+            self.coalesced += 1
+        else:
+            loop.call_later(self.window, lambda: loop.create_task(self._flush(key)))
+
+        self._pending[key] = (value, future)
+        return await future
+
+    async def _flush(self, key):
+        async with self._locks[key]:
+            value, future = self._pending.pop(key)
+            self.forwarded += 1
+            try:
+                res = await self._send(key, value)
+            except Exception as e:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+                return
+            if not future.done():
+                future.set_result(res)
+
+    def stats(self) -> dict:
+        return {
+            "window": self.window,
+            "received": self.received,
+            "forwarded": self.forwarded,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "pending": len(self._pending),
+        }
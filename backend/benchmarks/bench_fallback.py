@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: per-LED Python fallback detection vs. the NumPy engine.
+
+Run from the backend directory:
+    python -m benchmarks.bench_fallback
+"""
+
+import random
+import timeit
+from benchmarks.fallback_reference import (
+    transform_flat_led_colors_for_each_led,
+    add_color_to_led_position_data,
+    get_leds_by_direction,
+    check_top_bottom_led_for_fallback,
+)
+from app.services.led_analysis import LedGeometryIndex, FALLBACK_PALETTE, detect_fallback
+
+
+def build_layout(led_count):
+    """Rectangular strip: 30% of the LEDs per horizontal edge, 20% per side."""
+    per_edge = int(led_count * 0.3)
+    per_side = (led_count - 2 * per_edge) // 2
+    per_edge = (led_count - 2 * per_side) // 2
+
+    leds = []
+    for i in range(per_edge):
+        leds.append({"hmin": i / per_edge, "hmax": (i + 1) / per_edge, "vmin": 0.0, "vmax": 0.08})
+    for i in range(per_side):
+        leds.append({"hmin": 0.92, "hmax": 1.0, "vmin": i / per_side, "vmax": (i + 1) / per_side})
+    for i in range(per_edge):
+        leds.append({"hmin": 1 - (i + 1) / per_edge, "hmax": 1 - i / per_edge, "vmin": 0.92, "vmax": 1.0})
+    for i in range(per_side):
+        leds.append({"hmin": 0.0, "hmax": 0.08, "vmin": 1 - (i + 1) / per_side, "vmax": 1 - i / per_side})
+    return leds
+
+
+def fallback_frame(led_count):
+    palette = [tuple(int(c) for c in color) for color in FALLBACK_PALETTE]
+    return bytes(c for i in range(led_count) for c in palette[(i // 3) % len(palette)])
+
+
+def random_frame(led_count):
+    return bytes(random.randrange(256) for _ in range(led_count * 3))
+
+
+def partial_frame(led_count):
+    """Fallback pattern on the first half of the strip, noise on the rest."""
+    half = led_count // 2
+    return fallback_frame(led_count)[: half * 3] + random_frame(led_count - half)
+
+
+def legacy_detect(leds, rgb):
+    led_color = transform_flat_led_colors_for_each_led(list(rgb))
+    led_position = add_color_to_led_position_data(leds, led_color)
+    result = get_leds_by_direction(led_position, TOP_THRESHOLD=0.05, BOTTOM_THRESHOLD=0.95)
+    return check_top_bottom_led_for_fallback(result["top"], result["bottom"])
+
+
+def cold_detect(leds, rgb):
+    """Includes building the geometry index, as the first request per layout does."""
+    return detect_fallback(LedGeometryIndex(leds), rgb)
+
+
+def main(repeat=200):
+    for led_count in (300, 600, 1000):
+        leds = build_layout(led_count)
+        geometry = LedGeometryIndex(leds)
+        frames = {
+            "fallback": fallback_frame(led_count),
+            "partial": partial_frame(led_count),
+            "random": random_frame(led_count),
+        }
+
+        for name, rgb in frames.items():
+            expected = legacy_detect(leds, rgb)
+            actual = cold_detect(leds, rgb)
+            assert expected == actual, f"{led_count} LEDs / {name}: {expected} != {actual}"
+
+            legacy = timeit.timeit(lambda: legacy_detect(leds, rgb), number=repeat) / repeat
+            cold = timeit.timeit(lambda: cold_detect(leds, rgb), number=repeat) / repeat
+            cached = timeit.timeit(lambda: detect_fallback(geometry, rgb), number=repeat) / repeat
+
+            print(
+                f"{led_count:5d} LEDs  {name:8s}  result={actual!s:5s}  "
+                f"legacy={legacy * 1e6:8.1f}us  cold_index={cold * 1e6:8.1f}us  "
+                f"cached_index={cached * 1e6:7.1f}us  speedup={legacy / cached:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
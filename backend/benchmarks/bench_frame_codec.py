@@ -0,0 +1,114 @@
+"""
+Benchmark: JSON vs. binary LED frames for preview viewers on a 600-LED stream.
+
+Run from the backend directory:
+    python -m benchmarks.bench_frame_codec
+"""
+
+import time
+import numpy as np
+from app.services.frame_store import LedFrame, LedFrameStore
+from app.services.led_broadcast import LedBroadcastHub
+from app.services.frame_codec import FrameEncoder, decode_frame
+
+LED_COUNT = 600
+FPS = 25
+SECONDS = 30
+
+
+class _NoSession:
+    def subscribe(self, command, callback):
+        pass
+
+    def on_connect(self, callback):
+        pass
+
+    def on_disconnect(self, callback):
+        pass
+
+
+def ambient_stream(led_count=LED_COUNT, frames=FPS * SECONDS, seed=1):
+    """Slowly drifting gradient with a noisy patch, like ambilight on video."""
+    rng = np.random.default_rng(seed)
+    positions = np.linspace(0, 2 * np.pi, led_count)
+
+    for seq in range(1, frames + 1):
+        phase = seq / 40
+        rgb = np.stack(
+            [
+                127 + 127 * np.sin(positions + phase),
+                127 + 127 * np.sin(positions + phase + 2),
+                127 + 127 * np.sin(positions + phase + 4),
+            ],
+            axis=1,
+        ).astype(np.uint8)
+        patch = slice(led_count // 3, led_count // 3 + led_count // 20)
+        rgb[patch] = rng.integers(0, 256, size=rgb[patch].shape, dtype=np.uint8)
+        yield LedFrame(seq, seq / FPS, rgb.tobytes())
+
+
+def static_stream(led_count=LED_COUNT, frames=FPS * SECONDS):
+    """Static color with a slow brightness breathe, like a running effect."""
+    for seq in range(1, frames + 1):
+        level = 200 + (seq // 50) % 2
+        yield LedFrame(seq, seq / FPS, bytes((level, 40, 90)) * led_count)
+
+
+def run_json(frames):
+    hub = LedBroadcastHub(LedFrameStore(_NoSession()))
+    total = 0
+    start = time.process_time()
+    for frame in frames:
+        total += len(hub.encode_json(frame).encode("utf-8"))
+    return total, time.process_time() - start
+
+
+def run_binary(frames, delta):
+    encoder = FrameEncoder(keyframe_interval=30, delta=delta)
+    sent_keyframe = None
+    total = 0
+    start = time.process_time()
+    for frame in frames:
+        payload, keyframe_seq, keyframe_payload = encoder.encode(frame)
+        if sent_keyframe != keyframe_seq and payload is not keyframe_payload:
+            total += len(keyframe_payload)
+        sent_keyframe = keyframe_seq
+        total += len(payload)
+    return total, time.process_time() - start
+
+
+def verify_roundtrip(frames):
+    encoder = FrameEncoder(keyframe_interval=30)
+    keyframes = {}
+    for frame in frames:
+        payload, keyframe_seq, keyframe_payload = encoder.encode(frame)
+        if keyframe_seq not in keyframes:
+            keyframes[keyframe_seq] = decode_frame(keyframe_payload)["rgb"]
+        decoded = decode_frame(payload, keyframes[keyframe_seq])
+        assert decoded["seq"] == frame.seq and decoded["rgb"] == frame.rgb, frame.seq
+
+
+def main():
+    scenarios = {"ambient": list(ambient_stream()), "static": list(static_stream())}
+
+    for scenario, frames in scenarios.items():
+        verify_roundtrip(frames)
+
+        results = {
+            "json": run_json(frames),
+            "binary raw": run_binary(frames, delta=False),
+            "binary delta": run_binary(frames, delta=True),
+        }
+
+        json_bytes, json_cpu = results["json"]
+        print(f"{scenario}: {LED_COUNT} LEDs, {len(frames)} frames at {FPS} fps")
+        for name, (total, cpu) in results.items():
+            print(
+                f"  {name:13s} {total / SECONDS / 1024:8.1f} KiB/s  "
+                f"{cpu / len(frames) * 1e6:7.1f} us/frame  "
+                f"bytes x{json_bytes / total:6.1f}  cpu x{json_cpu / cpu:5.1f} vs json"
+            )
+
+
+if __name__ == "__main__":
+    main()
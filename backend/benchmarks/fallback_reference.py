@@ -0,0 +1,95 @@
+"""
+The per-LED fallback detection the backend used before the NumPy engine in
+app.services.led_analysis. Kept only as the reference the benchmark
+compares that engine against.
+"""
+
+import math
+
+
+def check_top_bottom_led_for_fallback(top_leds, bottom_leds):
+    no_of_top_leds = len(top_leds)
+    no_of_bottom_leds = len(bottom_leds)
+
+    top_fallback_colors = {
+        (255, 255, 6): 0,   # Bright yellow (slightly greenish)
+        (255, 0, 255): 0,   # Pure magenta
+        (0, 10, 255): 0,    # Deep blue (slightly purplish)
+        (0, 255, 0): 0,     # Pure green
+        (6, 255, 255): 0,   # Cyan / aqua
+        (255, 11, 0): 0     # Bright red (slightly orange)
+    }
+    
+    bottom_fallback_colors = {
+        (255, 255, 6): 0,   # Bright yellow (slightly greenish)
+        (255, 0, 255): 0,   # Pure magenta
+        (0, 10, 255): 0,    # Deep blue (slightly purplish)
+        (0, 255, 0): 0,     # Pure green
+        (6, 255, 255): 0,   # Cyan / aqua
+        (255, 11, 0): 0     # Bright red (slightly orange)
+    }
+
+    loop_til = max(len(top_leds),len(bottom_leds))
+
+    for led_ind in range(loop_til):
+        if led_ind < len(top_leds):
+            curr_top_color = tuple(top_leds[led_ind]['color'])
+            if curr_top_color in top_fallback_colors:
+                top_fallback_colors[curr_top_color] += 1 
+        
+        if led_ind < len(bottom_leds):
+            curr_bottom_color = tuple(bottom_leds[led_ind]['color'])
+            if curr_bottom_color in bottom_fallback_colors:
+                bottom_fallback_colors[curr_bottom_color] += 1
+
+    min_top_colors_freq = math.floor(no_of_top_leds * 0.09)
+    min_bottom_colors_freq = math.floor(no_of_bottom_leds * 0.09)
+
+    are_these_top_colors_fallback = all([ freq >= min_top_colors_freq for _,freq in top_fallback_colors.items()])
+    are_these_bottom_colors_fallback = all([ freq >= min_bottom_colors_freq for _,freq in bottom_fallback_colors.items()])
+
+    return are_these_bottom_colors_fallback and are_these_top_colors_fallback
+
+def transform_flat_led_colors_for_each_led(led_color):
+    return [led_color[i:i+3] for i in range(0, len(led_color), 3)]
+
+def add_color_to_led_position_data(led_position,led_color):
+    return [{**each_position ,"color": led_color[index],"led_ind": index} for index,each_position in enumerate(led_position)]
+
+def get_leds_by_direction(
+    led_position,
+    TOP_THRESHOLD=0.05,
+    BOTTOM_THRESHOLD=0.95,
+    LEFT_THRESHOLD=0.05,
+    RIGHT_THRESHOLD=0.95
+):
+    top_leds = []
+    bottom_leds = []
+    left_leds = []
+    right_leds = []
+
+    for led in led_position:
+        # Top
+        if 0.05 < led["hmin"] < 0.95 and led["vmin"] <= TOP_THRESHOLD:
+            top_leds.append(led)
+
+        # Bottom
+        if 0.05 < led["hmin"] < 0.95 and led["vmax"] >= BOTTOM_THRESHOLD:
+            bottom_leds.append(led)
+
+        # Left
+        if 0.05 < led["vmin"] < 0.95 and led["hmin"] <= LEFT_THRESHOLD:
+            left_leds.append(led)
+
+        # Right
+        if 0.05 < led["vmin"] < 0.95 and led["hmax"] >= RIGHT_THRESHOLD:
+            right_leds.append(led)
+
+    mapping = {
+        "top": top_leds,
+        "bottom": bottom_leds,
+        "left": left_leds,
+        "right": right_leds
+    }
+
+    return mapping
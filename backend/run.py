@@ -5,8 +5,10 @@ from flask import jsonify
 from app.routes.main import main_bp
 from app.routes.hyperhdr_install import hyperhdr_install_bp
 from app.routes.led import led_bp
+from utils.device_facts import device_facts
 
 app = create_app()
+device_facts.load()
 
 # app.register_blueprint(main_bp)
 app.register_blueprint(hyperhdr_install_bp, url_prefix="/hyperhdr")
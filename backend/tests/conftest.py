@@ -0,0 +1,8 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep the module-level job engine away from the real job list.
+os.environ.setdefault("HYPERHDR_JOBS_FILE", os.path.join(BACKEND_DIR, "tests", ".jobs.json"))
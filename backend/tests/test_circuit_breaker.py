@@ -0,0 +1,102 @@
+import time
+import pytest
+from app.services.circuit_breaker import CircuitBreaker, HyperHDRUnavailable
+
+
+class Probe:
+    """Probe whose answer the test controls."""
+
+    def __init__(self, healthy=False):
+        self.healthy = healthy
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.healthy
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(Probe(), failure_threshold=3, base_delay=60.0)
+
+    breaker.record_failure(ConnectionError())
+    breaker.record_failure(ConnectionError())
+    breaker.check()
+    assert not breaker.is_open
+
+    breaker.record_failure(ConnectionError())
+    assert breaker.is_open
+    with pytest.raises(HyperHDRUnavailable) as raised:
+        breaker.check()
+    assert "3 failed calls, last: ConnectionError" in raised.value.reason
+    assert raised.value.retry_after >= 1
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(Probe(), failure_threshold=2, base_delay=60.0)
+
+    breaker.record_failure(ConnectionError())
+    breaker.record_success()
+    breaker.record_failure(ConnectionError())
+
+    assert not breaker.is_open
+
+
+def test_success_closes_an_open_breaker():
+    breaker = CircuitBreaker(Probe(), failure_threshold=1, base_delay=60.0)
+    breaker.record_failure(ConnectionError())
+
+    breaker.record_success()
+
+    assert not breaker.is_open
+    breaker.check()
+
+
+def test_successful_probe_closes_the_breaker():
+    probe = Probe(healthy=True)
+    breaker = CircuitBreaker(probe, failure_threshold=1, base_delay=0.01)
+
+    breaker.record_failure(ConnectionError())
+
+    assert wait_until(lambda: not breaker.is_open)
+    assert probe.calls == 1
+    assert breaker.stats()["failures"] == 0
+
+
+def test_failed_probes_back_off_up_to_max_delay():
+    probe = Probe(healthy=False)
+    breaker = CircuitBreaker(probe, failure_threshold=1, base_delay=0.01, max_delay=0.04)
+
+    breaker.record_failure(ConnectionError())
+
+    assert wait_until(lambda: probe.calls >= 4)
+    assert breaker.is_open
+    assert breaker._delay == 0.04
+
+    probe.healthy = True
+    assert wait_until(lambda: not breaker.is_open)
+
+
+def test_expected_downtime_holds_the_first_probe():
+    probe = Probe(healthy=True)
+    breaker = CircuitBreaker(probe, base_delay=0.01)
+
+    breaker.expect_downtime("restarting HyperHDR", hold=60.0)
+
+    with pytest.raises(HyperHDRUnavailable) as raised:
+        breaker.check()
+    assert raised.value.reason == "restarting HyperHDR"
+    assert raised.value.retry_after > 50
+    assert probe.calls == 0
+
+    breaker.probe_now()
+    assert wait_until(lambda: not breaker.is_open)
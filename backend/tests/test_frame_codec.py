@@ -0,0 +1,85 @@
+import pytest
+from app.services.frame_codec import (
+    HEADER,
+    FrameEncoder,
+    decode_frame,
+    encode_delta,
+    encode_keyframe,
+)
+from app.services.frame_store import LedFrame
+
+
+def make_frame(seq, rgb):
+    return LedFrame(seq=seq, timestamp=1000.0 + seq, rgb=bytes(rgb))
+
+
+def test_keyframe_round_trip():
+    frame = make_frame(7, range(30))
+
+    decoded = decode_frame(encode_keyframe(frame))
+
+    assert decoded == {
+        "seq": 7,
+        "timestamp": 1007.0,
+        "keyframe_seq": 7,
+        "is_delta": False,
+        "rgb": frame.rgb,
+    }
+
+
+def test_delta_round_trip():
+    keyframe = make_frame(1, [10] * 30)
+    frame = make_frame(2, [10] * 27 + [200, 0, 255])
+
+    decoded = decode_frame(encode_delta(frame, keyframe), keyframe.rgb)
+
+    assert decoded["is_delta"]
+    assert decoded["keyframe_seq"] == 1
+    assert decoded["rgb"] == frame.rgb
+
+
+def test_delta_without_keyframe_is_rejected():
+    keyframe = make_frame(1, [0] * 30)
+    with pytest.raises(ValueError, match="needs keyframe 1"):
+        decode_frame(encode_delta(make_frame(2, [1] * 30), keyframe))
+
+
+def test_foreign_data_is_rejected():
+    with pytest.raises(ValueError, match="Not a binary LED frame"):
+        decode_frame(b"XX" + bytes(HEADER.size))
+
+
+def test_truncated_payload_is_rejected():
+    encoded = bytes(encode_keyframe(make_frame(3, range(30))))
+    with pytest.raises(ValueError, match="for 10 LEDs"):
+        decode_frame(encoded[:-3])
+
+
+def test_encoder_sends_deltas_between_keyframes():
+    encoder = FrameEncoder(keyframe_interval=3)
+    frames = [make_frame(seq, [seq] * 30) for seq in range(1, 6)]
+
+    keyframes = [encoder.encode(frame)[1] for frame in frames]
+
+    assert keyframes == [1, 1, 1, 4, 4]
+    for frame in frames:
+        payload, keyframe_seq, keyframe_payload = encoder.encode(frame)
+        reference = decode_frame(keyframe_payload)["rgb"]
+        assert decode_frame(payload, reference)["rgb"] == frame.rgb
+
+
+def test_encoder_starts_a_keyframe_when_the_led_count_changes():
+    encoder = FrameEncoder()
+    encoder.encode(make_frame(1, [0] * 30))
+
+    payload, keyframe_seq, _ = encoder.encode(make_frame(2, [0] * 60))
+
+    assert keyframe_seq == 2
+    assert not decode_frame(payload)["is_delta"]
+
+
+def test_encoder_reuses_the_encoding_of_a_frame():
+    encoder = FrameEncoder()
+    frame = make_frame(1, [0] * 30)
+
+    assert encoder.encode(frame) is encoder.encode(frame)
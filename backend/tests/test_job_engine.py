@@ -0,0 +1,111 @@
+import json
+import threading
+import pytest
+from app.services.job_engine import JobBusy, JobEngine
+
+
+def wait_for_status(engine, job_id, status, timeout=2.0):
+    job = engine.get(job_id)
+    version = 0
+    while job["status"] != status:
+        job = engine.wait_for_change(job_id, version, timeout)
+        assert job["version"] > version, f"job stayed {job['status']}"
+        version = job["version"]
+    return job
+
+
+@pytest.fixture
+def jobs_file(tmp_path):
+    return str(tmp_path / "jobs" / "jobs.json")
+
+
+def test_steps_run_in_order_and_are_persisted(jobs_file):
+    engine = JobEngine(jobs_file)
+
+    def download(job):
+        job.progress(bytes_downloaded=10)
+        return {"bytes": 10}
+
+    job = engine.submit("install", [("download", download), ("install", lambda job: None)], {"url": "x"})
+    job = wait_for_status(engine, job["id"], "succeeded")
+
+    assert [step["status"] for step in job["steps"]] == ["succeeded", "succeeded"]
+    assert job["steps"][0]["result"] == {"bytes": 10}
+    assert job["progress"] == {"bytes_downloaded": 10}
+
+    with open(jobs_file, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["jobs"][0]["status"] == "succeeded"
+
+
+def test_failed_step_stops_the_job_and_runs_cleanup(jobs_file):
+    engine = JobEngine(jobs_file)
+    ran = []
+
+    def fail(job):
+        raise RuntimeError("Download failed")
+
+    job = engine.submit(
+        "install",
+        [("download", fail), ("install", lambda job: ran.append("install"))],
+        cleanup=lambda job: ran.append("cleanup"),
+    )
+    job = wait_for_status(engine, job["id"], "failed")
+
+    assert job["error"] == "Download failed"
+    assert [step["status"] for step in job["steps"]] == ["failed", "pending"]
+    assert ran == ["cleanup"]
+
+
+def test_one_job_per_kind(jobs_file):
+    engine = JobEngine(jobs_file)
+    release = threading.Event()
+
+    job = engine.submit("install", [("wait", lambda job: release.wait(2.0))])
+    with pytest.raises(JobBusy):
+        engine.submit("install", [])
+    engine.submit("hostname", [])
+
+    release.set()
+    wait_for_status(engine, job["id"], "succeeded")
+
+
+def test_restart_marks_unfinished_jobs_interrupted(jobs_file):
+    engine = JobEngine(jobs_file)
+    running = threading.Event()
+    release = threading.Event()
+
+    def block(job):
+        running.set()
+        release.wait(2.0)
+
+    done = engine.submit("hostname", [("set", lambda job: None)])
+    wait_for_status(engine, done["id"], "succeeded")
+    stuck = engine.submit("install", [("download", block), ("install", lambda job: None)])
+    queued = engine.submit("reset", [("purge", lambda job: None)])
+    assert running.wait(2.0)
+
+    # A new engine on the same file sees the state the old one saved.
+    restarted = JobEngine(jobs_file)
+
+    stuck = restarted.get(stuck["id"])
+    assert stuck["status"] == "interrupted"
+    assert stuck["error"] == "Backend stopped before the job finished"
+    assert stuck["finished_at"] is not None
+    assert [step["status"] for step in stuck["steps"]] == ["interrupted", "pending"]
+
+    assert restarted.get(queued["id"])["status"] == "interrupted"
+    assert restarted.get(done["id"])["status"] == "succeeded"
+
+    # Interrupted jobs no longer block new ones of their kind.
+    retry = restarted.submit("install", [("install", lambda job: None)])
+    wait_for_status(restarted, retry["id"], "succeeded")
+    release.set()
+
+
+def test_unreadable_job_file_starts_empty(jobs_file, tmp_path):
+    (tmp_path / "jobs").mkdir()
+    with open(jobs_file, "w", encoding="utf-8") as f:
+        f.write("{not json")
+
+    assert JobEngine(jobs_file).list() == []
@@ -0,0 +1,59 @@
+import pytest
+from utils.root_helper import DEB_DIR, build_command
+
+
+@pytest.mark.parametrize(
+    "op, args, argv",
+    [
+        ("systemctl", {"action": "restart", "unit": "hyperhdr@pi"}, ["systemctl", "restart", "hyperhdr@pi"]),
+        ("systemctl", {"action": "stop", "unit": "avahi-daemon.service"}, ["systemctl", "stop", "avahi-daemon.service"]),
+        ("systemctl", {"action": "daemon-reload"}, ["systemctl", "daemon-reload"]),
+        ("wifi_up", {"name": "Home"}, ["nmcli", "connection", "up", "id", "Home"]),
+        ("wifi_delete", {"name": "-Home"}, ["nmcli", "connection", "delete", "id", "-Home"]),
+        ("wifi_connect", {"ssid": "My Net"}, ["nmcli", "device", "wifi", "connect", "My Net"]),
+        (
+            "hotspot_start",
+            {"ifname": "wlan0", "ssid": "-setup", "password": "-secret-"},
+            ["nmcli", "device", "wifi", "hotspot", "ifname", "wlan0", "ssid", "-setup", "password", "-secret-"],
+        ),
+        ("set_hostname", {"hostname": "hyperhdr-2"}, ["hostnamectl", "set-hostname", "hyperhdr-2"]),
+        ("dpkg_install", {"path": f"{DEB_DIR}/HyperHDR-21.deb"}, ["dpkg", "-i", f"{DEB_DIR}/HyperHDR-21.deb"]),
+        ("dpkg_remove", None, ["dpkg", "-r", "hyperhdr"]),
+    ],
+)
+def test_builds_allowed_commands(op, args, argv):
+    assert build_command(op, args) == argv
+
+
+def test_wifi_credentials_pass_unchanged():
+    argv = build_command("wifi_add", {"ssid": "-guest net", "password": "--pa ss"})
+
+    assert argv[argv.index("ssid") + 1] == "-guest net"
+    assert argv[argv.index("wifi-sec.psk") + 1] == "--pa ss"
+
+
+@pytest.mark.parametrize(
+    "op, args",
+    [
+        ("rm", {"path": "/"}),
+        ("systemctl", {"action": "mask", "unit": "hyperhdr@pi"}),
+        ("systemctl", {"action": "stop", "unit": "sshd"}),
+        ("systemctl", {"action": "stop", "unit": "hyperhdr@pi; reboot"}),
+        ("systemctl", {"action": "stop"}),
+        ("wifi_up", {"name": "Home\n--help"}),
+        ("wifi_up", {"name": ""}),
+        ("wifi_up", {"name": 42}),
+        ("wifi_connect", {"ssid": "x" * 65}),
+        ("wifi_up", {"name": "Home", "extra": "-x"}),
+        ("hotspot_start", {"ifname": "--help", "ssid": "setup", "password": "secret12"}),
+        ("set_hostname", {"hostname": "-bad"}),
+        ("set_hostname", {"hostname": "a/b"}),
+        ("dpkg_install", {"path": "/tmp/other/HyperHDR.deb"}),
+        ("dpkg_install", {"path": f"{DEB_DIR}/../HyperHDR.deb"}),
+        ("dpkg_install", {"path": f"{DEB_DIR}/HyperHDR.sh"}),
+        ("dpkg_remove", {"package": "bash"}),
+    ],
+)
+def test_rejects_invalid_commands(op, args):
+    with pytest.raises(ValueError):
+        build_command(op, args)
@@ -0,0 +1,86 @@
+import asyncio
+from app.services.write_coalescer import WriteCoalescer
+
+
+class Upstream:
+    """Records forwarded writes and answers like HyperHDR."""
+
+    def __init__(self, error=None):
+        self.sent = []
+        self.error = error
+
+    async def __call__(self, key, value):
+        self.sent.append((key, value))
+        if self.error is not None:
+            raise self.error
+        return {"success": True, "value": value}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_burst_to_one_key_sends_the_last_value():
+    upstream = Upstream()
+    coalescer = WriteCoalescer(upstream, window=0.01)
+
+    async def burst():
+        return await asyncio.gather(*(coalescer.write("brightness", value) for value in (10, 20, 30)))
+
+    replies = run(burst())
+
+    assert upstream.sent == [("brightness", 30)]
+    assert replies == [{"coalesced": True}, {"coalesced": True}, {"success": True, "value": 30}]
+    assert coalescer.stats() == {
+        "window": 0.01,
+        "received": 3,
+        "forwarded": 1,
+        "coalesced": 2,
+        "failed": 0,
+        "pending": 0,
+    }
+
+
+def test_different_keys_are_not_merged():
+    upstream = Upstream()
+    coalescer = WriteCoalescer(upstream, window=0.01)
+
+    async def writes():
+        return await asyncio.gather(coalescer.write("brightness", 50), coalescer.write("color", [255, 0, 0]))
+
+    run(writes())
+
+    assert sorted(upstream.sent) == [("brightness", 50), ("color", [255, 0, 0])]
+    assert coalescer.coalesced == 0
+
+
+def test_writes_after_the_window_are_sent_in_order():
+    upstream = Upstream()
+    coalescer = WriteCoalescer(upstream, window=0.01)
+
+    async def spaced():
+        first = asyncio.ensure_future(coalescer.write("brightness", 10))
+        await asyncio.sleep(0.05)
+        await coalescer.write("brightness", 20)
+        await first
+
+    run(spaced())
+
+    assert upstream.sent == [("brightness", 10), ("brightness", 20)]
+
+
+def test_upstream_error_reaches_the_latest_writer_only():
+    coalescer = WriteCoalescer(Upstream(error=ConnectionError("down")), window=0.01)
+
+    async def burst():
+        return await asyncio.gather(
+            coalescer.write("brightness", 10),
+            coalescer.write("brightness", 20),
+            return_exceptions=True,
+        )
+
+    superseded, latest = run(burst())
+
+    assert superseded == {"coalesced": True}
+    assert isinstance(latest, ConnectionError)
+    assert coalescer.failed == 1
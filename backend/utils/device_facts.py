@@ -0,0 +1,220 @@
+import os
+import time
+import socket
+import struct
+import threading
+
+try:
+    import dbus
+except ImportError:  # dev machines without dbus-python; only sysfs is read
+    dbus = None
+
+OS_RELEASE_FILES = ["/etc/os-release", "/usr/lib/os-release"]
+
+# Checked in order; the Bluetooth address comes first, as it is the one
+# the BLE server advertises.
+MAC_INTERFACES = ["eth0", "wlan0"]
+EMPTY_MAC = "00:00:00:00:00:00"
+
+BLUETOOTH_ADAPTER = "hci0"
+BLUEZ_BUS_NAME = "org.bluez"
+BLUEZ_ADAPTER_IFACE = "org.bluez.Adapter1"
+DBUS_PROP_IFACE = "org.freedesktop.DBus.Properties"
+
+# rtnetlink link notifications (linux/rtnetlink.h).
+RTMGRP_LINK = 1
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+NLMSG_HEADER = struct.Struct("=LHHLL")
+
+
+def parse_os_release(text):
+    data = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, val = line.split("=", 1)
+        data[key.strip()] = val.strip().strip('"').strip("'")
+    return data
+
+
+def read_os_release():
+    for path in OS_RELEASE_FILES:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return parse_os_release(f.read())
+        except FileNotFoundError:
+            continue
+    return {}
+
+
+def read_interface_macs():
+    macs = {}
+    for iface in MAC_INTERFACES:
+        try:
+            with open(f"/sys/class/net/{iface}/address", "r") as f:
+                mac = f.read().strip()
+        except OSError:
+            continue
+        if mac and mac != EMPTY_MAC:
+            macs[iface] = mac
+    return macs
+
+
+def read_bluez_address():
+    """The adapter's Address property from BlueZ, or None."""
+    if dbus is None:
+        return None
+    # A private connection, so the shared bus is not created before a caller
+    # has installed its main loop.
+    try:
+        bus = dbus.SystemBus(private=True)
+    except dbus.exceptions.DBusException:
+        return None
+    try:
+        adapter = bus.get_object(BLUEZ_BUS_NAME, f"/org/bluez/{BLUETOOTH_ADAPTER}", introspect=False)
+        return str(dbus.Interface(adapter, DBUS_PROP_IFACE).Get(BLUEZ_ADAPTER_IFACE, "Address"))
+    except dbus.exceptions.DBusException:
+        return None
+    finally:
+        bus.close()
+
+
+def read_bluetooth_mac():
+    """
+    The Bluetooth adapter address from sysfs where the kernel exposes it,
+    otherwise from BlueZ over D-Bus.
+    """
+    try:
+        with open(f"/sys/class/bluetooth/{BLUETOOTH_ADAPTER}/address", "r") as f:
+            mac = f.read().strip()
+    except OSError:
+        mac = read_bluez_address()
+
+    if mac and mac != EMPTY_MAC:
+        return mac.lower()
+    return None
+
+
+class DeviceFacts:
+    """
+    Facts about the device that do not change between requests: CPU
+    architecture, OS release, hostname and MAC addresses. They are read
+    once, from os.uname(), /etc/os-release and sysfs, instead of running
+    shell pipelines on every call.
+
+    Interface MACs are re-read when the kernel reports a link being added
+    or removed (an rtnetlink socket watched on a daemon thread), and
+    everything is re-read when the hostname changes; `os.uname()` is a
+    plain syscall, so that check is made on every read. The Bluetooth
+    address is only looked up again while no adapter has been found, at
+    most every `bluetooth_retry` seconds.
+
+    The Flask app and the BLE server are separate processes, so each has its
+    own module-level `device_facts` and calls `load()` at startup.
+    """
+
+    def __init__(self, bluetooth_retry=30.0):
+        self.bluetooth_retry = bluetooth_retry
+
+        self.loads = 0
+        self.link_events = 0
+
+        self._lock = threading.Lock()
+        self._facts = None
+        self._macs_stale = True
+        self._bluetooth_checked = 0.0
+        self._watcher = None
+
+    def _start_watcher(self):
+        if self._watcher is not None:
+            return
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK))
+        except (AttributeError, OSError) as e:  # not Linux; facts stay as loaded
+            print(f"Interface change events unavailable: {e}")
+            self._watcher = False
+            return
+
+        self._watcher = threading.Thread(target=self._watch, args=(sock,), name="device-facts", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, sock):
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+                if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                    self.link_events += 1
+                    self._macs_stale = True
+                if length < NLMSG_HEADER.size:
+                    break
+                offset += (length + 3) & ~3
+
+    def _current(self):
+        uname = os.uname()
+        with self._lock:
+            self._start_watcher()
+            facts = self._facts
+
+            if facts is None or facts["hostname"] != uname.nodename:
+                facts = self._facts = {
+                    "arch": uname.machine,
+                    "hostname": uname.nodename,
+                    "os_release": read_os_release(),
+                    "macs": read_interface_macs(),
+                    "bluetooth_mac": read_bluetooth_mac(),
+                }
+                self._macs_stale = False
+                self._bluetooth_checked = time.monotonic()
+                self.loads += 1
+                return facts
+
+            if self._macs_stale:
+                self._macs_stale = False
+                facts["macs"] = read_interface_macs()
+
+            if facts["bluetooth_mac"] is None and time.monotonic() - self._bluetooth_checked >= self.bluetooth_retry:
+                self._bluetooth_checked = time.monotonic()
+                facts["bluetooth_mac"] = read_bluetooth_mac()
+
+            return facts
+
+    def load(self):
+        """Read every fact now, so no request pays for the first read."""
+        self._current()
+        return self
+
+    def refresh(self):
+        """Drop everything cached, e.g. after setting the hostname."""
+        with self._lock:
+            self._facts = None
+
+    def system_info(self) -> dict:
+        """`ARCH` plus the os-release fields (ID, VERSION_CODENAME, ...)."""
+        facts = self._current()
+        return {"ARCH": facts["arch"], **facts["os_release"]}
+
+    def mac(self):
+        """The Bluetooth address, else the first interface MAC, else None."""
+        facts = self._current()
+        if facts["bluetooth_mac"]:
+            return facts["bluetooth_mac"]
+        for iface in MAC_INTERFACES:
+            if iface in facts["macs"]:
+                return facts["macs"][iface]
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._facts is not None,
+            "loads": self.loads,
+            "link_events": self.link_events,
+            "watching": bool(self._watcher),
+        }
+
+
+device_facts = DeviceFacts()
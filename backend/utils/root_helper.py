@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import socket
+import subprocess
+
+SOCKET_PATH = os.getenv("ROOT_HELPER_SOCKET", "/run/hyperhdr-controller/helper.sock")
+
+# .deb packages are only installed from the backend's download directory.
+DEB_DIR = "/tmp/hyperhdr_debs"
+
+SYSTEMCTL_ACTIONS = {"start", "stop", "restart", "enable", "disable", "daemon-reload"}
+UNIT_PATTERN = re.compile(r"^(hyperhdr@[\w.-]+|auto_pair_agent|wifi_utilities|avahi-daemon)(\.service)?$")
+HOSTNAME_PATTERN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?$")
+HYPERHDR_PATHS = ["/etc/hyperhdr", "/opt/hyperhdr", "/var/lib/hyperhdr", "/etc/systemd/system/hyperhdr.service"]
+
+
+def _text(value, name, max_length=64):
+    if not isinstance(value, str) or not value or len(value) > max_length or "\n" in value or "\0" in value:
+        raise ValueError(f"Invalid {name}")
+    return value
+
+
+def _name(value, name, max_length=64):
+    """Like `_text`, for names a tool could parse as one of its own options."""
+    value = _text(value, name, max_length)
+    if value.startswith("-"):
+        raise ValueError(f"Invalid {name}: must not start with '-'")
+    return value
+
+
+def _hostname(hostname):
+    if not isinstance(hostname, str) or not HOSTNAME_PATTERN.match(hostname):
+        raise ValueError("Invalid hostname")
+    return hostname
+
+
+def _deb(path):
+    path = os.path.realpath(_text(path, "package path", 255))
+    if os.path.dirname(path) != DEB_DIR or not path.endswith(".deb"):
+        raise ValueError(f"Packages can only be installed from {DEB_DIR}")
+    return path
+
+
+def _systemctl(action, unit=None):
+    if action not in SYSTEMCTL_ACTIONS:
+        raise ValueError(f"systemctl action '{action}' is not allowed")
+    if action == "daemon-reload":
+        return ["systemctl", action]
+    if not isinstance(unit, str) or not UNIT_PATTERN.match(unit):
+        raise ValueError(f"Unit '{unit}' is not allowed")
+    return ["systemctl", action, unit]
+
+
+def _hotspot(ifname, ssid, password):
+    return [
+        "nmcli", "device", "wifi", "hotspot",
+        "ifname", _name(ifname, "interface", 15),
+        "ssid", _text(ssid, "SSID"),
+        "password", _text(password, "password"),
+    ]
+
+
+def _add_wifi(ssid, password):
+    ssid = _text(ssid, "SSID")
+    return [
+        "nmcli", "connection", "add",
+        "type", "wifi",
+        "con-name", ssid,
+        "ssid", ssid,
+        "ifname", "wlan0",
+        "wifi-sec.key-mgmt", "wpa-psk",
+        "wifi-sec.psk", _text(password, "password"),
+        "connection.autoconnect", "yes",
+        "--",
+        "save", "yes",
+    ]
+
+
+# Every command the helper runs as root, by operation name. Each builder
+# validates its typed arguments and returns the argv to execute.
+OPERATIONS = {
+    "systemctl": _systemctl,
+    "wifi_add": _add_wifi,
+    "wifi_up": lambda name: ["nmcli", "connection", "up", "id", _text(name, "connection name")],
+    "wifi_down": lambda name: ["nmcli", "connection", "down", "id", _text(name, "connection name")],
+    "wifi_connect": lambda ssid: ["nmcli", "device", "wifi", "connect", _text(ssid, "SSID")],
+    "wifi_delete": lambda name: ["nmcli", "connection", "delete", "id", _text(name, "connection name")],
+    "wifi_list": lambda: ["nmcli", "-t", "-f", "SSID,SIGNAL,SECURITY,IN-USE", "dev", "wifi", "list"],
+    "hotspot_start": _hotspot,
+    "set_hostname": lambda hostname: ["hostnamectl", "set-hostname", _hostname(hostname)],
+    "set_hosts_hostname": lambda hostname: [
+        "sed", "-i",
+        f"s/^127\\.0\\.1\\.1[[:space:]]\\+.*/127.0.1.1       {_hostname(hostname)}/",
+        "/etc/hosts",
+    ],
+    "dpkg_install": lambda path: ["dpkg", "-i", _deb(path)],
+    "dpkg_remove": lambda: ["dpkg", "-r", "hyperhdr"],
+    "dpkg_purge": lambda: ["dpkg", "--purge", "hyperhdr"],
+    "apt_autoremove": lambda: ["apt", "autoremove", "-y"],
+    "remove_hyperhdr_files": lambda: ["rm", "-rf", *HYPERHDR_PATHS],
+}
+
+
+def build_command(op, args):
+    """
+    Argv for an allow-listed operation.
+
+    Raises:
+        ValueError: For an unknown operation or invalid arguments.
+    """
+    builder = OPERATIONS.get(op)
+    if builder is None:
+        raise ValueError(f"Operation '{op}' is not allowed")
+    try:
+        return builder(**(args or {}))
+    except TypeError:
+        raise ValueError(f"Invalid arguments for '{op}'") from None
+
+
+def _via_socket(op, args, timeout):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(SOCKET_PATH)
+        sock.sendall(json.dumps({"op": op, "args": args}).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+
+    if not line:
+        raise ConnectionError("Root helper closed the connection")
+    return json.loads(line)
+
+
+def run_privileged(op, check=True, timeout=600, **args):
+    """
+    Run an allow-listed operation as root.
+
+    Goes through the root helper daemon when its socket is up, otherwise
+    falls back to `sudo` with the same command, so callers behave the same
+    either way.
+
+    Args:
+        op (str): Name from OPERATIONS.
+        check (bool): Raise on a non-zero exit status, like subprocess.run.
+        **args: Typed arguments of the operation.
+
+    Returns:
+        subprocess.CompletedProcess: With text stdout and stderr.
+
+    Raises:
+        subprocess.CalledProcessError: If `check` is set and the command failed.
+        ValueError: For an operation or arguments outside the allow-list.
+    """
+    argv = build_command(op, args)
+
+    try:
+        reply = _via_socket(op, args, timeout)
+    except (FileNotFoundError, ConnectionRefusedError, PermissionError):
+        reply = None
+
+    if reply is None:
+        result = subprocess.run(["sudo"] + argv, capture_output=True, text=True, timeout=timeout)
+    elif "error" in reply:
+        raise ValueError(reply["error"])
+    else:
+        result = subprocess.CompletedProcess(argv, reply["returncode"], reply["stdout"], reply["stderr"])
+
+    if check:
+        result.check_returncode()
+    return result
@@ -0,0 +1,102 @@
+"""
+Privileged helper for the backend and the BLE services.
+
+Runs as root and executes only the operations in root_helper.OPERATIONS,
+for the users named in ROOT_HELPER_USERS. Callers skip sudo's PAM and
+policy checks, but every operation is still its own fork/exec of nmcli,
+dpkg, systemctl, ...; the helper keeps no state between requests.
+Started by the hyperhdr-root-helper systemd unit installed by setup.sh:
+
+    python3 -m utils.root_helperd
+"""
+
+import os
+import pwd
+import sys
+import json
+import socket
+import struct
+import subprocess
+import socketserver
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.root_helper import SOCKET_PATH, build_command
+
+ALLOWED_USERS = [user for user in os.getenv("ROOT_HELPER_USERS", "pi").split(",") if user]
+COMMAND_TIMEOUT = 600
+
+
+def peer_uid(sock):
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+
+class HelperHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        uid = peer_uid(self.request)
+        if uid != 0 and uid not in self.server.allowed_uids:
+            self.reply({"error": "Not allowed"})
+            return
+
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                argv = build_command(request.get("op"), request.get("args"))
+            except ValueError as e:  # includes JSONDecodeError
+                self.reply({"error": str(e)})
+                continue
+
+            # Exit codes as a shell would report them, so callers see a
+            # CalledProcessError either way.
+            try:
+                result = subprocess.run(argv, capture_output=True, text=True, timeout=COMMAND_TIMEOUT)
+            except OSError as e:
+                self.reply({"returncode": 127, "stdout": "", "stderr": str(e)})
+                continue
+            except subprocess.TimeoutExpired as e:
+                self.reply({"returncode": 124, "stdout": "", "stderr": str(e)})
+                continue
+
+            self.reply({"returncode": result.returncode, "stdout": result.stdout, "stderr": result.stderr})
+
+    def reply(self, payload):
+        self.wfile.write(json.dumps(payload).encode() + b"\n")
+        self.wfile.flush()
+
+
+class HelperServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, users):
+        self.allowed_uids = set()
+        group = None
+        for user in users:
+            entry = pwd.getpwnam(user)
+            self.allowed_uids.add(entry.pw_uid)
+            group = group if group is not None else entry.pw_gid
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+
+        super().__init__(path, HelperHandler)
+
+        # Reachable by the allowed users' group only; SO_PEERCRED checks the rest.
+        os.chown(path, 0, group if group is not None else 0)
+        os.chmod(path, 0o660)
+
+
+def main():
+    server = HelperServer(SOCKET_PATH, ALLOWED_USERS)
+    print(f"Root helper listening on {SOCKET_PATH} for {', '.join(ALLOWED_USERS)}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(SOCKET_PATH)
+
+
+if __name__ == "__main__":
+    main()
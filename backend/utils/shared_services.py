@@ -1,37 +1,11 @@
 import re
 import subprocess
+from utils.root_helper import run_privileged
 
 
 def configure_wifi_nmcli(ssid: str, password: str):
     # Add or update the connection profile
-    res = subprocess.run(
-        [
-            "sudo",
-            "nmcli",
-            "connection",
-            "add",
-            "type",
-            "wifi",
-            "con-name",
-            ssid,
-            "ssid",
-            ssid,
-            "ifname",
-            "wlan0",
-            "wifi-sec.key-mgmt",
-            "wpa-psk",
-            "wifi-sec.psk",
-            password,
-            "connection.autoconnect",
-            "yes",
-            "--",
-            "save",
-            "yes",
-        ],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
+    res = run_privileged("wifi_add", ssid=ssid, password=password)
     return {"status": "success", "message": res.stdout.strip()}
 
 
@@ -46,29 +20,17 @@ def connect_wifi_nmcli(ssid: str, connect: bool = True):
         saved_connections = saved.stdout.strip().split("\n")
 
         if ssid in saved_connections:
-            cmd = ["nmcli", "connection", "up", ssid]
+            res = run_privileged("wifi_up", name=ssid)
         else:
-            cmd = ["nmcli", "device", "wifi", "connect", ssid]
+            res = run_privileged("wifi_connect", ssid=ssid)
     else:
-        cmd = ["nmcli", "connection", "down", ssid]
+        res = run_privileged("wifi_down", name=ssid)
 
-    res = subprocess.run(["sudo"] + cmd, check=True, capture_output=True, text=True)
     return {"status": "success", "message": res.stdout.strip()}
 
 
 def scan_wifi_around():
-    output = subprocess.check_output(
-        [
-            "sudo",
-            "nmcli",
-            "-t",
-            "-f",
-            "SSID,SIGNAL,SECURITY,IN-USE",
-            "dev",
-            "wifi",
-            "list",
-        ]
-    ).decode("utf-8")
+    output = run_privileged("wifi_list").stdout
 
     # Get list of saved (known) connections
     saved_output = subprocess.check_output(
@@ -111,11 +73,5 @@ def scan_wifi_around():
 
 
 def delete_wifi_connection(connection_name: str) -> bool:
-    result = subprocess.run(
-        ["sudo", "nmcli", "connection", "delete", connection_name],
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    run_privileged("wifi_delete", name=connection_name)
     return True
@@ -25,7 +25,6 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import dbus
-import re
 import subprocess
 import json
 import threading
@@ -38,6 +37,7 @@ from utils.shared_services import (
     scan_wifi_around,
     delete_wifi_connection,
 )
+from utils.device_facts import device_facts
 from exceptions import InvalidWifiRequest
 
 GATT_CHRC_IFACE = "org.bluez.GattCharacteristic1"
@@ -435,36 +435,13 @@ class GetMacCharacteristic(Characteristic):
         self.value = []
 
     def get_device_mac(self):
-        try:
-            ble_output = subprocess.check_output(["hciconfig"], text=True)
-            match = re.search(r"BD Address: ([0-9A-F:]{17})", ble_output)
-            if match:
-                return {
-                    "status": "success",
-                    "mac": match.group(1).lower(),
-                    "message": "Fetched MAC successfully.",
-                }
-        except subprocess.CalledProcessError:
-            pass
-
-        for iface in ["eth0", "wlan0"]:
-            try:
-                result = subprocess.run(
-                    ["cat", f"/sys/class/net/{iface}/address"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    check=True,
-                )
-                mac = result.stdout.strip()
-                if mac and mac != "00:00:00:00:00:00":
-                    return {
-                        "status": "success",
-                        "mac": mac,
-                        "message": "Fetched MAC successfully.",
-                    }
-            except subprocess.CalledProcessError:
-                continue
+        mac = device_facts.mac()
+        if mac:
+            return {
+                "status": "success",
+                "mac": mac,
+                "message": "Fetched MAC successfully.",
+            }
 
         return {"status": "failed", "mac": None, "message": "Failed ti fetched MAC."}
 
@@ -513,6 +490,7 @@ class BLEServer:
 
 if __name__ == "__main__":
     app = Application()
+    device_facts.load()
     app.add_service(WifiScanningService(0))
     app.register()
 
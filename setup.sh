@@ -58,6 +58,9 @@ git clone "$REPO_URL" "$CLONE_DIR"
 # 4. Setup Python environment
 banner "🐍 Setting Up Python Environment"
 cd "$CLONE_DIR"
+# Headers for building dbus-python and PyGObject (systemd control and
+# unit state signals over D-Bus)
+sudo apt install -y libdbus-1-dev libglib2.0-dev pkg-config libgirepository1.0-dev libcairo2-dev
 python3 -m venv venv
 source venv/bin/activate
 pip install --upgrade pip
@@ -105,12 +108,61 @@ Environment=PYTHONUNBUFFERED=1
 WantedBy=multi-user.target
 EOF
 
+# hyperhdr-root-helper: runs the allow-listed privileged commands (nmcli,
+# dpkg, hostnamectl, ...) for the backend and BLE services without sudo
+sudo tee /etc/systemd/system/hyperhdr-root-helper.service > /dev/null <<EOF
+[Unit]
+Description=HyperHDR Controller Root Helper
+Before=auto_pair_agent.service wifi_utilities.service
+
+[Service]
+ExecStart=/usr/bin/python3 -m utils.root_helperd
+Restart=always
+User=root
+WorkingDirectory=$PROJECT_DIR/backend
+RuntimeDirectory=hyperhdr-controller
+Environment=PYTHONUNBUFFERED=1
+Environment=ROOT_HELPER_USERS=$USER_NAME
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+# Let the backend start, stop and restart its own units over D-Bus without sudo
+banner "🔐 Installing polkit Rule for systemd Units"
+sudo tee /etc/polkit-1/rules.d/50-hyperhdr-controller.rules > /dev/null <<EOF
+polkit.addRule(function(action, subject) {
+    if (subject.user != "$USER_NAME") {
+        return polkit.Result.NOT_HANDLED;
+    }
+
+    var units = [
+        "hyperhdr@$USER_NAME.service",
+        "auto_pair_agent.service",
+        "wifi_utilities.service",
+        "avahi-daemon.service"
+    ];
+
+    // Unit-file changes and daemon reloads carry no unit to check here, so
+    // they are not granted; the root helper runs them for allow-listed units.
+    if (action.id == "org.freedesktop.systemd1.manage-units" &&
+        units.indexOf(action.lookup("unit")) >= 0) {
+        return polkit.Result.YES;
+    }
+
+    return polkit.Result.NOT_HANDLED;
+});
+EOF
+
 # 7. Enable and start BLE + WiFi services
 banner "🚦 Enabling & Starting BLE + WiFi Services"
 sudo systemctl daemon-reload
+sudo systemctl enable hyperhdr-root-helper.service
 sudo systemctl enable wifi_utilities.service
 sudo systemctl enable auto_pair_agent.service
 
+sudo systemctl start hyperhdr-root-helper.service
+
 sudo systemctl start wifi_utilities.service
 sudo systemctl start auto_pair_agent.service
 